@@ -11,12 +11,53 @@ def create_app():
     load_dotenv()
 
     app = Flask(__name__)
-    CORS(app)
+    CORS(app, expose_headers=["X-Next-Cursor", "Link", "X-Change-Seq"])
 
     app.config['SQLALCHEMY_DATABASE_URI'] = os.getenv("DATABASE_URL", "sqlite:///jobs.db")
     app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    # Response cache for GET /jobs: memory:// (per process), redis://...,
+    # fakeredis:// or none://
+    app.config['CACHE_URL'] = os.getenv("CACHE_URL", "memory://")
+    app.config['CACHE_TTL'] = int(os.getenv("CACHE_TTL", 300))
+    app.config['CACHE_MAX_ENTRIES'] = int(os.getenv("CACHE_MAX_ENTRIES", 1024))
+    # Connection pool (per worker process) and SQLite tuning
+    app.config['DB_POOL_SIZE'] = int(os.getenv("DB_POOL_SIZE", 10))
+    app.config['DB_MAX_OVERFLOW'] = int(os.getenv("DB_MAX_OVERFLOW", 20))
+    app.config['DB_POOL_RECYCLE'] = int(os.getenv("DB_POOL_RECYCLE", 1800))
+    app.config['SQLITE_BUSY_TIMEOUT_MS'] = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", 5000))
+    app.config['SQLITE_MMAP_SIZE'] = int(os.getenv("SQLITE_MMAP_SIZE", 256 * 1024 * 1024))
+
+    from .engine import configure_engine, engine_options
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = engine_options(app.config['SQLALCHEMY_DATABASE_URI'], app.config)
+
+    # Request metrics on /metrics; SLOW_QUERY_MS > 0 logs statements at least that slow
+    app.config['METRICS_ENABLED'] = os.getenv("METRICS_ENABLED", "1") == "1"
+    app.config['SLOW_QUERY_MS'] = float(os.getenv("SLOW_QUERY_MS", 0))
+
+    # Change feed: how often open streams poll for writes from other worker
+    # processes, how long one stream runs before the client reconnects (with
+    # Last-Event-ID), and how many streams one process serves at once. Each
+    # stream holds a request thread, so keep the cap below the thread count
+    # (backend.serve defaults it to half of --threads).
+    app.config['CHANGE_POLL_S'] = float(os.getenv("CHANGE_POLL_S", 1))
+    app.config['CHANGE_STREAM_MAX_S'] = float(os.getenv("CHANGE_STREAM_MAX_S", 60))
+    app.config['CHANGE_STREAMS_MAX'] = int(os.getenv("CHANGE_STREAMS_MAX", 2))
+    # Change log entries older than this many days are pruned by
+    # python -m backend.retention; clients further behind reload their list
+    app.config['CHANGE_LOG_DAYS'] = int(os.getenv("CHANGE_LOG_DAYS", 7))
+
+    # Jobs posted more than this many days ago are moved to the archive by
+    # python -m backend.retention (0 keeps everything in the hot tables)
+    app.config['RETENTION_DAYS'] = int(os.getenv("RETENTION_DAYS", 0))
 
     db.init_app(app)
+    with app.app_context():
+        configure_engine(db.engine, app.config)
+        from .metrics import init_metrics
+        init_metrics(app, db.engine)
+
+    from .cache import init_cache
+    init_cache(app)
 
     from .routes import job_routes
     app.register_blueprint(job_routes)
@@ -3,4 +3,5 @@ from backend import create_app
 app = create_app()
 
 if __name__ == '__main__':
+    # Development server only; run python -m backend.serve in production
     app.run(debug=True)
@@ -0,0 +1,252 @@
+# Load test for the jobs API.
+#
+# For each table size, seeds a fresh synthetic SQLite database, serves it
+# with backend.serve (or an in-process threaded server if neither gunicorn
+# nor waitress is installed) and drives every route with concurrent
+# clients: GET /jobs for each filter/sort combination, GET /jobs/<id>,
+# POST /jobs, PUT /jobs/<id> and DELETE /jobs/<id>. Throughput and
+# p50/p95/p99 latency per route are written as JSON; --baseline compares
+# against an earlier run and exits non-zero on regressions.
+#
+#   python -m backend.bench_api --sizes 10000,100000,1000000 --clients 8 --output bench.json
+#   python -m backend.bench_api --sizes 10000 --baseline bench.json
+import argparse
+import itertools
+import json
+import os
+import platform
+import random
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timezone
+
+import requests
+
+from backend.check_query_plans import JOB_TYPES, LOCATIONS, seed
+
+SORTS = ["posting_date_desc", "posting_date_asc"]
+
+def percentile(samples, p):
+    return round(samples[min(len(samples) - 1, int(p / 100 * len(samples)))] * 1000, 2)
+
+def summarize(latencies, errors, elapsed):
+    samples = sorted(latencies)
+    if not samples:
+        return {"requests": 0, "errors": errors}
+    return {
+        "requests": len(samples),
+        "errors": errors,
+        "throughput_rps": round(len(samples) / elapsed, 1),
+        "mean_ms": round(sum(samples) / len(samples) * 1000, 2),
+        "p50_ms": percentile(samples, 50),
+        "p95_ms": percentile(samples, 95),
+        "p99_ms": percentile(samples, 99),
+        "max_ms": round(samples[-1] * 1000, 2),
+    }
+
+def list_scenarios():
+    # Every GET /jobs filter/sort combination the UI can produce
+    for job_type, location, tag, sort in itertools.product(
+            [None, JOB_TYPES[0]], [None, LOCATIONS[0]], [None, "Python"], SORTS):
+        params = {k: v for k, v in [("job_type", job_type), ("location", location), ("tag", tag)] if v}
+        params["sort"] = sort
+        label = "GET /jobs?" + "&".join(f"{k}={v}" for k, v in params.items())
+        yield label, params
+
+def job_payload(rng, n):
+    return {
+        "title": f"Benchmark Actuary {n}",
+        "company": f"Company {rng.randint(0, 499)}",
+        "location": rng.choice(LOCATIONS),
+        "job_type": rng.choice(JOB_TYPES),
+        "tags": rng.sample(["Python", "SQL", "Excel", "Pricing"], 2),
+    }
+
+def run_scenario(base_url, request_fn, clients, duration):
+    # Each client loops request_fn(session, rng) until the deadline and
+    # records the latency of every request; non-2xx responses count as errors
+    latencies, errors = [], []
+    lock = threading.Lock()
+    deadline = time.perf_counter() + duration
+
+    def client(seed_value):
+        session = requests.Session()
+        rng = random.Random(seed_value)
+        mine, failed = [], 0
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            try:
+                response = request_fn(session, rng)
+                ok = response.ok
+            except requests.exceptions.RequestException:
+                ok = False
+            if ok:
+                mine.append(time.perf_counter() - start)
+            else:
+                failed += 1
+        with lock:
+            latencies.extend(mine)
+            errors.append(failed)
+        session.close()
+
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(clients)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return summarize(latencies, sum(errors), time.perf_counter() - start)
+
+def route_scenarios(base_url, rows):
+    # (label, request function) for every route. Deletes take ids from the
+    # top of the seeded range so each one removes a distinct existing row.
+    next_delete = itertools.count(rows, -1)
+    next_create = itertools.count(1)
+    for label, params in list_scenarios():
+        yield label, lambda s, rng, params=params: s.get(f"{base_url}/jobs", params=params)
+    yield "GET /jobs/<id>", lambda s, rng: s.get(f"{base_url}/jobs/{rng.randint(1, rows // 2)}")
+    yield "POST /jobs", lambda s, rng: s.post(f"{base_url}/jobs", json=job_payload(rng, next(next_create)))
+    yield "PUT /jobs/<id>", lambda s, rng: s.put(f"{base_url}/jobs/{rng.randint(1, rows // 2)}",
+                                                  json={"location": rng.choice(LOCATIONS), "tags": "Python,SQL"})
+    yield "DELETE /jobs/<id>", lambda s, rng: s.delete(f"{base_url}/jobs/{next(next_delete)}")
+
+def seed_database(path, rows):
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.abspath(path)}"
+    from backend import create_app, db
+    app = create_app()
+    with app.app_context():
+        db.create_all()
+        with db.engine.begin() as connection:
+            seed(connection, rows)
+    with sqlite3.connect(path) as connection:
+        connection.execute("ANALYZE")
+
+def start_server(path, options):
+    # Returns (base_url, stop, description). Prefers backend.serve in a
+    # subprocess so the load generator doesn't share a GIL with the server.
+    port = options.port
+    env = dict(os.environ, DATABASE_URL=f"sqlite:///{os.path.abspath(path)}", CACHE_URL=options.cache)
+    process = subprocess.Popen(
+        [sys.executable, "-m", "backend.serve", "--bind", f"127.0.0.1:{port}",
+         "--workers", str(options.workers), "--threads", str(options.threads)],
+        env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    base_url = f"http://127.0.0.1:{port}"
+
+    def stop_process():
+        process.terminate()
+        process.wait()
+
+    for _ in range(100):
+        if process.poll() is not None:
+            break
+        try:
+            requests.get(f"{base_url}/jobs/0", timeout=1)
+            return base_url, stop_process, f"backend.serve ({options.workers} workers x {options.threads} threads)"
+        except requests.exceptions.ConnectionError:
+            time.sleep(0.1)
+    stop_process()
+
+    from werkzeug.serving import make_server
+    from backend import create_app
+    os.environ.update(env)
+    server = make_server("127.0.0.1", port, create_app(), threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    def stop_server():
+        server.shutdown()
+        server.server_close()
+
+    return base_url, stop_server, "werkzeug threaded (in-process)"
+
+def compare(results, baseline, tolerance):
+    # Flag routes whose p95 rose or throughput fell by more than tolerance
+    regressions = []
+    for size, current in results["sizes"].items():
+        previous = baseline.get("sizes", {}).get(size, {}).get("routes", {})
+        for route, stats in current["routes"].items():
+            before = previous.get(route)
+            if not before or not before.get("requests") or not stats.get("requests"):
+                continue
+            if stats["p95_ms"] > before["p95_ms"] * (1 + tolerance):
+                regressions.append(f"{size} rows {route}: p95 {before['p95_ms']} -> {stats['p95_ms']} ms")
+            if stats["throughput_rps"] < before["throughput_rps"] * (1 - tolerance):
+                regressions.append(f"{size} rows {route}: {before['throughput_rps']} -> "
+                                   f"{stats['throughput_rps']} req/s")
+    return regressions
+
+def git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-test the jobs API on synthetic tables")
+    parser.add_argument("--sizes", default="10000,100000,1000000", help="comma-separated row counts")
+    parser.add_argument("--clients", type=int, default=8, help="concurrent clients per route")
+    parser.add_argument("--duration", type=float, default=5, help="seconds to drive each route")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="server worker processes")
+    parser.add_argument("--threads", type=int, default=4, help="server threads per worker")
+    parser.add_argument("--cache", default="none://", help="CACHE_URL for the server (default: disabled)")
+    parser.add_argument("--port", type=int, default=5099)
+    parser.add_argument("--output", help="write the JSON results here (default: stdout)")
+    parser.add_argument("--baseline", help="earlier results to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed relative slowdown vs baseline")
+    options = parser.parse_args()
+
+    results = {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "git_revision": git_revision(),
+            "python": platform.python_version(),
+            "sqlite": sqlite3.sqlite_version,
+            "cpus": os.cpu_count(),
+            "clients": options.clients,
+            "duration_s": options.duration,
+            "cache": options.cache,
+        },
+        "sizes": {},
+    }
+    for rows in (int(size) for size in options.sizes.split(",")):
+        path = os.path.join(tempfile.mkdtemp(), "bench.db")
+        print(f"🌱 Seeding {rows} jobs...", file=sys.stderr)
+        start = time.perf_counter()
+        seed_database(path, rows)
+        size_result = {"seed_s": round(time.perf_counter() - start, 1), "routes": {}}
+
+        base_url, stop, server = start_server(path, options)
+        results["meta"]["server"] = server
+        try:
+            for label, request_fn in route_scenarios(base_url, rows):
+                stats = run_scenario(base_url, request_fn, options.clients, options.duration)
+                size_result["routes"][label] = stats
+                print(f"  {rows:>8} {label:<72} {stats.get('throughput_rps', 0):>8} req/s  "
+                      f"p95 {stats.get('p95_ms')} ms  errors {stats['errors']}", file=sys.stderr)
+        finally:
+            stop()
+        results["sizes"][str(rows)] = size_result
+
+    output = json.dumps(results, indent=2)
+    if options.output:
+        with open(options.output, "w") as f:
+            f.write(output)
+    else:
+        print(output)
+
+    if options.baseline:
+        with open(options.baseline) as f:
+            regressions = compare(results, json.load(f), options.tolerance)
+        for line in regressions:
+            print(f"❌ {line}", file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+        print("✅ No regressions against baseline", file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,181 @@
+# Benchmark for near-duplicate detection.
+#
+# For each table size, seeds a fresh synthetic SQLite database where a
+# share of the jobs are cross-posted variants of earlier ones (abbreviated
+# or re-punctuated titles, company suffixes, extra locations, reordered or
+# dropped tags), then times a full re-cluster and the ingest-time indexing
+# of new jobs against the already indexed table. Pairwise precision/recall
+# against the seeded groups are reported alongside; indexing latency per
+# job should stay flat as the table grows.
+#
+#   python -m backend.bench_dedupe --sizes 10000,100000,1000000 --output dedupe.json
+import argparse
+import json
+import os
+import random
+import tempfile
+import time
+from collections import Counter
+from datetime import datetime, timedelta
+
+LEVELS = ["", "Senior", "Junior", "Lead", "Principal", "Assistant", "Associate", "Chief"]
+ROLES = ["Actuarial Analyst", "Actuary", "Pricing Actuary", "Reserving Actuary", "Actuarial Consultant",
+         "Actuarial Manager", "Capital Modelling Actuary", "Actuarial Student", "Valuation Actuary",
+         "Actuarial Associate", "Risk Analyst", "Actuarial Director"]
+LINES = ["", "Life", "P&C", "Health", "Pensions", "Reinsurance", "Annuities", "Commercial Lines"]
+GRADES = ["", "I", "II", "III"]
+LOCATIONS = ["London", "New York, NY", "Chicago, IL", "Toronto, ON", "Remote", "Hartford, CT", "Zurich",
+             "Sydney", "Boston, MA", "Dallas, TX", "Des Moines, IA", "Philadelphia, PA", "Edinburgh",
+             "Dublin", "Singapore", "Hong Kong", "Atlanta, GA", "Minneapolis, MN", "Omaha, NE", "Paris"]
+TAGS = ["Life", "Health", "P&C", "Python", "R", "SQL", "Excel", "Pricing", "Reserving", "ASA", "FSA",
+        "FIA", "IFRS 17", "Solvency II", "Prophet", "VBA"]
+JOB_TYPES = ["Full-Time", "Part-Time", "Internship", "Contract"]
+COMPANY_SUFFIXES = ["", " Inc.", " LLC", " Ltd", " Group", ", Inc"]
+TITLE_ABBREVIATIONS = {"Senior": "Sr.", "Junior": "Jr.", "Assistant": "Asst.", "Associate": "Assoc."}
+
+def base_job(rng, companies):
+    title = " ".join(part for part in [rng.choice(LEVELS), rng.choice(LINES), rng.choice(ROLES),
+                                       rng.choice(GRADES)] if part)
+    return {
+        "title": title,
+        "company": f"Carrier {rng.randrange(companies)}",
+        "location": rng.choice(LOCATIONS),
+        "job_type": rng.choice(JOB_TYPES),
+        "tags": rng.sample(TAGS, rng.randint(1, 4)),
+    }
+
+def variant(rng, job):
+    # A cross-post of job with one or two of the differences seen in practice
+    job = dict(job, tags=list(job["tags"]))
+    for change in rng.sample(["abbreviate", "punctuate", "company", "location", "tags"], rng.randint(1, 2)):
+        if change == "abbreviate":
+            job["title"] = " ".join(TITLE_ABBREVIATIONS.get(word, word) for word in job["title"].split())
+        elif change == "punctuate":
+            job["title"] = rng.choice([job["title"].upper(), job["title"].lower(), job["title"] + " -",
+                                       job["title"].replace(" ", " - ", 1)])
+        elif change == "company":
+            job["company"] += rng.choice(COMPANY_SUFFIXES[1:])
+        elif change == "location":
+            job["location"] = f"{job['location']}, {rng.choice(LOCATIONS)}"
+        elif len(job["tags"]) > 2:
+            job["tags"].pop(rng.randrange(len(job["tags"])))
+        else:
+            rng.shuffle(job["tags"])
+    return job
+
+def seed(connection, rows, duplicate_share, batch_size=10000):
+    # Returns the seeded group of every job id: variants share their
+    # original's group, everything else is a group of its own
+    rng = random.Random(0)
+    companies = max(10, rows // 50)
+    start = datetime(2020, 1, 1)
+    bases, keys, groups = [], set(), {}
+    for offset in range(0, rows, batch_size):
+        values = []
+        for job_id in range(offset + 1, min(offset + batch_size, rows) + 1):
+            if bases and rng.random() < duplicate_share:
+                group, job = rng.choice(bases)
+                job = variant(rng, job)
+            else:
+                job = base_job(rng, companies)
+                # Distinct originals, so every seeded pair is a real cross-post
+                while (job["title"], job["company"], job["location"]) in keys:
+                    job = base_job(rng, companies)
+                keys.add((job["title"], job["company"], job["location"]))
+                group = job_id
+                bases.append((group, job))
+            groups[job_id] = group
+            posted = start + timedelta(minutes=rng.randint(0, 60 * 24 * 365 * 5))
+            values.append((job_id, job["title"], job["company"], job["location"], str(posted), job["job_type"],
+                           ",".join(job["tags"]), str(posted)))
+        connection.exec_driver_sql(
+            "INSERT INTO job (id, title, company, location, posting_date, job_type, tags, updated_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)", values)
+    return groups
+
+def pairs(counts):
+    return sum(n * (n - 1) // 2 for n in counts.values())
+
+def accuracy(found, groups):
+    # Pairwise precision/recall of the found groups against the seeded ones
+    cells = Counter((found[job_id], group) for job_id, group in groups.items())
+    together = pairs(cells)
+    found_pairs = pairs(Counter(found.values()))
+    seeded_pairs = pairs(Counter(groups.values()))
+    return {
+        "precision": round(together / found_pairs, 4) if found_pairs else 1.0,
+        "recall": round(together / seeded_pairs, 4) if seeded_pairs else 1.0,
+    }
+
+def run(size, duplicate_share, ingest_jobs, directory):
+    path = os.path.join(directory, f"dedupe_{size}.db")
+    os.environ["DATABASE_URL"] = f"sqlite:///{path}"
+    from backend import create_app, db
+    from backend.dedupe import index_jobs, recluster
+    from backend.models import Job, job_lsh
+    from sqlalchemy import func, insert, select
+
+    app = create_app()
+    with app.app_context():
+        db.create_all()
+        print(f"🌱 Seeding {size} jobs ({duplicate_share:.0%} cross-posts)...")
+        with db.engine.begin() as connection:
+            groups = seed(connection, size, duplicate_share)
+        print("🧬 Re-clustering...")
+        stats = recluster()
+        found = {job_id: root or job_id for job_id, root in db.session.execute(select(Job.id, Job.duplicate_of))}
+        result = {
+            "rows": size,
+            "recluster_s": stats["elapsed_s"],
+            "recluster_rows_per_sec": stats["rows_per_sec"],
+            "duplicates_found": stats["duplicates"],
+            "duplicates_seeded": size - len(set(groups.values())),
+            **accuracy(found, groups),
+            "index_rows": db.session.execute(select(func.count()).select_from(job_lsh)).scalar(),
+        }
+
+        # Ingest-time cost: new jobs indexed one write at a time, the way
+        # POST /jobs does, against the full table
+        rng = random.Random(1)
+        originals = db.session.execute(
+            select(Job.title, Job.company, Job.location, Job.job_type, Job.tags).order_by(func.random()).limit(ingest_jobs)
+        ).all()
+        latencies = []
+        for title, company, location, job_type, tags in originals:
+            job = variant(rng, {"title": title, "company": company, "location": location,
+                                "job_type": job_type, "tags": tags.split(",")})
+            job_id = db.session.execute(insert(Job).values(
+                title=job["title"], company=job["company"], location=job["location"], job_type=job_type,
+                tags=",".join(job["tags"]), posting_date=datetime.utcnow())).inserted_primary_key[0]
+            begin = time.perf_counter()
+            index_jobs([job_id])
+            latencies.append(time.perf_counter() - begin)
+        db.session.rollback()
+        latencies.sort()
+        result["ingest_ms_mean"] = round(sum(latencies) / len(latencies) * 1000, 3)
+        result["ingest_ms_p99"] = round(latencies[int(0.99 * (len(latencies) - 1))] * 1000, 3)
+        db.session.remove()
+        db.engine.dispose()
+    os.remove(path)
+    return result
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark near-duplicate detection on synthetic tables")
+    parser.add_argument("--sizes", default="10000,100000,1000000", help="comma-separated table sizes")
+    parser.add_argument("--duplicate-share", type=float, default=0.2, help="share of jobs that are cross-posts")
+    parser.add_argument("--ingest-jobs", type=int, default=500, help="new jobs indexed to time ingest")
+    parser.add_argument("--output", help="write results as JSON to this file")
+    options = parser.parse_args()
+
+    directory = tempfile.mkdtemp()
+    results = []
+    for size in [int(s) for s in options.sizes.split(",")]:
+        result = run(size, options.duplicate_share, options.ingest_jobs, directory)
+        print(json.dumps(result))
+        results.append(result)
+    if options.output:
+        with open(options.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+if __name__ == "__main__":
+    main()
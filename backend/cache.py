@@ -0,0 +1,145 @@
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from urllib.parse import urlparse
+from flask import current_app, request
+
+VERSION_KEY = "jobs:version"
+
+class MemoryCache:
+    # In-process LRU with a per-entry TTL. Each worker process has its own
+    # copy, so with several workers a write elsewhere is only seen here once
+    # the TTL runs out; use a Redis backend to share invalidation.
+    def __init__(self, max_entries=1024, ttl=300):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.entries = OrderedDict()
+        self.counters = {}
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            expires, value = entry
+            if expires < time.monotonic():
+                del self.entries[key]
+                return None
+            self.entries.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self.lock:
+            self.entries[key] = (time.monotonic() + self.ttl, value)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    def counter(self, key):
+        with self.lock:
+            return self.counters.get(key, 0)
+
+    def incr(self, key):
+        with self.lock:
+            self.counters[key] = self.counters.get(key, 0) + 1
+            return self.counters[key]
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+class RedisCache:
+    # Shared cache for multi-worker deployments. Entries expire through Redis
+    # TTLs; configure maxmemory-policy allkeys-lru on the server for LRU.
+    def __init__(self, client, ttl=300, prefix="jobs-cache:"):
+        self.client = client
+        self.ttl = ttl
+        self.prefix = prefix
+
+    def get(self, key):
+        raw = self.client.get(self.prefix + key)
+        return json.loads(raw) if raw is not None else None
+
+    def set(self, key, value):
+        self.client.set(self.prefix + key, json.dumps(value), ex=self.ttl)
+
+    def counter(self, key):
+        return int(self.client.get(self.prefix + key) or 0)
+
+    def incr(self, key):
+        return self.client.incr(self.prefix + key)
+
+    def clear(self):
+        for key in self.client.scan_iter(self.prefix + "*"):
+            self.client.delete(key)
+
+def per_process(url):
+    # Whether every process gets its own copy of this cache, so a write in
+    # one worker leaves the others serving stale listings until CACHE_TTL
+    return (urlparse(url).scheme or url) in ("memory", "fakeredis")
+
+def make_cache(url, max_entries=1024, ttl=300):
+    # memory:// (default), redis://host:port/db, fakeredis:// (in-process Redis
+    # stand-in for local runs) or none:// to disable caching
+    scheme = urlparse(url).scheme or url
+    if scheme == "none":
+        return None
+    if scheme == "memory":
+        return MemoryCache(max_entries, ttl)
+    if scheme == "fakeredis":
+        import fakeredis
+        return RedisCache(fakeredis.FakeRedis(), ttl)
+    if scheme in ("redis", "rediss", "unix"):
+        import redis
+        return RedisCache(redis.Redis.from_url(url), ttl)
+    raise ValueError(f"Unsupported CACHE_URL: {url}")
+
+def init_cache(app):
+    app.extensions["response_cache"] = make_cache(
+        app.config["CACHE_URL"], app.config["CACHE_MAX_ENTRIES"], app.config["CACHE_TTL"]
+    )
+
+def get_cache():
+    return current_app.extensions.get("response_cache")
+
+def invalidate_jobs():
+    # Bump the version every cached listing key includes, so entries written
+    # before a change are never read again (they age out through LRU/TTL)
+    cache = get_cache()
+    if cache is not None:
+        cache.incr(VERSION_KEY)
+
+def tag_response(response):
+    # Strong ETag over the exact body bytes
+    response.set_etag(hashlib.sha1(response.get_data()).hexdigest())
+    response.headers["Cache-Control"] = "no-cache"  # Browsers revalidate every time
+    return response
+
+def conditional(response):
+    # Answer If-None-Match with 304 when the ETag still matches
+    return tag_response(response).make_conditional(request)
+
+def cached_response(key, build):
+    # Serve a GET from the cache, or build it and store body, status and
+    # headers. key must capture everything the response depends on.
+    cache = get_cache()
+    if cache is None:
+        return conditional(build())
+
+    key = f"{cache.counter(VERSION_KEY)}:{hashlib.sha1(key.encode()).hexdigest()}"
+    entry = cache.get(key)
+    if entry is None:
+        response = tag_response(build())
+        if response.status_code == 200:
+            cache.set(key, {
+                "body": response.get_data(as_text=True),
+                "status": response.status_code,
+                "headers": [[k, v] for k, v in response.headers.items() if k != "Content-Length"],
+            })
+        return response.make_conditional(request)
+
+    response = current_app.response_class(entry["body"], status=entry["status"], headers=entry["headers"])
+    return response.make_conditional(request)
@@ -0,0 +1,157 @@
+import itertools
+import json
+import threading
+import time
+from datetime import datetime, timedelta
+from flask import current_app
+from sqlalchemy import delete, event, func, insert, select
+from sqlalchemy.orm import Session
+from backend import db
+from backend.models import Job, JobChange
+from backend.serialize import JOB_COLUMNS, row_dict
+
+CHANGE_BATCH = 500
+PRUNE_BATCH = 5000
+KEEPALIVE_S = 15
+RETRY_MS = 2000
+# Retry-After for clients turned away while every stream slot is taken
+STREAMS_FULL_RETRY_S = 5
+
+class ChangeNotifier:
+    # Wakes this process's open change streams as soon as a logged write
+    # commits. Streams still poll, so writes made by other worker processes
+    # reach them within CHANGE_POLL_S.
+    def __init__(self):
+        self.condition = threading.Condition()
+        self.version = 0
+
+    def notify(self):
+        with self.condition:
+            self.version += 1
+            self.condition.notify_all()
+
+    def wait(self, version, timeout):
+        with self.condition:
+            self.condition.wait_for(lambda: self.version != version, timeout)
+
+notifier = ChangeNotifier()
+
+class StreamSlots:
+    # Counts the change streams open in this process. Each one holds a
+    # request thread for up to CHANGE_STREAM_MAX_S, so without a cap a few
+    # idle browser tabs could take every thread and queue /jobs behind them.
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.open = 0
+
+    def acquire(self, limit):
+        with self.lock:
+            if self.open >= limit:
+                return False
+            self.open += 1
+            return True
+
+    def release(self):
+        with self.lock:
+            self.open -= 1
+
+stream_slots = StreamSlots()
+
+@event.listens_for(Session, "after_commit")
+def _notify_streams(session):
+    if session.info.pop("job_changes", False):
+        notifier.notify()
+
+@event.listens_for(Session, "after_rollback")
+def _forget_changes(session):
+    session.info.pop("job_changes", None)
+
+def log_changes(changes):
+    # Append (job id, op) pairs to the change log in the caller's transaction,
+    # so an entry exists exactly when its write commits
+    now = datetime.utcnow()
+    rows = [{"job_id": job_id, "op": op, "changed_at": now} for job_id, op in changes]
+    if rows:
+        db.session.execute(insert(JobChange), rows)
+        db.session.info["job_changes"] = True
+
+def latest_seq():
+    return db.session.execute(select(func.coalesce(func.max(JobChange.seq), 0))).scalar()
+
+def oldest_seq():
+    return db.session.execute(select(func.min(JobChange.seq))).scalar()
+
+def behind(since):
+    # Whether entries after since have been pruned, so a client at since can
+    # no longer catch up from the log and has to reload instead
+    oldest = oldest_seq()
+    return oldest is not None and since < oldest - 1
+
+def prune_changes(days, batch_size=PRUNE_BATCH):
+    # Delete log entries older than days, oldest first, one short transaction
+    # per batch, and return how many went. The newest entry always stays so
+    # behind() can still tell how far the pruning reached.
+    cutoff = datetime.utcnow() - timedelta(days=days)
+    newest = latest_seq()
+    pruned = 0
+    while True:
+        rows = db.session.execute(
+            select(JobChange.seq, JobChange.changed_at)
+            .where(JobChange.seq < newest).order_by(JobChange.seq).limit(batch_size)
+        ).all()
+        expired = list(itertools.takewhile(lambda row: row.changed_at < cutoff, rows))
+        if expired:
+            db.session.execute(delete(JobChange).where(JobChange.seq <= expired[-1].seq))
+            db.session.commit()
+            pruned += len(expired)
+        if len(expired) < batch_size:
+            return pruned
+
+def changes_since(since, limit=CHANGE_BATCH):
+    # Log entries after seq since, oldest first, each with the job's current
+    # row. "job" is null for deletes and once the job has been deleted (SQLite
+    # can hand a deleted job's id to a later insert, which gets its own entry).
+    rows = db.session.execute(
+        select(JobChange.seq, JobChange.op, JobChange.job_id, *JOB_COLUMNS)
+        .outerjoin(Job, Job.id == JobChange.job_id)
+        .where(JobChange.seq > since)
+        .order_by(JobChange.seq)
+        .limit(limit)
+    ).all()
+    changes = []
+    for row in rows:
+        job = None
+        if row.id is not None and row.op != "delete":
+            job = row_dict(row[3:])
+            job["posting_date"] = job["posting_date"].isoformat()
+        changes.append({"seq": row.seq, "op": row.op, "id": row.job_id, "job": job})
+    return changes
+
+def event_stream(since):
+    # Server-sent events for every change after since. Ends after
+    # CHANGE_STREAM_MAX_S so a thread isn't held forever; EventSource then
+    # reconnects with Last-Event-ID and carries on where it stopped. A client
+    # behind the pruned log gets one reset event and should reload its list.
+    poll_s = current_app.config['CHANGE_POLL_S']
+    deadline = time.monotonic() + current_app.config['CHANGE_STREAM_MAX_S']
+    yield f"retry: {RETRY_MS}\n\n"
+    last_sent = time.monotonic()
+    while time.monotonic() < deadline:
+        version = notifier.version
+        if behind(since):
+            db.session.close()
+            yield "event: reset\ndata: {}\n\n"
+            return
+        changes = changes_since(since)
+        # Hand the connection back to the pool between polls
+        db.session.close()
+        for change in changes:
+            since = change["seq"]
+            yield f"id: {since}\nevent: {change['op']}\ndata: {json.dumps(change, separators=(',', ':'))}\n\n"
+            last_sent = time.monotonic()
+        if len(changes) == CHANGE_BATCH:
+            continue
+        if time.monotonic() - last_sent >= KEEPALIVE_S:
+            yield ": keepalive\n\n"
+            last_sent = time.monotonic()
+        notifier.wait(version, min(poll_s, max(0, deadline - time.monotonic())))
@@ -0,0 +1,252 @@
+# Near-duplicate detection for cross-posted listings.
+#
+# Each job gets a MinHash signature over shingles of its title, company,
+# location and tags. The signature is cut into bands and every band is
+# hashed to a bucket in the job_lsh table, so the jobs that may be near
+# duplicates of a new one are the ones sharing a bucket with it: a few
+# index probes whatever the size of the table. Candidates are then checked
+# exactly, and a match points the job at its group's canonical (earliest)
+# job through job.duplicate_of. GET /jobs?duplicates=hide leaves those out.
+#
+# Writes index their jobs as they happen; this command rebuilds the index
+# and every group from scratch, e.g. after changing the thresholds:
+#
+#   python -m backend.dedupe
+#   python -m backend.dedupe --batch-size 2000 --commit-every 100000
+import argparse
+import functools
+import hashlib
+import json
+import re
+import struct
+import sys
+import time
+from collections import Counter, defaultdict
+from sqlalchemy import bindparam, delete, func, insert, select, update
+from backend import db
+from backend.models import Job, job_lsh
+
+# NUM_PERM hash values per signature, in BANDS bands of ROWS. Jobs with
+# Jaccard similarity s share at least one bucket with probability
+# 1 - (1 - s**ROWS)**BANDS: 0.89 at s=0.7, 0.99 at s=0.8.
+NUM_PERM = 32
+BANDS = 8
+ROWS = NUM_PERM // BANDS
+# A candidate is a duplicate when its whole shingle set and its title alone
+# are both at least this similar; the title check keeps "Actuarial Analyst"
+# and "Senior Actuarial Analyst" at the same company apart
+SIMILARITY = 0.7
+TITLE_SIMILARITY = 0.7
+# Candidates checked per job, most shared buckets first, so a company with
+# hundreds of near-identical postings doesn't make every insert slow
+MAX_CANDIDATES = 50
+# Bound parameters per IN (...) lookup
+LOOKUP_CHUNK = 4000
+
+TOKEN = re.compile(r"[a-z0-9]+")
+ABBREVIATIONS = {
+    "sr": "senior", "snr": "senior", "jr": "junior", "mgr": "manager", "asst": "assistant",
+    "assoc": "associate", "dir": "director", "vp": "vice president", "avp": "assistant vice president",
+    "svp": "senior vice president", "mgmt": "management", "dept": "department", "intl": "international",
+}
+COMPANY_SUFFIXES = {"the", "inc", "incorporated", "llc", "llp", "lp", "ltd", "limited", "corp",
+                    "corporation", "co", "company", "plc", "group", "holdings", "ag", "sa", "gmbh"}
+
+def tokens(text):
+    # Lowercase words with punctuation dropped and abbreviations spelled out
+    words = []
+    for word in TOKEN.findall((text or "").lower()):
+        words.extend(ABBREVIATIONS.get(word, word).split())
+    return words
+
+def company_key(company):
+    # "Milliman, Inc." and "Milliman" are the same employer
+    return " ".join(word for word in tokens(company) if word not in COMPANY_SUFFIXES)
+
+def title_shingles(title):
+    # Words and adjacent word pairs, so both vocabulary and order count
+    words = tokens(title)
+    return {*words, *(f"{a} {b}" for a, b in zip(words, words[1:]))}
+
+def profile(title, company, location, tags):
+    # (company key, title shingles, all shingles) for one job. Location is
+    # split into words so a multi-location posting overlaps each single one;
+    # tags come comma-joined as stored on the job.
+    key = company_key(company)
+    title_set = title_shingles(title)
+    shingles = {f"t:{s}" for s in title_set} | {f"c:{key}"} | {f"l:{w}" for w in tokens(location)}
+    shingles |= {f"g:{tag.strip().lower()}" for tag in (tags or "").split(",") if tag.strip()}
+    return key, title_set, shingles
+
+@functools.lru_cache(maxsize=1 << 16)
+def shingle_hashes(shingle):
+    # NUM_PERM independent 32-bit hashes of one shingle. Stable across
+    # processes (unlike hash()), since buckets are persisted.
+    return struct.unpack(f"<{NUM_PERM}I", hashlib.shake_128(shingle.encode()).digest(NUM_PERM * 4))
+
+def signature(shingles):
+    # The minimum of each hash over the set
+    return list(map(min, zip(*map(shingle_hashes, shingles))))
+
+def band_buckets(key, values):
+    # One signed 64-bit bucket per band. The company key is hashed in, so
+    # only postings by the same employer can ever be candidates.
+    prefix = key.encode() + b"\0"
+    return [
+        int.from_bytes(hashlib.blake2b(prefix + struct.pack(f"<B{ROWS}I", band, *values[band * ROWS:(band + 1) * ROWS]),
+                                       digest_size=8).digest(), "little", signed=True)
+        for band in range(BANDS)
+    ]
+
+def jaccard(a, b):
+    return len(a & b) / len(a | b) if a or b else 0.0
+
+def is_duplicate(a, b):
+    # a and b are profile() tuples
+    return (a[0] == b[0] and jaccard(a[1], b[1]) >= TITLE_SIMILARITY
+            and jaccard(a[2], b[2]) >= SIMILARITY)
+
+def chunked(items, size=LOOKUP_CHUNK):
+    items = list(items)
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+def job_rows(job_ids):
+    # id -> (title, company, location, tags, duplicate_of)
+    rows = {}
+    for chunk in chunked(job_ids):
+        rows.update((row[0], row[1:]) for row in db.session.execute(
+            select(Job.id, Job.title, Job.company, Job.location, Job.tags, Job.duplicate_of)
+            .where(Job.id.in_(chunk))
+        ))
+    return rows
+
+def set_duplicate_of(changes):
+    # changes holds {"job_id", "duplicate_of"} dicts. Grouping isn't a
+    # content change, so updated_at is kept as it is.
+    if not changes:
+        return
+    table = Job.__table__
+    db.session.execute(
+        update(table).where(table.c.id == bindparam("job_id"))
+        .values(duplicate_of=bindparam("duplicate_of"), updated_at=table.c.updated_at),
+        changes,
+    )
+
+def index_jobs(job_ids):
+    # (Re)index the given jobs, already written in the caller's transaction,
+    # and point each at the canonical job of the earliest group it matches:
+    # every candidate with a lower id is checked and the lowest canonical id
+    # among the matches wins (NULL when nothing matches). Taking jobs in id
+    # order is what makes a chunk-by-chunk rebuild give the same groups.
+    # Returns the number of these jobs that are duplicates.
+    job_ids = sorted(set(job_ids))
+    if not job_ids:
+        return 0
+    rows = job_rows(job_ids)
+    profiles = {job_id: profile(*rows[job_id][:4]) for job_id in job_ids if job_id in rows}
+    buckets = {job_id: band_buckets(p[0], signature(p[2])) for job_id, p in profiles.items()}
+
+    for chunk in chunked(job_ids):
+        db.session.execute(delete(job_lsh).where(job_lsh.c.job_id.in_(chunk)))
+    entries = [{"bucket": bucket, "job_id": job_id}
+               for job_id, job_buckets in buckets.items() for bucket in set(job_buckets)]
+    if entries:
+        db.session.execute(insert(job_lsh), entries)
+
+    members = defaultdict(list)
+    for chunk in chunked({bucket for job_buckets in buckets.values() for bucket in job_buckets}):
+        for bucket, job_id in db.session.execute(
+                select(job_lsh.c.bucket, job_lsh.c.job_id).where(job_lsh.c.bucket.in_(chunk))):
+            members[bucket].append(job_id)
+    candidates = {}
+    for job_id, job_buckets in buckets.items():
+        shared = Counter(other for bucket in job_buckets for other in members[bucket] if other < job_id)
+        candidates[job_id] = [other for other, _ in shared.most_common(MAX_CANDIDATES)]
+    rows.update(job_rows({other for others in candidates.values() for other in others} - rows.keys()))
+
+    canonical = {}
+    for job_id in sorted(buckets):
+        roots = []
+        for other in candidates[job_id]:
+            if other not in rows:
+                continue
+            if other not in profiles:
+                profiles[other] = profile(*rows[other][:4])
+            if is_duplicate(profiles[job_id], profiles[other]):
+                roots.append((canonical[other] if other in canonical else rows[other][4]) or other)
+        canonical[job_id] = min(roots) if roots else None
+    set_duplicate_of([{"job_id": job_id, "duplicate_of": root} for job_id, root in canonical.items()
+                      if root != rows[job_id][4]])
+    return sum(1 for root in canonical.values() if root is not None)
+
+def forget_jobs(job_ids):
+    # Drop jobs from the index once they are deleted. A group whose
+    # canonical job is among them passes to its lowest remaining member.
+    job_ids = list(job_ids)
+    groups = defaultdict(list)
+    for chunk in chunked(job_ids):
+        db.session.execute(delete(job_lsh).where(job_lsh.c.job_id.in_(chunk)))
+        for job_id, root in db.session.execute(
+                select(Job.id, Job.duplicate_of).where(Job.duplicate_of.in_(chunk))):
+            groups[root].append(job_id)
+    changes = []
+    for group in groups.values():
+        group.sort()
+        changes.append({"job_id": group[0], "duplicate_of": None})
+        changes += [{"job_id": job_id, "duplicate_of": group[0]} for job_id in group[1:]]
+    set_duplicate_of(changes)
+
+def recluster(batch_size=1000, commit_every=50000):
+    # Rebuild the LSH index and every group, committing as it goes. Jobs
+    # written meanwhile index themselves and are picked up again in turn.
+    start = time.perf_counter()
+    table = Job.__table__
+    db.session.execute(delete(job_lsh))
+    db.session.execute(update(table).where(table.c.duplicate_of.isnot(None))
+                       .values(duplicate_of=None, updated_at=table.c.updated_at))
+    db.session.commit()
+
+    stats = {"jobs": 0, "duplicates": 0}
+    last_id = 0
+    uncommitted = 0
+    while True:
+        job_ids = db.session.scalars(
+            select(Job.id).where(Job.id > last_id).order_by(Job.id).limit(batch_size)
+        ).all()
+        if not job_ids:
+            break
+        stats["duplicates"] += index_jobs(job_ids)
+        stats["jobs"] += len(job_ids)
+        last_id = job_ids[-1]
+        uncommitted += len(job_ids)
+        if uncommitted >= commit_every:
+            db.session.commit()
+            uncommitted = 0
+            print(f"🧬 {stats['jobs']} jobs ({stats['jobs'] / (time.perf_counter() - start):,.0f}/s), "
+                  f"{stats['duplicates']} duplicates", file=sys.stderr)
+    db.session.commit()
+
+    elapsed = time.perf_counter() - start
+    stats["groups"] = db.session.execute(select(func.count(func.distinct(Job.duplicate_of)))).scalar()
+    stats["elapsed_s"] = round(elapsed, 2)
+    stats["rows_per_sec"] = round(stats["jobs"] / elapsed) if elapsed else 0
+    return stats
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild the near-duplicate index and groups for every job")
+    parser.add_argument("--batch-size", type=int, default=1000, help="jobs indexed per step")
+    parser.add_argument("--commit-every", type=int, default=50000, help="jobs per transaction")
+    options = parser.parse_args()
+
+    from backend import create_app
+    from backend.cache import invalidate_jobs
+    app = create_app()
+    with app.app_context():
+        db.create_all()
+        stats = recluster(options.batch_size, options.commit_every)
+        invalidate_jobs()
+    print(json.dumps(stats))
+
+if __name__ == "__main__":
+    main()
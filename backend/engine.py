@@ -0,0 +1,53 @@
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+
+def is_sqlite_file(url):
+    url = make_url(url)
+    return url.get_backend_name() == "sqlite" and url.database not in (None, "", ":memory:")
+
+def engine_options(url, config):
+    # Pool settings per backend. SQLite files get a thread-safe queue pool
+    # (one connection per concurrent request, reused across requests); in
+    # memory SQLite keeps SQLAlchemy's default single shared connection.
+    backend = make_url(url).get_backend_name()
+    if backend == "sqlite":
+        if not is_sqlite_file(url):
+            return {}
+        return {
+            "pool_size": config["DB_POOL_SIZE"],
+            "max_overflow": config["DB_MAX_OVERFLOW"],
+            "connect_args": {
+                "check_same_thread": False,
+                # pysqlite's own lock wait, in seconds; busy_timeout below
+                # covers statements once connected
+                "timeout": config["SQLITE_BUSY_TIMEOUT_MS"] / 1000,
+            },
+        }
+    # Postgres and other servers: check connections before use and recycle
+    # them before idle timeouts on the server or a proxy drop them
+    return {
+        "pool_size": config["DB_POOL_SIZE"],
+        "max_overflow": config["DB_MAX_OVERFLOW"],
+        "pool_pre_ping": True,
+        "pool_recycle": config["DB_POOL_RECYCLE"],
+    }
+
+def configure_engine(engine, config):
+    # Per-connection SQLite pragmas: WAL lets readers run while the scraper
+    # writes, synchronous=NORMAL is durable in WAL mode without an fsync per
+    # commit, busy_timeout makes concurrent writers wait instead of failing
+    # and mmap_size serves reads from the page cache without copying.
+    # auto_vacuum only takes effect on new files (backend.retention converts
+    # older ones) and lets compaction release pages a batch at a time.
+    if not is_sqlite_file(engine.url):
+        return
+
+    @event.listens_for(engine, "connect")
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA auto_vacuum=INCREMENTAL")
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.execute(f"PRAGMA busy_timeout={int(config['SQLITE_BUSY_TIMEOUT_MS'])}")
+        cursor.execute(f"PRAGMA mmap_size={int(config['SQLITE_MMAP_SIZE'])}")
+        cursor.close()
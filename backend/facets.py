@@ -0,0 +1,191 @@
+from sqlalchemy import column, event, func, select, table, text, union_all
+from werkzeug.datastructures import MultiDict
+from backend import db
+from backend.models import ArchivedJob, Job, Tag, job_archive_tags, job_tags
+
+DEFAULT_TAG_FACETS = 50
+
+# Per-(job_type, location) and per-(job_type, location, tag) job counts,
+# kept current by triggers on every insert/update/delete of job and
+# job_tags (including bulk SQL that bypasses the ORM), so facet requests
+# read a few hundred summary rows instead of scanning the job table.
+FACET_DDL = [
+    """CREATE TABLE IF NOT EXISTS job_facet_counts (
+        job_type VARCHAR(50) NOT NULL, location VARCHAR(120) NOT NULL, jobs INTEGER NOT NULL,
+        PRIMARY KEY (job_type, location)
+    )""",
+    """CREATE TABLE IF NOT EXISTS job_tag_facet_counts (
+        job_type VARCHAR(50) NOT NULL, location VARCHAR(120) NOT NULL, tag_id INTEGER NOT NULL,
+        jobs INTEGER NOT NULL,
+        PRIMARY KEY (job_type, location, tag_id)
+    )""",
+    """CREATE TRIGGER IF NOT EXISTS job_facets_ai AFTER INSERT ON job BEGIN
+        INSERT INTO job_facet_counts (job_type, location, jobs) VALUES (new.job_type, new.location, 1)
+        ON CONFLICT (job_type, location) DO UPDATE SET jobs = jobs + 1;
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS job_facets_ad AFTER DELETE ON job BEGIN
+        UPDATE job_facet_counts SET jobs = jobs - 1
+        WHERE job_type = old.job_type AND location = old.location;
+        UPDATE job_tag_facet_counts SET jobs = jobs - 1
+        WHERE job_type = old.job_type AND location = old.location
+          AND tag_id IN (SELECT tag_id FROM job_tags WHERE job_id = old.id);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS job_facets_au AFTER UPDATE OF job_type, location ON job
+    WHEN old.job_type IS NOT new.job_type OR old.location IS NOT new.location BEGIN
+        UPDATE job_facet_counts SET jobs = jobs - 1
+        WHERE job_type = old.job_type AND location = old.location;
+        INSERT INTO job_facet_counts (job_type, location, jobs) VALUES (new.job_type, new.location, 1)
+        ON CONFLICT (job_type, location) DO UPDATE SET jobs = jobs + 1;
+        UPDATE job_tag_facet_counts SET jobs = jobs - 1
+        WHERE job_type = old.job_type AND location = old.location
+          AND tag_id IN (SELECT tag_id FROM job_tags WHERE job_id = new.id);
+        INSERT INTO job_tag_facet_counts (job_type, location, tag_id, jobs)
+        SELECT new.job_type, new.location, tag_id, 1 FROM job_tags WHERE job_id = new.id AND true
+        ON CONFLICT (job_type, location, tag_id) DO UPDATE SET jobs = jobs + 1;
+    END""",
+    # Link changes only count while the job row exists; deleting the job
+    # itself already took its remaining links off in job_facets_ad. The
+    # "AND true" keeps SQLite from reading ON CONFLICT as a join clause.
+    """CREATE TRIGGER IF NOT EXISTS job_tag_facets_ai AFTER INSERT ON job_tags BEGIN
+        INSERT INTO job_tag_facet_counts (job_type, location, tag_id, jobs)
+        SELECT job_type, location, new.tag_id, 1 FROM job WHERE id = new.job_id AND true
+        ON CONFLICT (job_type, location, tag_id) DO UPDATE SET jobs = jobs + 1;
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS job_tag_facets_ad AFTER DELETE ON job_tags BEGIN
+        UPDATE job_tag_facet_counts SET jobs = jobs - 1
+        WHERE tag_id = old.tag_id AND (job_type, location) =
+            (SELECT job_type, location FROM job WHERE id = old.job_id);
+    END""",
+]
+
+REBUILD_SQL = [
+    "DELETE FROM job_facet_counts",
+    """INSERT INTO job_facet_counts (job_type, location, jobs)
+       SELECT job_type, location, count(*) FROM job GROUP BY job_type, location""",
+    "DELETE FROM job_tag_facet_counts",
+    """INSERT INTO job_tag_facet_counts (job_type, location, tag_id, jobs)
+       SELECT job.job_type, job.location, job_tags.tag_id, count(*)
+       FROM job_tags JOIN job ON job.id = job_tags.job_id
+       GROUP BY job.job_type, job.location, job_tags.tag_id""",
+]
+
+# Query handles for the summary tables; like job_fts they live outside
+# db.metadata so create_all leaves them to install_facets
+facet_counts = table("job_facet_counts", column("job_type"), column("location"), column("jobs"))
+tag_facet_counts = table("job_tag_facet_counts", column("job_type"), column("location"),
+                         column("tag_id"), column("jobs"))
+
+def install_facets(connection, rebuild=False):
+    # Create the summary tables and triggers if missing, filling them from
+    # existing rows when they are new (or when rebuild is asked for)
+    if connection.dialect.name != "sqlite":
+        return False
+    exists = connection.execute(
+        text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'job_facet_counts'")
+    ).first()
+    for statement in FACET_DDL:
+        connection.execute(text(statement))
+    if rebuild or not exists:
+        for statement in REBUILD_SQL:
+            connection.execute(text(statement))
+    return True
+
+@event.listens_for(job_tags, "after_create")
+def _create_facets(target, connection, **kw):
+    # job_tags is created after job and tags, so every trigger target exists
+    install_facets(connection)
+
+def has_summary():
+    if db.engine.dialect.name != "sqlite":
+        return False
+    return db.session.execute(
+        text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'job_facet_counts'")
+    ).first() is not None
+
+def without(args, *keys):
+    args = MultiDict(args)
+    for key in keys:
+        args.poplist(key)
+    return args
+
+def rows_to_facets(rows):
+    return [{"value": value, "count": count} for value, count in rows]
+
+def summary_facets(args, tag_limit):
+    # Each facet applies every filter except its own, so a dropdown keeps
+    # listing the alternatives to the current choice
+    job_type = args.get('job_type')
+    location = args.get('location')
+    jobs = func.sum(facet_counts.c.jobs)
+
+    def grouped(group_column, filter_column, value):
+        query = select(group_column, jobs).group_by(group_column).having(jobs > 0)
+        if value:
+            query = query.where(filter_column == value)
+        return db.session.execute(query.order_by(jobs.desc(), group_column)).all()
+
+    total = select(func.coalesce(jobs, 0))
+    tag_query = (select(Tag.name, func.sum(tag_facet_counts.c.jobs))
+                 .join(Tag, Tag.id == tag_facet_counts.c.tag_id)
+                 .group_by(Tag.name).having(func.sum(tag_facet_counts.c.jobs) > 0))
+    if job_type:
+        total = total.where(facet_counts.c.job_type == job_type)
+        tag_query = tag_query.where(tag_facet_counts.c.job_type == job_type)
+    if location:
+        total = total.where(facet_counts.c.location == location)
+        tag_query = tag_query.where(tag_facet_counts.c.location == location)
+    tag_query = tag_query.order_by(func.sum(tag_facet_counts.c.jobs).desc(), Tag.name).limit(tag_limit)
+
+    return {
+        "total": db.session.execute(total).scalar(),
+        "job_type": rows_to_facets(grouped(facet_counts.c.job_type, facet_counts.c.location, location)),
+        "location": rows_to_facets(grouped(facet_counts.c.location, facet_counts.c.job_type, job_type)),
+        "tags": rows_to_facets(db.session.execute(tag_query).all()),
+    }
+
+def grouped_facets(args, tag_limit, filter_jobs, archived=False):
+    # Grouped SQL over the filtered job rows; used for tag filters and hidden
+    # duplicates (which the summary can't intersect), for include_archived
+    # and on databases without the summary.
+    # The job_type/location GROUP BYs read the composite indexes; with
+    # archived each count is taken per table and the two are added up.
+    sources = [(Job, job_tags)]
+    if archived:
+        sources.append((ArchivedJob, job_archive_tags))
+    count = func.count()
+
+    def summed(queries, limit=None):
+        counts = union_all(*(query.statement for query in queries)).subquery()
+        jobs = func.sum(counts.c.jobs)
+        query = (select(counts.c.value, jobs).group_by(counts.c.value)
+                 .order_by(jobs.desc(), counts.c.value).limit(limit))
+        return rows_to_facets(db.session.execute(query).all())
+
+    def grouped(name, facet_args):
+        return summed([
+            filter_jobs(db.session.query(getattr(model, name).label('value'), count.label('jobs')), facet_args, model)
+            .group_by(getattr(model, name))
+            for model, _ in sources
+        ])
+
+    def tags(model, links):
+        matching = filter_jobs(db.session.query(model.id), args, model).subquery()
+        return (db.session.query(Tag.name.label('value'), count.label('jobs'))
+                .join(links, links.c.tag_id == Tag.id)
+                .filter(links.c.job_id.in_(select(matching.c.id)))
+                .group_by(Tag.name))
+
+    return {
+        "total": sum(filter_jobs(db.session.query(count).select_from(model), args, model).scalar()
+                     for model, _ in sources),
+        "job_type": grouped('job_type', without(args, 'job_type')),
+        "location": grouped('location', without(args, 'location')),
+        "tags": summed([tags(model, links) for model, links in sources], tag_limit),
+    }
+
+def job_facets(args, filter_jobs, tag_limit=DEFAULT_TAG_FACETS, archived=False):
+    # {"total": n, "job_type": [{"value", "count"}], "location": [...], "tags": [...]}
+    # archived adds the archive's jobs, which the summary tables don't count
+    if not archived and not args.getlist('tag') and args.get('duplicates') != 'hide' and has_summary():
+        return summary_facets(args, tag_limit)
+    return grouped_facets(args, tag_limit, filter_jobs, archived)
@@ -0,0 +1,154 @@
+from datetime import datetime
+from sqlalchemy import bindparam, delete, insert, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from backend import db
+from backend.dedupe import index_jobs
+from backend.models import Job, content_hash, job_tags, tag_ids, tag_key, unique_tags
+
+# Columns refreshed when a re-scraped listing has changed. posting_date is
+# kept from the first sighting so a listing doesn't jump around the feed.
+UPSERT_COLUMNS = ["title", "company", "location", "job_type", "tags", "content_hash"]
+
+def parse_tags(value):
+    # Accept tags as list or comma-separated string
+    if isinstance(value, str):
+        value = value.split(",")
+    value = value or []
+    if not isinstance(value, list) or not all(isinstance(t, str) for t in value):
+        raise ValueError("\"tags\" must be a list of strings or a comma-separated string")
+    return unique_tags(value)
+
+def text_field(data, key, default=None):
+    # A string field of a job payload, default when missing or null. Other
+    # types raise ValueError (a 400) rather than failing in content_hash or
+    # the database driver.
+    value = data.get(key)
+    if value is None:
+        return default
+    if not isinstance(value, str):
+        raise ValueError(f"\"{key}\" must be a string")
+    return value
+
+def normalize_job(data):
+    # Validate a create payload and return (column values, tag names)
+    if not isinstance(data, dict):
+        raise ValueError("Invalid job payload")
+    if not data.get("title") or not data.get("company") or not data.get("location"):
+        raise ValueError("Missing required fields")
+
+    # Parse posting_date if it's a string
+    posting_date = data.get("posting_date")
+    if posting_date is not None and not isinstance(posting_date, str):
+        raise ValueError("\"posting_date\" must be an ISO date string")
+    if isinstance(posting_date, str):
+        try:
+            posting_date = datetime.fromisoformat(posting_date)
+        except ValueError:
+            posting_date = datetime.utcnow()
+    # Pagination cursors are keyed on posting_date, so it must never be NULL
+    if posting_date is None:
+        posting_date = datetime.utcnow()
+
+    tags = parse_tags(data.get("tags"))
+    fields = {
+        "title": text_field(data, "title"),
+        "company": text_field(data, "company"),
+        "location": text_field(data, "location"),
+        "posting_date": posting_date,
+        "job_type": text_field(data, "job_type", "Full-time"),
+        "tags": ",".join(tags),
+        "source_url": text_field(data, "job_url") or None,
+    }
+    fields["content_hash"] = content_hash(fields["title"], fields["company"], fields["location"],
+                                          fields["job_type"], tags)
+    return fields, tags
+
+def upsert_statement():
+    # INSERT ... ON CONFLICT (source_url) DO UPDATE, skipping the write (and
+    # the RETURNING row) when the content hash is unchanged
+    dialect = {"sqlite": sqlite, "postgresql": postgresql}.get(db.engine.dialect.name)
+    if dialect is None:
+        raise NotImplementedError(f"Upsert is not supported on {db.engine.dialect.name}")
+    stmt = dialect.insert(Job)
+    return stmt.on_conflict_do_update(
+        index_elements=[Job.source_url],
+        set_={**{column: stmt.excluded[column] for column in UPSERT_COLUMNS},
+              "updated_at": datetime.utcnow()},
+        where=Job.content_hash.is_distinct_from(stmt.excluded.content_hash),
+    )
+
+def link_tags(jobs):
+    # jobs maps job id -> tag names; replaces their job_tags rows
+    if not jobs:
+        return
+    db.session.execute(delete(job_tags).where(job_tags.c.job_id.in_(jobs)))
+    ids = tag_ids(tag for tags in jobs.values() for tag in tags)
+    # Spellings of one tag share an id, so link each id once
+    links = [{"job_id": job_id, "tag_id": tag_id}
+             for job_id, tags in jobs.items() for tag_id in dict.fromkeys(ids[tag_key(tag)] for tag in tags)]
+    if links:
+        db.session.execute(insert(job_tags), links)
+
+def refresh_hashes(job_ids):
+    # Recompute content_hash for jobs changed by set-based SQL, which can't
+    # hash in the database
+    table = Job.__table__
+    rows = db.session.execute(
+        select(table.c.id, table.c.title, table.c.company, table.c.location, table.c.job_type, table.c.tags)
+        .where(table.c.id.in_(job_ids))
+    ).all()
+    hashes = [{"job_id": job_id, "content_hash": content_hash(title, company, location, job_type, (tags or "").split(","))}
+              for job_id, title, company, location, job_type, tags in rows]
+    if hashes:
+        db.session.execute(
+            update(table).where(table.c.id == bindparam("job_id"))
+            .values(content_hash=bindparam("content_hash"), updated_at=table.c.updated_at),
+            hashes,
+        )
+
+def write_jobs(batch, dedupe=True):
+    # batch holds (index, fields, tags) from normalize_job. Rows without a
+    # source URL are inserted with one executemany; rows with one are upserted.
+    # Written jobs are (re)indexed for near-duplicate detection unless
+    # dedupe is off (bulk loads that re-cluster afterwards).
+    # Returns {index: (job id, "created" | "updated" | "unchanged")}.
+    results = {}
+    retag = {}
+
+    plain = [item for item in batch if not item[1]["source_url"]]
+    if plain:
+        ids = db.session.scalars(
+            insert(Job).returning(Job.id, sort_by_parameter_order=True),
+            [fields for _, fields, _ in plain],
+        ).all()
+        for (index, _, tags), job_id in zip(plain, ids):
+            results[index] = (job_id, "created")
+            retag[job_id] = tags
+
+    # Last occurrence wins when a batch repeats a URL
+    keyed = {}
+    for item in batch:
+        if item[1]["source_url"]:
+            keyed[item[1]["source_url"]] = item
+    if keyed:
+        existing = dict(db.session.query(Job.source_url, Job.id).filter(Job.source_url.in_(keyed)))
+        rows = db.session.execute(
+            upsert_statement().returning(Job.id, Job.source_url),
+            [fields for _, fields, _ in keyed.values()],
+        ).all()
+        written = {url: job_id for job_id, url in rows}
+        for url, (index, _, tags) in keyed.items():
+            if url in written:
+                results[index] = (written[url], "updated" if url in existing else "created")
+                retag[written[url]] = tags
+            else:
+                results[index] = (existing[url], "unchanged")
+        for index, fields, _ in batch:
+            url = fields["source_url"]
+            if url and index not in results:
+                results[index] = results[keyed[url][0]]
+
+    link_tags(retag)
+    if dedupe:
+        index_jobs(retag)
+    return results
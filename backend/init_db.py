@@ -1,8 +1,122 @@
+from sqlalchemy import MetaData, bindparam, inspect, text, update
+from sqlalchemy.schema import CreateTable
 from backend import create_app, db
+from backend.models import Job, Tag, job_lsh, job_tags, tag_key
+from backend.search import install_fts
+from backend.facets import install_facets
+from backend.retention import reuses_job_ids
 
 app = create_app()
 
+def add_missing_columns():
+    # create_all won't alter existing tables, so add new nullable columns here
+    inspector = inspect(db.engine)
+    with db.engine.begin() as connection:
+        for table in db.metadata.sorted_tables:
+            if not inspector.has_table(table.name):
+                continue
+            existing = {column["name"] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name not in existing:
+                    column_type = column.type.compile(dialect=db.engine.dialect)
+                    connection.execute(text(f'ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}'))
+
+def rebuild_job_table():
+    # Job tables created before ids were AUTOINCREMENT hand the highest id
+    # out again once it is deleted, colliding with archived jobs. SQLite
+    # can't alter that in place, so copy the rows into a new table, swap it
+    # in and recreate the indexes and triggers dropped with the old one.
+    # (Renaming the old table away instead would repoint job_tags at it.)
+    with db.engine.begin() as connection:
+        if not reuses_job_ids(connection):
+            return False
+        columns = ", ".join(column.name for column in Job.__table__.columns)
+        # Left over if an earlier run was interrupted
+        connection.execute(text("DROP TABLE IF EXISTS job_new"))
+        connection.execute(CreateTable(Job.__table__.to_metadata(MetaData(), name="job_new")))
+        connection.execute(text(f"INSERT INTO job_new ({columns}) SELECT {columns} FROM job"))
+        connection.execute(text("DROP TABLE job"))
+        # Triggers on job_tags name job, which doesn't exist for a moment;
+        # the legacy rename leaves the rest of the schema alone
+        connection.execute(text("PRAGMA legacy_alter_table = ON"))
+        connection.execute(text("ALTER TABLE job_new RENAME TO job"))
+        connection.execute(text("PRAGMA legacy_alter_table = OFF"))
+        for index in Job.__table__.indexes:
+            index.create(bind=connection)
+        install_fts(connection)
+        install_facets(connection)
+    return True
+
+def seed_job_sequence():
+    # Start new job ids above every id already used, archived ones included
+    if db.engine.dialect.name != "sqlite":
+        return
+    with db.engine.begin() as connection:
+        top = connection.execute(text(
+            "SELECT max(id) FROM (SELECT max(id) AS id FROM job UNION ALL SELECT max(id) FROM job_archive "
+            "UNION ALL SELECT seq FROM sqlite_sequence WHERE name = 'job')"
+        )).scalar()
+        if top:
+            connection.execute(text("DELETE FROM sqlite_sequence WHERE name = 'job'"))
+            connection.execute(text("INSERT INTO sqlite_sequence (name, seq) VALUES ('job', :top)"), {"top": top})
+
+def create_missing_indexes():
+    # create_all only creates missing tables, so indexes added to existing
+    # tables have to be created explicitly.
+    for table in db.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=db.engine, checkfirst=True)
+
+def backfill_updated_at():
+    # Rows written before updated_at existed count as updated when posted
+    with db.engine.begin() as connection:
+        return connection.execute(
+            Job.__table__.update().where(Job.updated_at.is_(None)).values(updated_at=Job.posting_date)
+        ).rowcount
+
+def backfill_tag_keys():
+    # Tags created before case-insensitive matching have no name_key yet
+    tags = Tag.__table__
+    rows = [{"tag_id": tag_id, "key": tag_key(name)}
+            for tag_id, name in db.session.query(Tag.id, Tag.name).filter(Tag.name_key.is_(None))]
+    if rows:
+        db.session.execute(update(tags).where(tags.c.id == bindparam("tag_id")).values(name_key=bindparam("key")), rows)
+        db.session.commit()
+    return len(rows)
+
+def migrate_csv_tags(batch_size=1000):
+    # Populate the tags/job_tags tables from the legacy comma-joined column
+    # for jobs that have not been linked yet.
+    linked = db.session.query(job_tags.c.job_id)
+    query = Job.query.filter(Job.tags.isnot(None), Job.tags != "", Job.id.notin_(linked))
+    migrated = 0
+    while True:
+        jobs = query.order_by(Job.id).limit(batch_size).all()
+        if not jobs:
+            break
+        for job in jobs:
+            job.set_tags(job.tags.split(","))
+        db.session.commit()
+        migrated += len(jobs)
+    return migrated
+
 if __name__ == "__main__":
     with app.app_context():
         db.create_all()
-        print("✅ Database initialized.")
\ No newline at end of file
+        add_missing_columns()
+        if rebuild_job_table():
+            print("✅ Rebuilt the job table so deleted ids are never reused.")
+        seed_job_sequence()
+        backfill_updated_at()
+        backfill_tag_keys()
+        create_missing_indexes()
+        with db.engine.begin() as connection:
+            install_fts(connection)
+            install_facets(connection)
+        print("✅ Database initialized.")
+        migrated = migrate_csv_tags()
+        if migrated:
+            print(f"✅ Migrated tags for {migrated} jobs.")
+        # Jobs stored before near-duplicate detection aren't in its index yet
+        if db.session.query(Job.id).first() and not db.session.query(job_lsh).first():
+            print("ℹ️ Run python -m backend.dedupe to group existing near-duplicate jobs.")
@@ -0,0 +1,234 @@
+# Offline bulk loader: streams NDJSON, CSV or saved scraper output straight
+# into the job table, without going through the HTTP API.
+#
+# Rows get the same normalization and upsert-on-URL as POST /jobs/bulk and
+# are written in large transactions. On SQLite the secondary indexes and the
+# search/facet triggers are dropped for the load and rebuilt once at the end,
+# or when the load stops early.
+# After each commit the position is saved to the checkpoint file, so a run
+# that stops part-way carries on from there when started again.
+#
+#   python -m backend.load_jobs jobs.ndjson export.csv scraper/failed_jobs.ndjson
+#   python -m backend.load_jobs big.ndjson --offset 250000 --commit-every 100000
+import argparse
+import csv
+import itertools
+import json
+import os
+import re
+import sys
+import time
+
+from sqlalchemy import text
+
+from backend import create_app, db
+from backend.cache import invalidate_jobs
+from backend.changes import log_changes
+from backend.facets import install_facets
+from backend.ingest import normalize_job, write_jobs
+from backend.search import install_fts
+
+# The upsert's conflict target has to stay; primary keys are never dropped
+KEEP_INDEXES = {"ux_job_source_url"}
+IF_NOT_EXISTS = re.compile(r"^\s*CREATE\s+(UNIQUE\s+)?(INDEX|TRIGGER)\s+(?!IF\s+NOT\s+EXISTS)", re.IGNORECASE)
+
+def read_records(path, fmt=None):
+    # Yield one payload dict per record. Dead-letter lines from the scraper
+    # ({"payload": ..., "error": ...}) are unwrapped; lines that don't parse
+    # come through as a ValueError so they are counted, not fatal.
+    fmt = fmt or {".csv": "csv", ".json": "json"}.get(os.path.splitext(path)[1].lower(), "ndjson")
+    f = sys.stdin if path == "-" else open(path, encoding="utf-8", newline="")
+    try:
+        if fmt == "csv":
+            yield from csv.DictReader(f)
+        elif fmt == "json":
+            data = json.load(f)
+            yield from (unwrap(item) for item in (data if isinstance(data, list) else [data]))
+        else:
+            for line in f:
+                if not line.strip():
+                    continue
+                try:
+                    yield unwrap(json.loads(line))
+                except ValueError:
+                    yield ValueError("Invalid JSON")
+    finally:
+        if f is not sys.stdin:
+            f.close()
+
+def unwrap(item):
+    if isinstance(item, dict) and isinstance(item.get("payload"), dict):
+        return item["payload"]
+    return item
+
+def deferred_ddl(connection):
+    # CREATE statements of the indexes and triggers that can wait until the
+    # rows are in
+    rows = connection.execute(text(
+        "SELECT type, name, sql FROM sqlite_master WHERE type IN ('index', 'trigger') "
+        "AND tbl_name IN ('job', 'job_tags') AND sql IS NOT NULL"
+    ))
+    return [(kind, name, sql) for kind, name, sql in rows if name not in KEEP_INDEXES]
+
+def drop_deferred(connection, ddl):
+    for kind, name, _ in ddl:
+        connection.execute(text(f'DROP {kind.upper()} IF EXISTS "{name}"'))
+
+def restore_deferred(connection, ddl):
+    # Recreate what was dropped, then rebuild the trigger-maintained tables
+    # from scratch in place of the per-row trigger work that was skipped
+    for _, _, sql in ddl:
+        connection.execute(text(IF_NOT_EXISTS.sub(r"\g<0>IF NOT EXISTS ", sql, count=1)))
+    install_fts(connection, rebuild=True)
+    install_facets(connection, rebuild=True)
+
+def restore(ddl):
+    rebuild_start = time.perf_counter()
+    with db.engine.begin() as connection:
+        restore_deferred(connection, ddl)
+    print(f"🔨 Rebuilt indexes, search and facets in {time.perf_counter() - rebuild_start:.1f}s",
+          file=sys.stderr)
+
+def load_checkpoint(path):
+    if path and os.path.exists(path):
+        with open(path) as f:
+            return json.load(f)
+    return {}
+
+def save_checkpoint(path, checkpoint):
+    if not path:
+        return
+    with open(f"{path}.tmp", "w") as f:
+        json.dump(checkpoint, f)
+    os.replace(f"{path}.tmp", path)
+
+def load(paths, fmt=None, offset=0, batch_size=5000, commit_every=50000, defer=True,
+         change_log=True, dedupe=True, checkpoint_path=None):
+    # Returns counts plus elapsed seconds and rows/sec
+    stats = {"read": 0, "created": 0, "updated": 0, "unchanged": 0, "rejected": 0}
+    checkpoint = load_checkpoint(checkpoint_path)
+    checkpoint["paths"] = list(paths)
+    defer = defer and db.engine.dialect.name == "sqlite"
+
+    ddl = [tuple(item) for item in checkpoint.get("deferred", [])]
+    if defer:
+        with db.engine.begin() as connection:
+            current = deferred_ddl(connection)
+            drop_deferred(connection, current)
+        # A resumed run finds them already dropped; keep the saved statements
+        known = {name for _, name, _ in ddl}
+        ddl += [item for item in current if item[1] not in known]
+        checkpoint["deferred"] = ddl
+        save_checkpoint(checkpoint_path, checkpoint)
+        print(f"⏸️ Deferred {len(ddl)} indexes/triggers until the load finishes", file=sys.stderr)
+
+    records = itertools.chain.from_iterable(read_records(path, fmt) for path in paths)
+    position = offset
+    start = time.perf_counter()
+    uncommitted = 0
+    batch = []
+
+    def flush():
+        written = write_jobs(batch, dedupe=dedupe)
+        for _, action in written.values():
+            stats[action] += 1
+        if change_log:
+            log_changes(dict.fromkeys((job_id, "insert" if action == "created" else "update")
+                                      for job_id, action in written.values() if action != "unchanged"))
+        batch.clear()
+
+    def commit():
+        # The checkpoint may only cover records that are actually written
+        if batch:
+            flush()
+        db.session.commit()
+        checkpoint["offset"] = position
+        save_checkpoint(checkpoint_path, checkpoint)
+        elapsed = time.perf_counter() - start
+        print(f"📦 {position} records ({stats['read'] / elapsed:,.0f}/s), "
+              f"{stats['created']} created, {stats['updated']} updated, {stats['rejected']} rejected",
+              file=sys.stderr)
+
+    try:
+        for item in itertools.islice(records, offset, None):
+            position += 1
+            stats["read"] += 1
+            try:
+                if isinstance(item, Exception):
+                    raise item
+                fields, tags = normalize_job(item)
+            except ValueError as e:
+                stats["rejected"] += 1
+                if stats["rejected"] <= 10:
+                    print(f"⚠️ Record {position - 1}: {e}", file=sys.stderr)
+                continue
+            batch.append((position - 1, fields, tags))
+            uncommitted += 1
+            if len(batch) >= batch_size:
+                flush()
+            if uncommitted >= commit_every:
+                commit()
+                uncommitted = 0
+        commit()
+    except BaseException:
+        db.session.rollback()
+        # Don't leave the API without its indexes and search/facet triggers
+        # until the rerun; resuming drops them again
+        if ddl:
+            try:
+                restore(ddl)
+            except Exception as e:
+                print(f"⚠️ Could not restore the deferred indexes and triggers ({e}). Search and facets "
+                      "are not maintained until this load is rerun to completion.", file=sys.stderr)
+        print(f"💥 Stopped; rerun the same command to resume from record {checkpoint.get('offset', offset)}",
+              file=sys.stderr)
+        raise
+
+    if ddl:
+        restore(ddl)
+    if checkpoint_path and os.path.exists(checkpoint_path):
+        os.remove(checkpoint_path)
+    if stats["created"] or stats["updated"]:
+        invalidate_jobs()
+
+    elapsed = time.perf_counter() - start
+    stats["elapsed_s"] = round(elapsed, 2)
+    stats["rows_per_sec"] = round(stats["read"] / elapsed) if elapsed else 0
+    return stats
+
+def main():
+    parser = argparse.ArgumentParser(description="Load jobs from NDJSON/CSV/JSON files straight into the database")
+    parser.add_argument("paths", nargs="+", help="input files (.ndjson/.jsonl, .csv, .json; - for NDJSON on stdin)")
+    parser.add_argument("--format", choices=["ndjson", "csv", "json"], help="override detection by extension")
+    parser.add_argument("--offset", type=int, help="skip this many records (default: resume from the checkpoint)")
+    parser.add_argument("--batch-size", type=int, default=5000, help="rows per INSERT")
+    parser.add_argument("--commit-every", type=int, default=50000, help="rows per transaction")
+    parser.add_argument("--no-defer", action="store_true",
+                        help="keep indexes and triggers live (faster for small loads into a big table)")
+    parser.add_argument("--no-change-log", action="store_true",
+                        help="don't record the rows in the change feed (clients should reload instead)")
+    parser.add_argument("--no-dedupe", action="store_true",
+                        help="skip near-duplicate grouping (about 4x faster; run python -m backend.dedupe afterwards)")
+    parser.add_argument("--checkpoint", default="load_jobs.checkpoint.json", help="resume state file")
+    options = parser.parse_args()
+
+    app = create_app()
+    with app.app_context():
+        db.create_all()
+        offset = options.offset
+        checkpoint = load_checkpoint(options.checkpoint)
+        if checkpoint.get("paths", options.paths) != options.paths:
+            raise SystemExit(f"{options.checkpoint} belongs to a load of {checkpoint['paths']}; "
+                             "finish that load or delete the file")
+        if offset is None:
+            offset = checkpoint.get("offset", 0)
+            if offset:
+                print(f"⏩ Resuming from record {offset} ({options.checkpoint})", file=sys.stderr)
+        stats = load(options.paths, fmt=options.format, offset=offset, batch_size=options.batch_size,
+                     commit_every=options.commit_every, defer=not options.no_defer,
+                     change_log=not options.no_change_log, dedupe=not options.no_dedupe,
+                     checkpoint_path=options.checkpoint)
+    print(json.dumps(stats))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+import logging
+import threading
+import time
+from bisect import bisect_left
+from flask import Response, g, has_request_context, request
+from sqlalchemy import event
+
+slow_query_log = logging.getLogger("backend.slow_query")
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+STATEMENT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+class Histogram:
+    # Prometheus histogram keyed by label values. Observing is a bisect and
+    # two additions under a lock, cheap enough to leave on for every request.
+    def __init__(self, name, help_text, labels, buckets):
+        self.name = name
+        self.help_text = help_text
+        self.labels = labels
+        self.buckets = buckets
+        self.series = {}
+        self.lock = threading.Lock()
+
+    def observe(self, label_values, value):
+        with self.lock:
+            series = self.series.get(label_values)
+            if series is None:
+                series = self.series[label_values] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][bisect_left(self.buckets, value)] += 1
+            series[1] += value
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self.lock:
+            snapshot = [(labels, list(counts), total) for labels, (counts, total) in self.series.items()]
+        for label_values, counts, total in sorted(snapshot):
+            labels = ",".join(f'{k}="{escape(v)}"' for k, v in zip(self.labels, label_values))
+            cumulative = 0
+            for bound, count in zip(self.buckets + ("+Inf",), counts):
+                cumulative += count
+                lines.append(f'{self.name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+            lines.append(f"{self.name}_sum{{{labels}}} {total}")
+            lines.append(f"{self.name}_count{{{labels}}} {cumulative}")
+        return lines
+
+def escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+# Per-process registry. Under backend.serve each worker keeps its own
+# numbers, so scrape every worker (or run one) for a complete picture.
+REQUEST_LATENCY = Histogram("http_request_duration_seconds", "Request latency, including streamed bodies",
+                            ("endpoint", "method", "status"), LATENCY_BUCKETS)
+RESPONSE_SIZE = Histogram("http_response_size_bytes", "Response body size",
+                          ("endpoint", "method"), SIZE_BUCKETS)
+SQL_STATEMENTS = Histogram("db_statements_per_request", "SQL statements executed per request",
+                           ("endpoint", "method"), STATEMENT_BUCKETS)
+SQL_TIME = Histogram("db_time_per_request_seconds", "Time spent in SQL statements per request",
+                     ("endpoint", "method"), LATENCY_BUCKETS)
+REGISTRY = [REQUEST_LATENCY, RESPONSE_SIZE, SQL_STATEMENTS, SQL_TIME]
+
+def endpoint_label():
+    # The route pattern (/jobs/<int:job_id>), not the raw path, keeps the
+    # number of series bounded
+    return request.url_rule.rule if request.url_rule else "unmatched"
+
+def record(state):
+    labels = (state["endpoint"], state["method"])
+    REQUEST_LATENCY.observe(labels + (str(state["status"]),), time.perf_counter() - state["start"])
+    RESPONSE_SIZE.observe(labels, state["size"])
+    SQL_STATEMENTS.observe(labels, state["statements"])
+    SQL_TIME.observe(labels, state["sql_time"])
+
+def counted(chunks, state):
+    # Pass a streamed body through, adding up its size, and record the
+    # request once the body is finished (statements run while streaming
+    # are still counted against it through g)
+    try:
+        for chunk in chunks:
+            state["size"] += len(chunk)
+            yield chunk
+    finally:
+        record(state)
+
+def before_request():
+    g.metrics = {"start": time.perf_counter(), "statements": 0, "sql_time": 0.0, "size": 0, "status": 500,
+                 "endpoint": endpoint_label(), "method": request.method, "streamed": False}
+
+def after_request(response):
+    state = g.get("metrics")
+    if state is not None:
+        state["status"] = response.status_code
+        if response.is_streamed:
+            state["streamed"] = True
+            response.response = counted(response.response, state)
+        else:
+            state["size"] = response.content_length or 0
+    return response
+
+def teardown_request(exc):
+    # Streamed responses are recorded by counted() instead, since teardown
+    # can run before their body has been sent
+    state = g.get("metrics")
+    if state is None or state["streamed"]:
+        return
+    g.pop("metrics")
+    record(state)
+
+def instrument_engine(engine, slow_query_ms):
+    threshold = slow_query_ms / 1000 if slow_query_ms else None
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def start_timer(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def stop_timer(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["query_start"].pop()
+        state = g.get("metrics") if has_request_context() else None
+        if state is not None:
+            state["statements"] += 1
+            state["sql_time"] += elapsed
+        if threshold is not None and elapsed >= threshold:
+            where = f"{request.method} {request.path}" if has_request_context() else "(no request)"
+            slow_query_log.warning("Slow query (%.1f ms) during %s: %s", elapsed * 1000, where,
+                                   " ".join(statement.split()))
+
+    @event.listens_for(engine, "handle_error")
+    def drop_timer(context):
+        # A failed statement never reaches after_cursor_execute
+        if context.connection is not None and context.connection.info.get("query_start"):
+            context.connection.info["query_start"].pop()
+
+def metrics_view():
+    lines = []
+    for metric in REGISTRY:
+        lines.extend(metric.render())
+    return Response("\n".join(lines) + "\n", mimetype="text/plain; version=0.0.4")
+
+def init_metrics(app, engine):
+    # Request timing, SQL counts/time and response sizes for every request,
+    # exposed in Prometheus text format on /metrics
+    if not app.config["METRICS_ENABLED"]:
+        return
+    app.before_request(before_request)
+    app.after_request(after_request)
+    app.teardown_request(teardown_request)
+    instrument_engine(engine, app.config["SLOW_QUERY_MS"])
+    app.add_url_rule("/metrics", "metrics", metrics_view)
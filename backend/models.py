@@ -1,14 +1,103 @@
+import hashlib
 from datetime import datetime
+from sqlalchemy import func, insert, select
 from backend import db
 
+# Association table, indexed both ways: the primary key serves job -> tags
+# lookups and ix_job_tags_tag_id serves tag -> jobs filtering.
+job_tags = db.Table(
+    'job_tags',
+    db.Column('job_id', db.Integer, db.ForeignKey('job.id', ondelete='CASCADE'), primary_key=True),
+    db.Column('tag_id', db.Integer, db.ForeignKey('tags.id', ondelete='CASCADE'), primary_key=True),
+    db.Index('ix_job_tags_tag_id', 'tag_id', 'job_id'),
+)
+
+# LSH index for near-duplicate detection (see backend.dedupe): one row per
+# band bucket of each job's MinHash signature. Keyed on bucket first so the
+# candidates sharing any of a job's buckets are a handful of primary-key
+# probes; ix_job_lsh_job_id serves replacing or dropping one job's rows.
+job_lsh = db.Table(
+    'job_lsh',
+    db.Column('bucket', db.BigInteger, primary_key=True),
+    db.Column('job_id', db.Integer, db.ForeignKey('job.id', ondelete='CASCADE'), primary_key=True),
+    db.Index('ix_job_lsh_job_id', 'job_id'),
+    sqlite_with_rowid=False,
+)
+
+# Tags match case-insensitively: "python" finds jobs tagged "Python". name
+# keeps the first spelling seen for display; lookups go through name_key.
+def tag_key(name):
+    return name.casefold()
+
+def unique_tags(names):
+    # Stripped, non-empty names with case-insensitive repeats dropped
+    unique = {}
+    for name in names:
+        if name and name.strip():
+            unique.setdefault(tag_key(name.strip()), name.strip())
+    return list(unique.values())
+
+class Tag(db.Model):
+    __tablename__ = 'tags'
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(50), nullable=False, unique=True)
+    # Not unique: databases from before case-insensitive matching can hold
+    # several spellings of one tag
+    name_key = db.Column(db.String(50), index=True,
+                         default=lambda context: tag_key(context.get_current_parameters()["name"]))
+
 class Job(db.Model):
+    # Composite indexes matching the get_jobs filter/sort combinations. Each
+    # ends in posting_date (with the rowid id implicitly appended) so the
+    # ORDER BY posting_date, id and the keyset seek are served by the index
+    # instead of a sort over every matching row.
+    __table_args__ = (
+        db.Index('ix_job_posting_date', 'posting_date'),
+        db.Index('ix_job_job_type_posting_date', 'job_type', 'posting_date'),
+        db.Index('ix_job_location_posting_date', 'location', 'posting_date'),
+        db.Index('ix_job_job_type_location_posting_date', 'job_type', 'location', 'posting_date'),
+        # Re-scrapes upsert on the listing URL instead of inserting duplicates
+        db.Index('ux_job_source_url', 'source_url', unique=True),
+        # Incremental exports seek on (updated_at, id)
+        db.Index('ix_job_updated_at', 'updated_at'),
+        # Near-duplicate groups are looked up by their canonical job
+        db.Index('ix_job_duplicate_of', 'duplicate_of'),
+        # Ids are never handed out twice, even after the highest one is
+        # deleted: archived jobs keep theirs (see backend.retention)
+        {'sqlite_autoincrement': True},
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(120), nullable=False)
     company = db.Column(db.String(120), nullable=False)
     location = db.Column(db.String(120), nullable=False)
     posting_date = db.Column(db.DateTime, default=datetime.utcnow)
     job_type = db.Column(db.String(50), nullable=False)
+    # Comma-joined copy of tag_objects kept for serialization; filtering goes
+    # through the job_tags association instead.
     tags = db.Column(db.String(300))
+    tag_objects = db.relationship('Tag', secondary=job_tags, backref='jobs')
+    source_url = db.Column(db.String(500))
+    content_hash = db.Column(db.String(40))
+    # Last time the row was written; bulk upserts set it explicitly since
+    # ON CONFLICT DO UPDATE doesn't apply onupdate
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    # Id of the earliest job this one is a near-duplicate of (the canonical
+    # listing of its group), NULL for canonical and unique listings
+    duplicate_of = db.Column(db.Integer)
+
+    def set_tags(self, names):
+        names = unique_tags(names)
+        keys = [tag_key(n) for n in names]
+        # Descending, so the oldest spelling of a key wins
+        existing = ({t.name_key: t for t in Tag.query.filter(Tag.name_key.in_(keys)).order_by(Tag.id.desc())}
+                    if names else {})
+        self.tag_objects = [existing.get(key) or Tag(name=n) for n, key in zip(names, keys)]
+        self.tags = ",".join(names)
+
+    def refresh_hash(self):
+        self.content_hash = content_hash(self.title, self.company, self.location,
+                                         self.job_type, (self.tags or "").split(","))
 
     def to_dict(self):
         return {
@@ -20,3 +109,95 @@ class Job(db.Model):
             "job_type": self.job_type,
             "tags": self.tags.split(",") if self.tags else []
         }
+
+# Cold storage for jobs moved out of the hot tables by the retention policy
+# (backend.retention). Rows keep their job id, so cursors, links and the
+# change log still refer to the same job; listings only read them with
+# include_archived.
+job_archive_tags = db.Table(
+    'job_archive_tags',
+    db.Column('job_id', db.Integer, db.ForeignKey('job_archive.id', ondelete='CASCADE'), primary_key=True),
+    db.Column('tag_id', db.Integer, db.ForeignKey('tags.id', ondelete='CASCADE'), primary_key=True),
+    db.Index('ix_job_archive_tags_tag_id', 'tag_id', 'job_id'),
+)
+
+class ArchivedJob(db.Model):
+    __tablename__ = 'job_archive'
+    __table_args__ = (
+        db.Index('ix_job_archive_posting_date', 'posting_date'),
+        db.Index('ix_job_archive_updated_at', 'updated_at'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    title = db.Column(db.String(120), nullable=False)
+    company = db.Column(db.String(120), nullable=False)
+    location = db.Column(db.String(120), nullable=False)
+    posting_date = db.Column(db.DateTime)
+    job_type = db.Column(db.String(50), nullable=False)
+    tags = db.Column(db.String(300))
+    source_url = db.Column(db.String(500))
+    content_hash = db.Column(db.String(40))
+    updated_at = db.Column(db.DateTime)
+    duplicate_of = db.Column(db.Integer)
+    archived_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+
+    # Same JSON as a live job
+    to_dict = Job.to_dict
+
+class JobChange(db.Model):
+    # Append-only log of job writes for clients following changes. seq only
+    # grows (AUTOINCREMENT never reuses a deleted id), so "everything after
+    # the last seq I saw" is a primary-key range scan.
+    __tablename__ = 'job_changes'
+    __table_args__ = {'sqlite_autoincrement': True}
+
+    seq = db.Column(db.Integer, primary_key=True)
+    job_id = db.Column(db.Integer, nullable=False)
+    op = db.Column(db.String(10), nullable=False)  # insert | update | delete
+    changed_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+
+# Fingerprint of the listing content used to skip no-op re-scrapes. Tags are
+# sorted because scrapers don't emit them in a stable order, and spellings
+# that differ only in case count once, as they do in job_tags; posting_date
+# is left out since it is derived from relative "N days ago" text. The
+# scraper mirrors this in ActuaryJobScraper.content_hash and stub_api, keep
+# them in step.
+def content_hash(title, company, location, job_type, tags):
+    tags = ",".join(sorted(unique_tags(tags)))
+    raw = "\x1f".join([title, company, location, job_type, tags])
+    return hashlib.sha1(raw.encode()).hexdigest()
+
+# Ids of jobs carrying any (or, with match_all, every one) of the given tags,
+# compared case-insensitively; links=job_archive_tags asks the same of
+# archived jobs
+def job_ids_with_tags(names, match_all=True, links=job_tags):
+    keys = {tag_key(name) for name in names}
+    query = (
+        select(links.c.job_id)
+        .join(Tag, Tag.id == links.c.tag_id)
+        .where(Tag.name_key.in_(keys))
+    )
+    if match_all:
+        query = query.group_by(links.c.job_id).having(
+            func.count(func.distinct(Tag.name_key)) == len(keys)
+        )
+    return query
+
+# Map tag keys (see tag_key) to ids, inserting any tags that don't exist yet
+def tag_ids(names):
+    spellings = {}
+    for name in names:
+        spellings.setdefault(tag_key(name), name)
+    if not spellings:
+        return {}
+
+    def lookup(keys):
+        return (db.session.query(Tag.name_key, func.min(Tag.id))
+                .filter(Tag.name_key.in_(keys)).group_by(Tag.name_key))
+
+    ids = dict(lookup(spellings))
+    missing = spellings.keys() - ids.keys()
+    if missing:
+        db.session.execute(insert(Tag), [{"name": spellings[key]} for key in missing])
+        ids.update(lookup(missing))
+    return ids
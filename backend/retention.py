@@ -0,0 +1,194 @@
+# Retention policy: moves postings older than a cutoff out of the hot job
+# tables into job_archive, prunes old change log entries, then compacts the
+# database file.
+#
+# Archived jobs keep their ids, which is safe because job ids are
+# AUTOINCREMENT and never reused; databases whose job table predates that
+# need python -m backend.init_db first.
+#
+# Jobs move in short batches, one transaction each, so the API keeps
+# writing in between. A moved job is copied to job_archive/job_archive_tags,
+# deleted from job/job_tags (the search and facet triggers follow), dropped
+# from the near-duplicate index and logged as a delete in the change feed.
+# Change log entries older than CHANGE_LOG_DAYS are deleted the same way;
+# clients that were further behind are told to reload.
+# Compaction hands free pages back to the filesystem with incremental
+# VACUUM, refreshes the planner statistics with a bounded ANALYZE and
+# truncates the WAL, keeping the hot tables small enough for the page cache.
+#
+#   python -m backend.retention --days 180                   # once, e.g. from cron
+#   python -m backend.retention --days 180 --interval 86400  # daily, until Ctrl+C
+#   python -m backend.retention --change-log-days 3           # prune the change log only
+import argparse
+import json
+import signal
+import sys
+import threading
+import time
+from datetime import datetime, timedelta
+from flask import current_app
+from sqlalchemy import delete, insert, literal, select, text
+from sqlalchemy.exc import OperationalError
+from backend import db
+from backend.cache import invalidate_jobs
+from backend.changes import log_changes, prune_changes
+from backend.dedupe import forget_jobs
+from backend.models import ArchivedJob, Job, job_archive_tags, job_tags
+
+ARCHIVE_BATCH = 1000
+# Job columns copied into the archive; archived_at is filled in on the move
+ARCHIVE_COLUMNS = [column.name for column in ArchivedJob.__table__.columns if column.name != "archived_at"]
+# Free pages released per incremental VACUUM step, each its own short write
+VACUUM_STEP_PAGES = 2048
+# Rows ANALYZE samples per index; enough for the planner, cheap on big tables
+ANALYSIS_LIMIT = 1000
+
+def reuses_job_ids(connection):
+    # Whether the SQLite job table was created without AUTOINCREMENT, so a
+    # new job can get the id of a deleted (or archived) one
+    if connection.dialect.name != "sqlite":
+        return False
+    sql = connection.execute(text("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'job'")).scalar()
+    return sql is not None and "AUTOINCREMENT" not in sql.upper()
+
+def archive_batch(cutoff, batch_size=ARCHIVE_BATCH):
+    # Move up to batch_size jobs posted before cutoff, oldest first, and
+    # return how many moved
+    job_ids = db.session.scalars(
+        select(Job.id).where(Job.posting_date < cutoff).order_by(Job.posting_date).limit(batch_size)
+    ).all()
+    if not job_ids:
+        return 0
+
+    table = Job.__table__
+    db.session.execute(insert(ArchivedJob.__table__).from_select(
+        ARCHIVE_COLUMNS + ["archived_at"],
+        select(*[table.c[name] for name in ARCHIVE_COLUMNS], literal(datetime.utcnow())).where(table.c.id.in_(job_ids)),
+    ))
+    db.session.execute(insert(job_archive_tags).from_select(
+        ["job_id", "tag_id"], select(job_tags.c.job_id, job_tags.c.tag_id).where(job_tags.c.job_id.in_(job_ids))
+    ))
+    db.session.execute(delete(table).where(table.c.id.in_(job_ids)))
+    db.session.execute(delete(job_tags).where(job_tags.c.job_id.in_(job_ids)))
+    forget_jobs(job_ids)
+    log_changes((job_id, "delete") for job_id in job_ids)
+    db.session.commit()
+    return len(job_ids)
+
+def archive_jobs(cutoff, batch_size=ARCHIVE_BATCH, stop=None):
+    # Archive every job posted before cutoff (until stop is set)
+    if reuses_job_ids(db.session.connection()):
+        raise RuntimeError("The job table reuses deleted ids; run python -m backend.init_db before archiving")
+    moved = 0
+    while stop is None or not stop.is_set():
+        count = archive_batch(cutoff, batch_size)
+        moved += count
+        if count < batch_size:
+            break
+    if moved:
+        invalidate_jobs()
+    return moved
+
+def hot_bytes(connection):
+    # Bytes in the job and job_tags tables and their indexes; None when
+    # SQLite was built without the dbstat table
+    try:
+        return connection.execute(text(
+            "SELECT sum(pgsize) FROM dbstat WHERE name IN "
+            "(SELECT name FROM sqlite_master WHERE tbl_name IN ('job', 'job_tags'))"
+        )).scalar()
+    except OperationalError:
+        return None
+
+def compact(step_pages=VACUUM_STEP_PAGES, analysis_limit=ANALYSIS_LIMIT):
+    # Release free pages and refresh statistics. Returns page counts before
+    # and after, plus the size of the hot tables.
+    if db.engine.dialect.name != "sqlite":
+        # Servers reclaim space with their own autovacuum
+        with db.engine.begin() as connection:
+            connection.execute(text("ANALYZE"))
+        return {"analyzed": True}
+
+    with db.engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+        def pragma(name):
+            return connection.execute(text(f"PRAGMA {name}")).scalar()
+
+        stats = {"pages_before": pragma("page_count"), "free_pages_before": pragma("freelist_count")}
+        if pragma("auto_vacuum") != 2:
+            # Files created before incremental auto-vacuum was switched on
+            # need one full VACUUM to convert; later runs are incremental
+            connection.execute(text("PRAGMA auto_vacuum = INCREMENTAL"))
+            connection.execute(text("VACUUM"))
+            stats["converted"] = True
+        # pysqlite steps a PRAGMA only once (one page); executescript runs
+        # each step to completion
+        raw = connection.connection.driver_connection
+        while pragma("freelist_count"):
+            raw.executescript(f"PRAGMA incremental_vacuum({int(step_pages)});")
+        connection.execute(text(f"PRAGMA analysis_limit = {int(analysis_limit)}"))
+        connection.execute(text("ANALYZE"))
+        connection.execute(text("PRAGMA wal_checkpoint(TRUNCATE)"))
+        stats["pages"] = pragma("page_count")
+        stats["page_size"] = pragma("page_size")
+        stats["hot_bytes"] = hot_bytes(connection)
+    return stats
+
+def run_retention(days, batch_size=ARCHIVE_BATCH, compaction=True, stop=None, change_log_days=0):
+    # days=0 skips archiving, change_log_days=0 keeps the whole change log
+    result = {}
+    if days:
+        cutoff = datetime.utcnow() - timedelta(days=days)
+        start = time.perf_counter()
+        result = {"cutoff": cutoff.isoformat(), "archived": archive_jobs(cutoff, batch_size, stop)}
+        result["archive_s"] = round(time.perf_counter() - start, 2)
+    if change_log_days and (stop is None or not stop.is_set()):
+        result["changes_pruned"] = prune_changes(change_log_days)
+    if compaction and (stop is None or not stop.is_set()):
+        start = time.perf_counter()
+        result.update(compact())
+        result["compact_s"] = round(time.perf_counter() - start, 2)
+        cache_bytes = current_app.config["SQLITE_MMAP_SIZE"]
+        if result.get("hot_bytes") and result["hot_bytes"] > cache_bytes:
+            print(f"⚠️ Hot tables are {result['hot_bytes'] / 2**20:.0f} MB, more than SQLITE_MMAP_SIZE "
+                  f"({cache_bytes / 2**20:.0f} MB); lower --days or raise SQLITE_MMAP_SIZE", file=sys.stderr)
+    return result
+
+def main():
+    parser = argparse.ArgumentParser(description="Archive old postings and compact the database")
+    parser.add_argument("--days", type=int, help="archive jobs posted more than this many days ago "
+                                                 "(default: RETENTION_DAYS)")
+    parser.add_argument("--change-log-days", type=int, help="prune change log entries older than this many days "
+                                                            "(default: CHANGE_LOG_DAYS, 0 keeps them)")
+    parser.add_argument("--batch-size", type=int, default=ARCHIVE_BATCH, help="jobs moved per transaction")
+    parser.add_argument("--interval", type=float, default=0, help="repeat every this many seconds (default: run once)")
+    parser.add_argument("--no-compact", action="store_true", help="skip VACUUM/ANALYZE")
+    options = parser.parse_args()
+
+    from backend import create_app
+    app = create_app()
+    with app.app_context():
+        db.create_all()
+        days = options.days if options.days is not None else app.config["RETENTION_DAYS"]
+        change_log_days = (options.change_log_days if options.change_log_days is not None
+                           else app.config["CHANGE_LOG_DAYS"])
+        if not days and not change_log_days:
+            raise SystemExit("Pass --days or --change-log-days, or set RETENTION_DAYS or CHANGE_LOG_DAYS")
+
+        stop = threading.Event()
+
+        def request_stop(signum, frame):
+            print("🛑 Stopping after the current batch", file=sys.stderr)
+            stop.set()
+
+        signal.signal(signal.SIGINT, request_stop)
+        signal.signal(signal.SIGTERM, request_stop)
+        while not stop.is_set():
+            started = time.monotonic()
+            print(json.dumps(run_retention(days, options.batch_size, not options.no_compact, stop, change_log_days)),
+                  flush=True)
+            if not options.interval:
+                break
+            stop.wait(max(0.0, options.interval - (time.monotonic() - started)))
+
+if __name__ == "__main__":
+    main()
@@ -1,73 +1,524 @@
-from flask import Blueprint, request, jsonify
-from backend.models import Job
+import base64
+import heapq
+import itertools
+import json
+from datetime import datetime
+from flask import Blueprint, current_app, request, jsonify, stream_with_context, url_for
+from backend.models import ArchivedJob, Job, job_archive_tags, job_ids_with_tags, job_tags
+from backend.ingest import link_tags, normalize_job, parse_tags, refresh_hashes, text_field, write_jobs
 from backend import db
-from sqlalchemy import desc, asc
+from backend.search import match_expression, search_jobs
+from backend.facets import DEFAULT_TAG_FACETS, job_facets
+from backend.cache import cached_response, conditional, invalidate_jobs
+from backend.dedupe import chunked, forget_jobs, index_jobs
+from backend.changes import (CHANGE_BATCH, STREAMS_FULL_RETRY_S, behind, changes_since, event_stream, latest_seq,
+                             log_changes, stream_slots)
+from backend.serialize import (ARCHIVE_EXPORT_COLUMNS, ARCHIVE_JOB_COLUMNS, EXPORT_COLUMNS, JOB_COLUMNS,
+                               csv_chunks, json_array, ndjson_chunks, row_dict)
+from sqlalchemy import and_, delete, desc, asc, func, or_, select, tuple_, update
+from werkzeug.datastructures import MultiDict
 
 job_routes = Blueprint('job_routes', __name__)
 
-@job_routes.route('/jobs', methods=['GET'])
-def get_jobs():
-    job_type = request.args.get('job_type')
-    location = request.args.get('location')
-    tag = request.args.get('tag')
-    sort = request.args.get('sort', 'posting_date_desc')
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+BULK_BATCH_SIZE = 500
+EXPORT_YIELD_PER = 1000
+# Batch update/delete: ids per request (larger sets go through a filter),
+# the get_jobs filters a batch may select by, and ids shown by a dry run
+BATCH_MAX_IDS = 10000
+BATCH_FILTERS = ("job_type", "location", "tag", "tag_mode")
+BATCH_UPDATE_FIELDS = ("title", "company", "location", "job_type", "tags")
+DRY_RUN_IDS = 100
+EXPORT_FORMATS = {
+    "ndjson": (ndjson_chunks, "application/x-ndjson"),
+    "csv": (csv_chunks, "text/csv"),
+}
+
+def encode_cursor(*values):
+    raw = "|".join(str(v) for v in values)
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
 
-    query = Job.query
+def decode_cursor(cursor):
+    padded = cursor + "=" * (-len(cursor) % 4)
+    return base64.urlsafe_b64decode(padded).decode().split("|")
+
+def filter_jobs(query, args, model=Job):
+    # Apply the job_type/location/tag/duplicates filters shared by the listing
+    # endpoints; model=ArchivedJob filters the archive table the same way
+    job_type = args.get('job_type')
+    location = args.get('location')
+    tags = parse_tags(",".join(args.getlist('tag')))
+    tag_mode = args.get('tag_mode', 'all')
 
     if job_type:
-        query = query.filter_by(job_type=job_type)
+        query = query.filter(model.job_type == job_type)
     if location:
-        query = query.filter_by(location=location)
-    if tag:
-        query = query.filter(Job.tags.like(f"%{tag}%"))
+        query = query.filter(model.location == location)
+    if tags:
+        links = job_archive_tags if model is ArchivedJob else job_tags
+        query = query.filter(model.id.in_(job_ids_with_tags(tags, match_all=tag_mode != 'any', links=links)))
+    if args.get('duplicates') == 'hide':
+        # Near-duplicates collapse into the canonical listing of their group
+        query = query.filter(model.duplicate_of.is_(None))
+    return query
+
+def order_jobs(query, sort, after=None, model=Job):
+    # Keyset pagination on (posting_date, id): each page seeks past the last
+    # row of the previous one instead of using OFFSET, so deep pages stay cheap.
+    key = tuple_(model.posting_date, model.id)
+    if after:
+        query = query.filter(key > after if sort == 'posting_date_asc' else key < after)
 
     if sort == 'posting_date_asc':
-        query = query.order_by(asc(Job.posting_date))
+        return query.order_by(asc(model.posting_date), asc(model.id))
+    return query.order_by(desc(model.posting_date), desc(model.id))
+
+def include_archived():
+    return request.args.get('include_archived', '').lower() in ('1', 'true', 'yes')
+
+def listing_rows(args, sort, after, limit, archived=False):
+    # Up to limit JOB_COLUMNS rows in listing order. With archived, the
+    # archive table is paged through its own index and merged in, so the
+    # hot table's query plans are the same either way.
+    sources = [(Job, JOB_COLUMNS)]
+    if archived:
+        sources.append((ArchivedJob, ARCHIVE_JOB_COLUMNS))
+    results = [order_jobs(filter_jobs(db.session.query(*columns), args, model), sort, after, model).limit(limit).all()
+               for model, columns in sources]
+    if len(results) == 1:
+        return results[0]
+    merged = heapq.merge(*results, key=lambda row: (row.posting_date, row.id), reverse=sort != 'posting_date_asc')
+    return list(itertools.islice(merged, limit))
+
+def page_args(*types):
+    # Parse limit and the optional cursor, converting cursor parts with types
+    limit = int(request.args.get('limit', DEFAULT_PAGE_SIZE))
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    cursor = request.args.get('cursor')
+    if not cursor:
+        return limit, None
+    try:
+        parts = decode_cursor(cursor)
+    except UnicodeDecodeError:
+        raise ValueError("Invalid cursor")
+    if len(parts) != len(types):
+        raise ValueError("Invalid cursor")
+    return limit, tuple(convert(part) for convert, part in zip(types, parts))
+
+def page_response(rows, limit, cursor_of, endpoint):
+    # Serialize one page of JOB_COLUMNS rows; rows holds up to limit + 1, the
+    # extra one only signalling that another page exists. cursor_of(i) gives
+    # the key of row i. The body is byte-identical to jsonify(to_dict()s).
+    response = current_app.response_class(json_array(rows[:limit]), mimetype="application/json")
+    if len(rows) > limit:
+        next_cursor = encode_cursor(*cursor_of(limit - 1))
+        response.headers['X-Next-Cursor'] = next_cursor
+        args = {**request.args.to_dict(flat=False), 'cursor': next_cursor}
+        next_url = url_for(endpoint, _external=True, **args)
+        response.headers['Link'] = f'<{next_url}>; rel="next"'
+    return response
+
+def listing_cache_key():
+    # Normalized query parameters: key order, repeated-vs-CSV tags and tag
+    # order don't change the result, so they don't change the key either.
+    # The host is included because the Link header is an absolute URL.
+    args = {key: sorted(request.args.getlist(key)) for key in request.args}
+    if 'tag' in args:
+        args['tag'] = sorted(set(parse_tags(",".join(args['tag']))))
+    return json.dumps([request.host_url, request.path, args], sort_keys=True)
+
+@job_routes.route('/jobs', methods=['GET'])
+def get_jobs():
+    sort = request.args.get('sort', 'posting_date_desc')
+    try:
+        limit, after = page_args(datetime.fromisoformat, int)
+    except ValueError:
+        return jsonify({"error": "Invalid limit or cursor"}), 400
+
+    def build():
+        # Read before the rows, so following the change feed from this seq
+        # can only repeat changes the page already shows, never miss one
+        seq = latest_seq()
+        rows = listing_rows(request.args, sort, after, limit + 1, include_archived())
+        response = page_response(rows, limit, lambda i: (rows[i].posting_date.isoformat(), rows[i].id),
+                                 'job_routes.get_jobs')
+        response.headers['X-Change-Seq'] = str(seq)
+        return response
+    return cached_response(listing_cache_key(), build)
+
+@job_routes.route('/jobs/search', methods=['GET'])
+def search():
+    q = request.args.get('q', '').strip()
+    if not match_expression(q):
+        return jsonify({"error": "Missing search query"}), 400
+    if db.engine.dialect.name != 'sqlite':
+        return jsonify({"error": "Full-text search requires SQLite FTS5"}), 501
+    if include_archived():
+        # Only the live table has a full-text index
+        return jsonify({"error": "Search does not cover archived jobs"}), 400
+    try:
+        limit, after = page_args(float, int)
+    except ValueError:
+        return jsonify({"error": "Invalid limit or cursor"}), 400
+
+    query = search_jobs(filter_jobs(db.session.query(*JOB_COLUMNS), request.args), q, after)
+    rows = query.limit(limit + 1).all()
+    return page_response(rows, limit, lambda i: (rows[i].rank, rows[i].id), 'job_routes.search')
+
+@job_routes.route('/jobs/facets', methods=['GET'])
+def get_facets():
+    # Counts per job_type, location and tag for the current filters, for
+    # the filter dropdowns. Each facet ignores its own filter so the other
+    # choices keep their counts.
+    try:
+        tag_limit = max(1, min(int(request.args.get('limit', DEFAULT_TAG_FACETS)), MAX_PAGE_SIZE))
+    except ValueError:
+        return jsonify({"error": "Invalid limit"}), 400
+
+    def build():
+        return jsonify(job_facets(request.args, filter_jobs, tag_limit, include_archived()))
+    return cached_response(listing_cache_key(), build)
+
+@job_routes.route('/jobs/changes', methods=['GET'])
+def get_changes():
+    # Changes after seq `since`, oldest first: {"changes": [{"seq", "op",
+    # "id", "job"}], "last_seq", "has_more"}. reset means entries after
+    # since have been pruned, so the client should reload the list instead.
+    try:
+        since = int(request.args.get('since', 0))
+        limit = max(1, min(int(request.args.get('limit', CHANGE_BATCH)), CHANGE_BATCH))
+    except ValueError:
+        return jsonify({"error": "Invalid since or limit"}), 400
+
+    reset = behind(since)
+    changes = changes_since(since, limit + 1)
+    return jsonify({
+        "changes": changes[:limit],
+        "last_seq": changes[:limit][-1]["seq"] if changes else max(since, latest_seq()),
+        "has_more": len(changes) > limit,
+        "reset": reset,
+    })
+
+@job_routes.route('/jobs/changes/stream', methods=['GET'])
+def stream_changes():
+    # Server-sent events (event: insert | update | delete) from the seq in
+    # Last-Event-ID or ?since, or from now when neither is given. At most
+    # CHANGE_STREAMS_MAX streams per process; past that, 503 + Retry-After
+    # and the client polls /jobs/changes instead.
+    since = request.headers.get('Last-Event-ID') or request.args.get('since')
+    try:
+        since = int(since) if since is not None else latest_seq()
+    except ValueError:
+        return jsonify({"error": "Invalid since"}), 400
+    db.session.close()
+    if not stream_slots.acquire(current_app.config['CHANGE_STREAMS_MAX']):
+        response = jsonify({"error": "Too many open change streams; poll /jobs/changes"})
+        response.headers['Retry-After'] = str(STREAMS_FULL_RETRY_S)
+        return response, 503
+    response = current_app.response_class(stream_with_context(event_stream(since)), mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'
+    # The server closes the response however the stream ends, including
+    # clients that disconnect before the first event
+    response.call_on_close(stream_slots.release)
+    return response
+
+@job_routes.route('/jobs/export', methods=['GET'])
+def export_jobs():
+    # Stream every matching row as NDJSON or CSV. Rows are fetched
+    # EXPORT_YIELD_PER at a time (a server-side cursor on Postgres) and
+    # written out as they arrive, so memory stays flat whatever the table
+    # size. With updated_since, rows updated at or after it come in
+    # (updated_at, id) order; the last row's updated_at seeds the next pull
+    # (inclusive, so a consumer keyed on id never misses a same-instant row).
+    # include_archived merges in the archive table in the same order.
+    fmt = request.args.get('format', 'ndjson')
+    if fmt not in EXPORT_FORMATS:
+        return jsonify({"error": "format must be ndjson or csv"}), 400
+    updated_since = request.args.get('updated_since')
+    if updated_since:
+        try:
+            updated_since = datetime.fromisoformat(updated_since)
+        except ValueError:
+            return jsonify({"error": "Invalid updated_since"}), 400
+
+    sources = [(Job, EXPORT_COLUMNS)]
+    if include_archived():
+        sources.append((ArchivedJob, ARCHIVE_EXPORT_COLUMNS))
+    streams = []
+    for model, columns in sources:
+        query = filter_jobs(db.session.query(*columns), request.args, model)
+        if updated_since:
+            query = query.filter(model.updated_at >= updated_since).order_by(model.updated_at, model.id)
+        else:
+            query = query.order_by(model.id)
+        streams.append(query.yield_per(EXPORT_YIELD_PER))
+    if len(streams) == 1:
+        rows = streams[0]
     else:
-        query = query.order_by(desc(Job.posting_date))
+        rows = heapq.merge(*streams, key=lambda row: (row.updated_at, row.id) if updated_since else row.id)
 
-    jobs = query.all()
-    return jsonify([job.to_dict() for job in jobs])
+    chunks, mimetype = EXPORT_FORMATS[fmt]
+    response = current_app.response_class(stream_with_context(chunks(rows)), mimetype=mimetype)
+    response.headers['Content-Disposition'] = f'attachment; filename=jobs.{fmt}'
+    return response
 
 @job_routes.route('/jobs/<int:job_id>', methods=['GET'])
 def get_job(job_id):
     job = Job.query.get(job_id)
+    if not job and include_archived():
+        job = ArchivedJob.query.get(job_id)
     if not job:
         return jsonify({"error": "Job not found"}), 404
-    return jsonify(job.to_dict())
+    return conditional(jsonify(job.to_dict()))
+
+@job_routes.route('/jobs/<int:job_id>/duplicates', methods=['GET'])
+def get_duplicates(job_id):
+    # The job's near-duplicate group, canonical listing first: {"canonical_id",
+    # "jobs": [...]}. jobs is empty when the listing has no duplicates.
+    job = db.session.get(Job, job_id)
+    if not job:
+        return jsonify({"error": "Job not found"}), 404
+    canonical_id = job.duplicate_of or job.id
+    rows = (db.session.query(*JOB_COLUMNS)
+            .filter(or_(Job.id == canonical_id, Job.duplicate_of == canonical_id))
+            .order_by(Job.id).all())
+    jobs = []
+    if len(rows) > 1:
+        for row in rows:
+            data = row_dict(row)
+            data["posting_date"] = data["posting_date"].isoformat()
+            jobs.append(data)
+    return jsonify({"canonical_id": canonical_id, "jobs": jobs})
 
 @job_routes.route('/jobs', methods=['POST'])
 def create_job():
-    from datetime import datetime
-    data = request.get_json()
-    if not data.get("title") or not data.get("company") or not data.get("location"):
-        return jsonify({"error": "Missing required fields"}), 400
+    try:
+        fields, tags = normalize_job(request.get_json())
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
 
-    # Parse posting_date if it's a string
-    posting_date = data.get("posting_date")
-    if isinstance(posting_date, str):
-        try:
-            posting_date = datetime.fromisoformat(posting_date)
-        except ValueError:
-            posting_date = datetime.utcnow()
-
-    # Accept tags as list or comma-separated string
-    tags = data.get("tags", [])
-    if isinstance(tags, str):
-        tags = [t.strip() for t in tags.split(",") if t.strip()]
-
-    job = Job(
-        title=data["title"],
-        company=data["company"],
-        location=data["location"],
-        posting_date=posting_date,
-        job_type=data.get("job_type", "Full-time"),
-        tags=",".join(tags)
-    )
+    if fields["source_url"]:
+        # Scraped listings are upserted on their URL so re-runs don't duplicate
+        job_id, action = write_jobs([(0, fields, tags)])[0]
+        if action != "unchanged":
+            log_changes([(job_id, "insert" if action == "created" else "update")])
+        db.session.commit()
+        if action != "unchanged":
+            invalidate_jobs()
+        return jsonify(db.session.get(Job, job_id).to_dict()), 201 if action == "created" else 200
+
+    job = Job(**fields)
+    job.set_tags(tags)
     db.session.add(job)
+    db.session.flush()
+    index_jobs([job.id])
+    log_changes([(job.id, "insert")])
     db.session.commit()
+    invalidate_jobs()
     return jsonify(job.to_dict()), 201
 
+def read_bulk_payload():
+    # Yield job payloads from a JSON array body or, for NDJSON, line by line
+    # from the request stream so large uploads are never held in memory.
+    # Lines that fail to parse are yielded as the exception instead.
+    if request.mimetype in ('application/x-ndjson', 'application/jsonl'):
+        for line in request.stream:
+            if not line.strip():
+                continue
+            try:
+                yield json.loads(line)
+            except ValueError:
+                yield ValueError("Invalid JSON")
+        return
+    data = request.get_json(silent=True)
+    if not isinstance(data, list):
+        raise ValueError("Expected a JSON array or NDJSON body")
+    yield from data
+
+@job_routes.route('/jobs/bulk', methods=['POST'])
+def bulk_create_jobs():
+    # Validate every item, insert the valid ones in batches and commit once
+    results = []
+    batch = []
+
+    def flush():
+        written = write_jobs(batch)
+        for index, (job_id, action) in written.items():
+            results.append({"index": index, "status": 201 if action == "created" else 200,
+                            "id": job_id, "action": action})
+        # A URL repeated in the batch maps several indexes to one write
+        log_changes(dict.fromkeys((job_id, "insert" if action == "created" else "update")
+                                  for job_id, action in written.values() if action != "unchanged"))
+        batch.clear()
+
+    try:
+        for index, item in enumerate(read_bulk_payload()):
+            try:
+                if isinstance(item, Exception):
+                    raise item
+                fields, tags = normalize_job(item)
+            except ValueError as e:
+                results.append({"index": index, "status": 400, "error": str(e)})
+                continue
+            batch.append((index, fields, tags))
+            if len(batch) >= BULK_BATCH_SIZE:
+                flush()
+        if batch:
+            flush()
+    except ValueError as e:
+        db.session.rollback()
+        return jsonify({"error": str(e)}), 400
+    db.session.commit()
+
+    results.sort(key=lambda r: r["index"])
+    counts = {action: sum(1 for r in results if r.get("action") == action)
+              for action in ("created", "updated", "unchanged")}
+    if counts["created"] or counts["updated"]:
+        invalidate_jobs()
+    failed = sum(1 for r in results if r["status"] == 400)
+    return jsonify({**counts, "failed": failed, "results": results})
+
+def batch_selection(body):
+    # WHERE clause for the jobs a batch request targets: "ids", a "filter" of
+    # get_jobs parameters ({"job_type", "location", "tag", "tag_mode"}), or
+    # both for jobs matching both. Raises ValueError on a bad selection.
+    ids = body.get("ids")
+    criteria = body.get("filter")
+    if ids is None and criteria is None:
+        raise ValueError("Pass \"ids\" or \"filter\"")
+    conditions = []
+    if ids is not None:
+        if not isinstance(ids, list) or not all(isinstance(i, int) and not isinstance(i, bool) for i in ids):
+            raise ValueError("\"ids\" must be a list of integers")
+        if len(ids) > BATCH_MAX_IDS:
+            raise ValueError(f"At most {BATCH_MAX_IDS} ids per request; select larger sets with a filter")
+        conditions.append(Job.id.in_(ids))
+    if criteria is not None:
+        if not isinstance(criteria, dict) or set(criteria) - set(BATCH_FILTERS):
+            raise ValueError(f"\"filter\" takes {', '.join(BATCH_FILTERS)}")
+        # A filter that matches everything is almost certainly a mistake
+        if not any(criteria.get(key) for key in ("job_type", "location", "tag")):
+            raise ValueError("\"filter\" needs job_type, location or tag")
+        args = MultiDict()
+        for key, value in criteria.items():
+            for item in value if isinstance(value, list) else [value]:
+                args.add(key, str(item))
+        conditions.append(Job.id.in_(filter_jobs(select(Job.id), args)))
+    return and_(*conditions)
+
+def batch_values(values):
+    # Validate a batch update's "set": returns (column values, tag names or
+    # None when tags are left alone)
+    if not isinstance(values, dict) or not values:
+        raise ValueError("\"set\" must be a non-empty object")
+    unknown = set(values) - set(BATCH_UPDATE_FIELDS)
+    if unknown:
+        raise ValueError(f"Cannot set {', '.join(sorted(unknown))}")
+    fields = {}
+    for key in BATCH_UPDATE_FIELDS[:4]:
+        if key in values:
+            if not isinstance(values[key], str) or not values[key].strip():
+                raise ValueError(f"\"{key}\" must be a non-empty string")
+            fields[key] = values[key]
+    tags = None
+    if "tags" in values:
+        if not isinstance(values["tags"], (list, str)):
+            raise ValueError("\"tags\" must be a list or comma-separated string")
+        tags = parse_tags(values["tags"])
+        fields["tags"] = ",".join(tags)
+    return fields, tags
+
+def count_jobs(condition):
+    return db.session.execute(select(func.count()).select_from(Job).where(condition)).scalar()
+
+def dry_run(matched, affected):
+    # What a batch request would do, without writing anything
+    return jsonify({
+        "dry_run": True,
+        "matched": matched,
+        "affected": count_jobs(affected),
+        "ids": db.session.scalars(select(Job.id).where(affected).order_by(Job.id).limit(DRY_RUN_IDS)).all(),
+    })
+
+def batch_body():
+    body = request.get_json(silent=True)
+    if not isinstance(body, dict):
+        raise ValueError("Expected a JSON object")
+    return body
+
+@job_routes.route('/jobs/bulk', methods=['PATCH'])
+def bulk_update_jobs():
+    # Apply one partial update ("set") to every selected job as a single
+    # UPDATE in one transaction. Jobs that already hold the new values are
+    # left alone: {"matched", "affected"}. "dry_run": true writes nothing
+    # and lists up to DRY_RUN_IDS of the ids that would change.
+    try:
+        body = batch_body()
+        selected = batch_selection(body)
+        fields, tags = batch_values(body.get("set"))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    table = Job.__table__
+    changing = and_(selected, or_(*(table.c[key].is_distinct_from(value) for key, value in fields.items())))
+    matched = count_jobs(selected)
+    if body.get("dry_run") is True:
+        return dry_run(matched, changing)
+
+    job_ids = db.session.scalars(
+        update(table).where(changing).values(**fields, updated_at=datetime.utcnow()).returning(table.c.id)
+    ).all()
+    for chunk in chunked(job_ids):
+        if tags is not None:
+            link_tags(dict.fromkeys(chunk, tags))
+        refresh_hashes(chunk)
+    if set(fields) & {"title", "company", "location", "tags"}:
+        index_jobs(job_ids)
+    log_changes((job_id, "update") for job_id in job_ids)
+    db.session.commit()
+    if job_ids:
+        invalidate_jobs()
+    return jsonify({"matched": matched, "affected": len(job_ids)})
+
+@job_routes.route('/jobs/bulk', methods=['DELETE'])
+def bulk_delete_jobs():
+    # Delete every selected job with a single DELETE in one transaction:
+    # {"matched", "affected"}. "dry_run": true writes nothing and lists up
+    # to DRY_RUN_IDS of the ids that would go.
+    try:
+        body = batch_body()
+        selected = batch_selection(body)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    matched = count_jobs(selected)
+    if body.get("dry_run") is True:
+        return dry_run(matched, selected)
+
+    # Jobs first: a tag filter in the selection reads job_tags
+    table = Job.__table__
+    job_ids = db.session.scalars(delete(table).where(selected).returning(table.c.id)).all()
+    for chunk in chunked(job_ids):
+        db.session.execute(delete(job_tags).where(job_tags.c.job_id.in_(chunk)))
+    forget_jobs(job_ids)
+    log_changes((job_id, "delete") for job_id in job_ids)
+    db.session.commit()
+    if job_ids:
+        invalidate_jobs()
+    return jsonify({"matched": matched, "affected": len(job_ids)})
+
+@job_routes.route('/jobs/hashes', methods=['POST'])
+def job_hashes():
+    # Content hashes of already-stored listings, so scrapers can skip
+    # re-posting jobs that haven't changed
+    urls = (request.get_json(silent=True) or {}).get("urls")
+    if not isinstance(urls, list):
+        return jsonify({"error": "Expected {\"urls\": [...]}"}), 400
+    rows = db.session.query(Job.source_url, Job.content_hash).filter(Job.source_url.in_(urls))
+    return jsonify({"hashes": dict(rows)})
+
 @job_routes.route('/jobs/<int:job_id>', methods=['PUT', 'PATCH'])
 def update_job(job_id):
     job = Job.query.get(job_id)
@@ -75,10 +526,25 @@ def update_job(job_id):
         return jsonify({"error": "Job not found"}), 404
 
     data = request.get_json()
-    for field in ["title", "company", "location", "job_type", "tags"]:
-        if field in data:
-            setattr(job, field, ",".join(data["tags"]) if field == "tags" else data[field])
+    if not isinstance(data, dict):
+        return jsonify({"error": "Invalid job payload"}), 400
+    try:
+        values = {field: text_field(data, field, "Full-time" if field == "job_type" else None)
+                  for field in ["title", "company", "location", "job_type"] if field in data}
+        if None in values.values():
+            raise ValueError("Required fields can't be null")
+        tags = parse_tags(data["tags"]) if "tags" in data else None
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    for field, value in values.items():
+        setattr(job, field, value)
+    if tags is not None:
+        job.set_tags(tags)
+    job.refresh_hash()
+    index_jobs([job.id])
+    log_changes([(job.id, "update")])
     db.session.commit()
+    invalidate_jobs()
     return jsonify(job.to_dict())
 
 @job_routes.route('/jobs/<int:job_id>', methods=['DELETE'])
@@ -87,5 +553,9 @@ def delete_job(job_id):
     if not job:
         return jsonify({"error": "Job not found"}), 404
     db.session.delete(job)
+    db.session.flush()
+    forget_jobs([job_id])
+    log_changes([(job_id, "delete")])
     db.session.commit()
+    invalidate_jobs()
     return jsonify({"message": "Job deleted"})
@@ -0,0 +1,67 @@
+import re
+from sqlalchemy import column, event, table, text, tuple_
+from backend.models import Job
+
+# External-content FTS5 index over the job table. Triggers keep it in sync
+# with every insert/update/delete, including bulk SQL that bypasses the ORM.
+FTS_DDL = [
+    """CREATE VIRTUAL TABLE IF NOT EXISTS job_fts USING fts5(
+        title, company, location, tags,
+        content='job', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+    )""",
+    """CREATE TRIGGER IF NOT EXISTS job_fts_ai AFTER INSERT ON job BEGIN
+        INSERT INTO job_fts(rowid, title, company, location, tags)
+        VALUES (new.id, new.title, new.company, new.location, new.tags);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS job_fts_ad AFTER DELETE ON job BEGIN
+        INSERT INTO job_fts(job_fts, rowid, title, company, location, tags)
+        VALUES ('delete', old.id, old.title, old.company, old.location, old.tags);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS job_fts_au AFTER UPDATE OF title, company, location, tags ON job BEGIN
+        INSERT INTO job_fts(job_fts, rowid, title, company, location, tags)
+        VALUES ('delete', old.id, old.title, old.company, old.location, old.tags);
+        INSERT INTO job_fts(rowid, title, company, location, tags)
+        VALUES (new.id, new.title, new.company, new.location, new.tags);
+    END""",
+]
+
+# Lightweight handle for querying the virtual table; it is deliberately not
+# part of db.metadata so create_all never tries to create it as a plain table.
+job_fts = table("job_fts", column("rowid"), column("rank"), column("job_fts"))
+
+def install_fts(connection, rebuild=False):
+    # Create the index and triggers if missing, backfilling from existing rows
+    # when the index is new (or when rebuild is asked for)
+    if connection.dialect.name != "sqlite":
+        return False
+    exists = connection.execute(
+        text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'job_fts'")
+    ).first()
+    for statement in FTS_DDL:
+        connection.execute(text(statement))
+    if rebuild or not exists:
+        connection.execute(text("INSERT INTO job_fts(job_fts) VALUES ('rebuild')"))
+    return True
+
+@event.listens_for(Job.__table__, "after_create")
+def _create_fts(target, connection, **kw):
+    install_fts(connection)
+
+def match_expression(q):
+    # Quote each word so user input can't inject FTS5 syntax; every term is a
+    # prefix match and terms are ANDed together.
+    terms = re.findall(r"\w+", q)
+    return " ".join(f'"{term}"*' for term in terms)
+
+def search_jobs(query, q, after=None):
+    # Restrict a Job query to FTS matches for q, ordered by bm25 rank then id
+    rank = job_fts.c.rank
+    query = (
+        query.join(job_fts, job_fts.c.rowid == Job.id)
+        .filter(job_fts.c.job_fts.op("MATCH")(match_expression(q)))
+        .add_columns(rank)
+    )
+    if after:
+        query = query.filter(tuple_(rank, Job.id) > after)
+    return query.order_by(rank, Job.id)
@@ -0,0 +1,119 @@
+import csv
+import io
+import json
+from flask import current_app
+from backend.models import ArchivedJob, Job
+
+try:
+    import orjson
+except ImportError:  # Optional speed-up; the stdlib path gives identical bytes
+    orjson = None
+
+# The columns behind Job.to_dict(), in its (sorted) key order. List endpoints
+# select these as plain row tuples instead of hydrating Job instances.
+JOB_COLUMNS = (Job.company, Job.id, Job.job_type, Job.location, Job.posting_date, Job.tags, Job.title)
+
+# Export rows: the listing columns plus what incremental consumers need
+EXPORT_COLUMNS = JOB_COLUMNS + (Job.source_url, Job.updated_at)
+# The same columns read from the archive table, for include_archived
+ARCHIVE_JOB_COLUMNS = tuple(getattr(ArchivedJob, column.key) for column in JOB_COLUMNS)
+ARCHIVE_EXPORT_COLUMNS = tuple(getattr(ArchivedJob, column.key) for column in EXPORT_COLUMNS)
+CSV_FIELDS = ["id", "title", "company", "location", "posting_date", "job_type", "tags", "job_url", "updated_at"]
+
+ROWS_PER_CHUNK = 200
+
+def row_dict(row):
+    # Same dict as Job.to_dict(), built from a JOB_COLUMNS row (extra trailing
+    # columns such as a search rank are ignored). posting_date stays a
+    # datetime here; encode_row formats it exactly like isoformat().
+    company, job_id, job_type, location, posting_date, tags, title = row[:7]
+    return {
+        "company": company,
+        "id": job_id,
+        "job_type": job_type,
+        "location": location,
+        "posting_date": posting_date,
+        "tags": tags.split(",") if tags else [],
+        "title": title,
+    }
+
+def encode_row(row):
+    # Encode one row the way Flask's jsonify would (sorted keys, compact,
+    # ASCII-only). orjson writes raw UTF-8 and DEL, so rows containing either
+    # take the stdlib path to get the same \u escapes.
+    data = row_dict(row)
+    if orjson is not None:
+        encoded = orjson.dumps(data)
+        if encoded.isascii() and b"\x7f" not in encoded:
+            return encoded
+    data["posting_date"] = data["posting_date"].isoformat()
+    return json.dumps(data, separators=(",", ":")).encode()
+
+def json_array_chunks(rows, rows_per_chunk=ROWS_PER_CHUNK):
+    # Yield a JSON array of rows as byte chunks, ending with jsonify's
+    # trailing newline, so large results can be streamed as they are read
+    yield b"["
+    chunk = []
+    first = True
+    for row in rows:
+        chunk.append(encode_row(row))
+        if len(chunk) >= rows_per_chunk:
+            yield (b"" if first else b",") + b",".join(chunk)
+            first = False
+            chunk = []
+    if chunk:
+        yield (b"" if first else b",") + b",".join(chunk)
+    yield b"]\n"
+
+def indented():
+    # jsonify pretty-prints in debug mode unless app.json.compact says otherwise
+    compact = current_app.json.compact
+    return compact is False or (compact is None and current_app.debug)
+
+def json_array(rows):
+    if indented():
+        # Development server: let Flask's provider lay it out like jsonify
+        data = [dict(row_dict(row), posting_date=row[4].isoformat()) for row in rows]
+        return f"{current_app.json.dumps(data, indent=2)}\n".encode()
+    return b"".join(json_array_chunks(rows))
+
+def isoformat(value):
+    return value.isoformat() if value is not None else None
+
+def export_dict(row):
+    data = row_dict(row)
+    data["job_url"] = row[7]
+    data["updated_at"] = row[8]
+    return data
+
+def ndjson_chunks(rows, rows_per_chunk=ROWS_PER_CHUNK):
+    # One JSON object per line (UTF-8, not ASCII-escaped), yielded in chunks
+    chunk = []
+    for row in rows:
+        data = export_dict(row)
+        if orjson is not None:
+            chunk.append(orjson.dumps(data))
+        else:
+            data["posting_date"] = isoformat(data["posting_date"])
+            data["updated_at"] = isoformat(data["updated_at"])
+            chunk.append(json.dumps(data, separators=(",", ":"), ensure_ascii=False).encode())
+        if len(chunk) >= rows_per_chunk:
+            yield b"\n".join(chunk) + b"\n"
+            chunk = []
+    if chunk:
+        yield b"\n".join(chunk) + b"\n"
+
+def csv_chunks(rows, rows_per_chunk=ROWS_PER_CHUNK):
+    # Header line, then rows in CSV_FIELDS order; tags stay comma-joined
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(CSV_FIELDS)
+    for count, row in enumerate(rows, 1):
+        company, job_id, job_type, location, posting_date, tags, title, job_url, updated_at = row[:9]
+        writer.writerow([job_id, title, company, location, isoformat(posting_date), job_type,
+                         tags or "", job_url or "", isoformat(updated_at) or ""])
+        if count % rows_per_chunk == 0:
+            yield buffer.getvalue().encode()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue().encode()
@@ -0,0 +1,83 @@
+# Production entry point: the API behind several worker processes, each
+# serving requests on a pool of threads, instead of the single-process
+# debug server in backend/app.py.
+#
+#   CACHE_URL=redis://localhost:6379/0 python -m backend.serve --workers 4 --threads 8 --bind 0.0.0.0:5000
+#
+# One worker per CPU needs a shared cache (CACHE_URL=redis://...). With the
+# per-process memory:// default it runs a single worker, and an explicit
+# --workers above 1 turns the response cache off instead of serving stale
+# listings from the other workers.
+#
+# Runs on gunicorn (Linux/macOS). Where gunicorn isn't available, e.g. on
+# Windows, it falls back to waitress: one process with --threads threads.
+#
+# Change-feed streams (GET /jobs/changes/stream) hold a thread each while
+# open, so a worker serves at most CHANGE_STREAMS_MAX of them (half of
+# --threads unless set) and keeps the other threads for ordinary requests.
+# Raise --threads to follow more browser tabs per worker; clients past the
+# cap poll /jobs/changes instead.
+import argparse
+import importlib.util
+import os
+from dotenv import load_dotenv
+from backend.cache import per_process
+
+def gunicorn_app(options):
+    from gunicorn.app.base import BaseApplication
+
+    class Server(BaseApplication):
+        def load_config(self):
+            self.cfg.set("bind", options.bind)
+            self.cfg.set("workers", options.workers)
+            self.cfg.set("threads", options.threads)
+            self.cfg.set("worker_class", "gthread")
+            self.cfg.set("timeout", options.timeout)
+            self.cfg.set("keepalive", 5)
+            self.cfg.set("accesslog", "-" if options.access_log else None)
+
+        def load(self):
+            # Called in each worker after the fork, so every process opens its
+            # own engine and connection pool
+            from backend import create_app
+            return create_app()
+
+    return Server()
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve the jobs API with multiple workers")
+    parser.add_argument("--bind", default=os.getenv("BIND", "0.0.0.0:5000"), help="host:port to listen on")
+    parser.add_argument("--workers", type=int, default=os.getenv("WEB_WORKERS"),
+                        help="worker processes (default: one per CPU with a shared cache, else 1)")
+    parser.add_argument("--threads", type=int, default=int(os.getenv("WEB_THREADS", 4)),
+                        help="request threads per worker, change-feed streams included")
+    parser.add_argument("--timeout", type=int, default=60, help="seconds before a stuck worker is restarted")
+    parser.add_argument("--access-log", action="store_true", help="log every request to stdout")
+    options = parser.parse_args()
+
+    load_dotenv()
+    cache_url = os.getenv("CACHE_URL", "memory://")
+    if options.workers is None:
+        options.workers = 1 if per_process(cache_url) else os.cpu_count() or 1
+    options.workers = int(options.workers)
+    if options.workers > 1 and per_process(cache_url):
+        os.environ["CACHE_URL"] = "none://"
+        print(f"⚠️ CACHE_URL={cache_url} keeps a separate cache per worker, so the response cache is off "
+              f"for {options.workers} workers. Set CACHE_URL=redis://... to cache across them.")
+
+    # Each thread may hold a connection, so size the pool to match
+    os.environ.setdefault("DB_POOL_SIZE", str(options.threads))
+    os.environ.setdefault("CHANGE_STREAMS_MAX", str(max(1, options.threads // 2)))
+
+    if importlib.util.find_spec("gunicorn"):
+        gunicorn_app(options).run()
+    elif importlib.util.find_spec("waitress"):
+        from waitress import serve
+        from backend import create_app
+        print(f"ℹ️ gunicorn not available; serving with waitress ({options.threads} threads, 1 process)")
+        serve(create_app(), listen=options.bind, threads=options.threads)
+    else:
+        raise SystemExit("Install gunicorn (Linux/macOS) or waitress (Windows) to run the production server")
+
+if __name__ == "__main__":
+    main()
@@ -1,54 +1,167 @@
-import React, { useEffect, useState } from 'react';
+import React, { useEffect, useRef, useState } from 'react';
 import JobForm from './JobForm';
 import JobCard from './JobCard';
 import Filters from './Filters';
 
 const API = 'http://localhost:5000/jobs';
 
+// Whether a job belongs in the list for these filters. Search results are
+// ranked server-side, so new jobs are never spliced into them.
+const matchesFilters = (job, filters) => {
+  if (filters.q) return false;
+  if (filters.job_type && job.job_type !== filters.job_type) return false;
+  if (filters.location && job.location !== filters.location) return false;
+  // Tags match case-insensitively, like the server's filter
+  const tags = (filters.tag || '').split(',').map(t => t.trim().toLowerCase()).filter(Boolean);
+  const jobTags = job.tags.map(t => t.toLowerCase());
+  return tags.every(tag => jobTags.includes(tag));
+};
+
 function App() {
   const [jobs, setJobs] = useState([]);
   const [filters, setFilters] = useState({});
   const [editingJob, setEditingJob] = useState(null);
+  const [nextCursor, setNextCursor] = useState(null);
+  const [facets, setFacets] = useState(null);
+  // Change-feed position of the loaded list (X-Change-Seq of its first page)
+  const [changeSeq, setChangeSeq] = useState(null);
+  // Bumped to reopen the change stream after it was refused
+  const [streamRetry, setStreamRetry] = useState(0);
+  const facetsTimer = useRef(null);
+  const latestApplyChange = useRef(null);
+
+  // Free-text queries go through the ranked search endpoint
+  const listUrl = () => (filters.q ? `${API}/search` : API);
 
   const fetchJobs = async () => {
     const params = new URLSearchParams(filters).toString();
-    const res = await fetch(`${API}?${params}`);
+    const res = await fetch(`${listUrl()}?${params}`);
     const data = await res.json();
     setJobs(data);
+    setNextCursor(res.headers.get('X-Next-Cursor'));
+    setChangeSeq(res.headers.get('X-Change-Seq'));
+    fetchFacets();
+  };
+
+  // Counts per type/location/tag for the dropdowns, under the same filters
+  const fetchFacets = async () => {
+    const { q, sort, ...facetFilters } = filters;
+    const params = new URLSearchParams(facetFilters).toString();
+    const res = await fetch(`${API}/facets?${params}`);
+    if (res.ok) setFacets(await res.json());
+  };
+
+  const loadMore = async () => {
+    const params = new URLSearchParams({ ...filters, cursor: nextCursor }).toString();
+    const res = await fetch(`${listUrl()}?${params}`);
+    const data = await res.json();
+    setJobs(prev => [...prev, ...data]);
+    setNextCursor(res.headers.get('X-Next-Cursor'));
+  };
+
+  // Patch the loaded list with one change instead of re-fetching it. Changes
+  // can arrive twice (our own write, then the feed), so each is idempotent.
+  const applyChange = (change) => {
+    const { op, id, job } = change;
+    setJobs(prev => {
+      const rest = prev.filter(j => j.id !== id);
+      if (op === 'delete' || !job) return rest;
+      const index = prev.findIndex(j => j.id === id);
+      if (index !== -1) {
+        if (!matchesFilters(job, filters) && !filters.q) return rest;
+        return prev.map(j => (j.id === id ? job : j));
+      }
+      if (op !== 'insert' || !matchesFilters(job, filters)) return prev;
+      // New postings sort first; in oldest-first order they only belong
+      // once every earlier page is loaded
+      if (filters.sort === 'posting_date_asc') return nextCursor ? prev : [...prev, job];
+      return [job, ...prev];
+    });
+    // Counts trail a burst of changes (e.g. a scraper run) by a second
+    clearTimeout(facetsTimer.current);
+    facetsTimer.current = setTimeout(fetchFacets, 1000);
   };
+  // The stream outlives renders; route its events to the current filters
+  latestApplyChange.current = applyChange;
 
   useEffect(() => {
     fetchJobs();
   }, [filters]);
 
+  // Follow inserts, updates and deletes from everyone (other users, the
+  // scraper) from the position of the loaded list
+  useEffect(() => {
+    if (changeSeq === null) return undefined;
+    let lastSeq = changeSeq;
+    let pollTimer = null;
+    const source = new EventSource(`${API}/changes/stream?since=${changeSeq}`);
+    const onChange = (e) => {
+      lastSeq = e.lastEventId;
+      latestApplyChange.current(JSON.parse(e.data));
+    };
+    ['insert', 'update', 'delete'].forEach(op => source.addEventListener(op, onChange));
+    // The changes since our position were pruned; reload instead
+    source.addEventListener('reset', () => {
+      source.close();
+      fetchJobs();
+    });
+    // EventSource gives up when the stream is refused (every slot on the
+    // server is taken): catch up by polling once, then try streaming again
+    // from the new position
+    source.onerror = () => {
+      if (source.readyState !== EventSource.CLOSED) return;
+      pollTimer = setTimeout(async () => {
+        const res = await fetch(`${API}/changes?since=${lastSeq}`);
+        if (res.ok) {
+          const data = await res.json();
+          if (data.reset) return fetchJobs();
+          data.changes.forEach(change => latestApplyChange.current(change));
+          lastSeq = data.last_seq;
+        }
+        setChangeSeq(`${lastSeq}`);
+        setStreamRetry(n => n + 1);
+      }, 5000);
+    };
+    return () => {
+      source.close();
+      clearTimeout(pollTimer);
+    };
+  }, [changeSeq, streamRetry]);
+
   const handleAdd = async (job) => {
-    await fetch(API, {
+    const res = await fetch(API, {
       method: 'POST',
       headers: {'Content-Type': 'application/json'},
       body: JSON.stringify(job)
     });
-    fetchJobs();
+    if (res.ok) {
+      const created = await res.json();
+      applyChange({ op: 'insert', id: created.id, job: created });
+    }
   };
 
   const handleUpdate = async (job) => {
-    await fetch(`${API}/${job.id}`, {
+    const res = await fetch(`${API}/${job.id}`, {
       method: 'PATCH',
       headers: {'Content-Type': 'application/json'},
       body: JSON.stringify(job)
     });
     setEditingJob(null);
-    fetchJobs();
+    if (res.ok) {
+      const updated = await res.json();
+      applyChange({ op: 'update', id: updated.id, job: updated });
+    }
   };
 
   const handleDelete = async (id) => {
-    await fetch(`${API}/${id}`, { method: 'DELETE' });
-    fetchJobs();
+    const res = await fetch(`${API}/${id}`, { method: 'DELETE' });
+    if (res.ok) applyChange({ op: 'delete', id });
   };
 
   return (
     <div className="container">
       <h1>Job Listings</h1>
-      <Filters setFilters={setFilters} />
+      <Filters setFilters={setFilters} facets={facets} />
       <JobForm onSubmit={editingJob ? handleUpdate : handleAdd} editingJob={editingJob} />
       {jobs.map(job => (
         <JobCard
@@ -58,6 +171,7 @@ function App() {
           onDelete={() => handleDelete(job.id)}
         />
       ))}
+      {nextCursor && <button onClick={loadMore}>Load more</button>}
     </div>
   );
 }
@@ -1,25 +1,39 @@
 import React, { useState } from 'react';
 
-export default function Filters({ setFilters }) {
+const JOB_TYPES = ['Full-time', 'Part-time', 'Internship'];
+
+// Option label with its facet count, e.g. "London (12)"
+const withCount = (facet) => `${facet.value} (${facet.count})`;
+
+export default function Filters({ setFilters, facets }) {
   const [job_type, setJobType] = useState('');
   const [location, setLocation] = useState('');
   const [tag, setTag] = useState('');
+  const [q, setQ] = useState('');
   const [sort, setSort] = useState('posting_date_desc');
 
   const applyFilters = () => {
-    setFilters({ job_type, location, tag, sort });
+    setFilters({ q, job_type, location, tag, sort });
   };
 
   return (
     <div style={{ marginBottom: 20, display: 'flex', alignItems: 'center', flexWrap: 'wrap', gap: 10 }}>
+      <input placeholder="Search" value={q} onChange={e => setQ(e.target.value)} />
       <select onChange={e => setJobType(e.target.value)} value={job_type}>
         <option value="">All Types</option>
-        <option>Full-time</option>
-        <option>Part-time</option>
-        <option>Internship</option>
+        {facets
+          ? facets.job_type.map(f => <option key={f.value} value={f.value}>{withCount(f)}</option>)
+          : JOB_TYPES.map(type => <option key={type}>{type}</option>)}
       </select>
-      <input placeholder="Location" value={location} onChange={e => setLocation(e.target.value)} />
-      <input placeholder="Tag" value={tag} onChange={e => setTag(e.target.value)} />
+      <input placeholder="Location" list="location-facets" value={location} onChange={e => setLocation(e.target.value)} />
+      <datalist id="location-facets">
+        {facets && facets.location.map(f => <option key={f.value} value={f.value}>{withCount(f)}</option>)}
+      </datalist>
+      <input placeholder="Tag" list="tag-facets" value={tag} onChange={e => setTag(e.target.value)} />
+      <datalist id="tag-facets">
+        {facets && facets.tags.map(f => <option key={f.value} value={f.value}>{withCount(f)}</option>)}
+      </datalist>
+      {facets && <span>{facets.total} jobs</span>}
       <select onChange={e => setSort(e.target.value)} value={sort}>
         <option value="posting_date_desc">Newest First</option>
         <option value="posting_date_asc">Oldest First</option>
@@ -0,0 +1,95 @@
+"""
+Pooled HTTP client for posting scraped jobs to the API
+"""
+
+import random
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class ApiClient:
+    """Keep-alive session with bounded, jittered retries and latency tracking
+
+    One instance is shared by all poster threads; the connection pool is sized
+    so each of them can hold a connection open.
+    """
+
+    def __init__(self, pool_size=10, max_retries=3, backoff_base=0.5, backoff_max=10.0, timeout=10, headers=None):
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.session.headers.update(headers or {})
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.timeout = timeout
+        self.lock = threading.Lock()
+        self.latencies = []
+        self.retries = 0
+
+    def backoff(self, attempt, response=None):
+        """Seconds to wait before retry number attempt (full jitter)"""
+        retry_after = response.headers.get("Retry-After") if response is not None else None
+        if retry_after and retry_after.isdigit():
+            return min(self.backoff_max, float(retry_after))
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+
+    def post(self, url, json=None, timeout=None):
+        """POST with retries on connection errors and retryable statuses
+
+        Returns the last response; raises the last RequestException if every
+        attempt failed before getting one.
+        """
+        for attempt in range(self.max_retries + 1):
+            start = time.perf_counter()
+            try:
+                response = self.session.post(url, json=json, timeout=timeout or self.timeout)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+                self.record(time.perf_counter() - start)
+                if attempt == self.max_retries:
+                    raise
+                response = None
+            else:
+                self.record(time.perf_counter() - start)
+                if response.status_code not in RETRY_STATUSES or attempt == self.max_retries:
+                    return response
+
+            delay = self.backoff(attempt, response)
+            with self.lock:
+                self.retries += 1
+            print(f"🔁 Retrying {url} in {delay:.2f}s (attempt {attempt + 2}/{self.max_retries + 1})")
+            time.sleep(delay)
+
+    def record(self, seconds):
+        with self.lock:
+            self.latencies.append(seconds)
+
+    def latency_summary(self):
+        """Request count, retry count and latency percentiles in milliseconds"""
+        with self.lock:
+            samples = sorted(self.latencies)
+            retries = self.retries
+        if not samples:
+            return {"requests": 0, "retries": retries}
+
+        def percentile(p):
+            return round(samples[min(len(samples) - 1, int(p / 100 * len(samples)))] * 1000, 2)
+
+        return {
+            "requests": len(samples),
+            "retries": retries,
+            "mean_ms": round(sum(samples) / len(samples) * 1000, 2),
+            "p50_ms": percentile(50),
+            "p95_ms": percentile(95),
+            "p99_ms": percentile(99),
+            "max_ms": round(samples[-1] * 1000, 2),
+        }
+
+    def close(self):
+        self.session.close()
@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+Card extraction benchmark over the saved listing pages in scraper/fixtures
+
+Times page parsing plus extract_job_data for every card, comparing the old
+extraction path (html.parser, per-card title re-parse, one select() per tag
+selector, one scan per keyword) against the current single-pass extractor on
+each available parser backend.
+
+    python bench_extract.py --repeat 20
+"""
+
+import argparse
+import contextlib
+import glob
+import io
+import json
+import os
+import time
+
+from bs4 import BeautifulSoup
+
+from scraper_jobs import ActuaryJobScraper, KEYWORDS, PIN_CLASS
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+
+class LegacyExtraction(ActuaryJobScraper):
+    """Extraction as it worked before the single-pass rewrite, for comparison"""
+
+    def extract_tags(self, job_element, job_text=None, tag_elems=None):
+        tags = []
+        tag_selectors = [
+            ".tag", ".badge", ".label", ".chip", ".skill",
+            "[class*='tag']", "[class*='badge']", "[class*='skill']",
+            ".category", ".keyword", ".requirement"
+        ]
+        for selector in tag_selectors:
+            for elem in job_element.select(selector):
+                tag = elem.get_text().strip()
+                if tag and 2 < len(tag) < 30 and tag not in tags:
+                    tags.append(tag)
+        job_text = job_element.get_text().upper()
+        for keyword in KEYWORDS:
+            if keyword.upper() in job_text and keyword not in tags:
+                tags.append(keyword)
+        return list(set(tags))[:8]
+
+    def extract_job_data(self, job_element):
+        title = ""
+        title_elem = job_element.select_one("p.Job_job-card__position__ic1rc")
+        if title_elem:
+            title_elem_copy = BeautifulSoup(str(title_elem), 'html.parser')
+            pin_elem = title_elem_copy.select_one(f"p.{PIN_CLASS}")
+            if pin_elem:
+                pin_elem.extract()
+            title = title_elem_copy.get_text(strip=True)
+
+        company = ""
+        company_elem = job_element.select_one("p.Job_job-card__company__7T9qY")
+        if company_elem:
+            company = company_elem.get_text(strip=True)
+
+        location = ""
+        location_elems = job_element.select("div.Job_job-card__locations__x1exr a.Job_job-card__location__bq7jX")
+        if location_elems:
+            locations = []
+            for loc in location_elems:
+                loc_text = loc.get_text(strip=True)
+                if not loc_text.startswith("💰") and not loc_text.startswith("🇺🇸"):
+                    locations.append(loc_text)
+            location = ", ".join(locations) if locations else "Remote/Not specified"
+
+        posting_date = ""
+        date_elem = job_element.select_one("span.Job_job-card__posted-on__NCZaJ")
+        if date_elem:
+            posting_date = date_elem.get_text(strip=True)
+        else:
+            date_selectors = [
+                ".date", ".posted-date", ".job-date",
+                "time", ".publish-date", ".date-column",
+                "[class*='date']", "[class*='posted']"
+            ]
+            for selector in date_selectors:
+                elem = job_element.select_one(selector)
+                if elem and elem.get_text().strip():
+                    posting_date = elem.get_text().strip()
+                    break
+
+        job_url = ""
+        link_elem = job_element.select_one("a.Job_job-page-link__a5I5g")
+        if link_elem and link_elem.get('href', ''):
+            href = link_elem['href']
+            job_url = href if href.startswith('http') else f"{self.base_url}{href}"
+
+        job_text = job_element.get_text() if job_element else ""
+        parsed_date = self.parse_date(posting_date)
+        return {
+            'title': title,
+            'company': company,
+            'location': location or "Remote/Not specified",
+            'posting_date': parsed_date.isoformat() if hasattr(parsed_date, 'isoformat') else str(parsed_date),
+            'job_url': job_url,
+            'job_type': self.extract_job_type(job_text),
+            'tags': self.extract_tags(job_element),
+        }
+
+
+def load_pages():
+    pages = []
+    for path in sorted(glob.glob(os.path.join(FIXTURES, "*.html"))):
+        with open(path, encoding="utf-8") as f:
+            pages.append(f.read())
+    return pages
+
+
+def extract_all(scraper, pages):
+    jobs = []
+    with contextlib.redirect_stdout(io.StringIO()):  # Silence per-page progress prints
+        for html in pages:
+            soup = BeautifulSoup(html, scraper.html_parser)
+            for job_elem in scraper.find_job_elements(soup):
+                jobs.append(scraper.extract_job_data(job_elem))
+    return jobs
+
+
+def bench(scraper, pages, repeat):
+    extract_all(scraper, pages)  # Warm-up
+    cards = 0
+    start = time.perf_counter()
+    for _ in range(repeat):
+        cards += len(extract_all(scraper, pages))
+    elapsed = time.perf_counter() - start
+    return {
+        "pages": len(pages) * repeat,
+        "cards": cards,
+        "ms_per_page": round(elapsed / (len(pages) * repeat) * 1000, 3),
+        "cards_per_sec": round(cards / elapsed, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark job card extraction on saved HTML fixtures")
+    parser.add_argument("--repeat", type=int, default=20, help="passes over the fixture pages")
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    options = parser.parse_args()
+
+    pages = load_pages()
+    if not pages:
+        raise SystemExit(f"No fixtures found in {FIXTURES}")
+
+    variants = [("legacy/html.parser", LegacyExtraction(html_parser="html.parser"))]
+    backends = ["html.parser", "lxml"]
+    for backend in backends:
+        try:
+            BeautifulSoup("", backend)
+        except Exception:
+            continue
+        variants.append((f"single-pass/{backend}", ActuaryJobScraper(html_parser=backend)))
+
+    # Every variant must extract the same records as the old path before its
+    # speed counts (tags aside: the old keyword scan matched substrings)
+    reference = [{k: v for k, v in job.items() if k != "tags"} for job in extract_all(variants[0][1], pages)]
+    for name, scraper in variants[1:]:
+        records = [{k: v for k, v in job.items() if k != "tags"} for job in extract_all(scraper, pages)]
+        if records != reference:
+            raise SystemExit(f"❌ {name} extracted different records than {variants[0][0]}")
+
+    results = {name: bench(scraper, pages, options.repeat) for name, scraper in variants}
+    baseline = results["legacy/html.parser"]["cards_per_sec"]
+    for result in results.values():
+        result["speedup"] = round(result["cards_per_sec"] / baseline, 2)
+
+    if options.json:
+        print(json.dumps(results, indent=2))
+        return
+    print(f"{'variant':<28}{'ms/page':>10}{'cards/sec':>12}{'speedup':>10}")
+    for name, result in results.items():
+        print(f"{name:<28}{result['ms_per_page']:>10}{result['cards_per_sec']:>12}{result['speedup']:>9}x")
+
+
+if __name__ == "__main__":
+    main()
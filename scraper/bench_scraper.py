@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+End-to-end scraper benchmark that runs offline
+
+Replays the saved listing pages in scraper/fixtures through the real
+scraper (replay mode: pagination, parse workers, hash lookups, posters) and
+posts them to the local stand-in API from stub_api.py, so results can be
+reproduced on a machine with no network or browser. Reports:
+
+  parse      ms per page and cards/sec for page parsing + extraction alone
+  post       API request latency percentiles seen by the pooled client
+  end-to-end jobs/sec from first page to last post
+
+    python bench_scraper.py --copies 10 --batch-size 50 --latency-ms 2 --json
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import re
+import statistics
+import tempfile
+
+from bench_extract import FIXTURES, bench, load_pages
+from scraper_jobs import ActuaryJobScraper, DEFAULT_HTML_PARSER
+from stub_api import start_stub_api
+
+JOB_LINK = re.compile(r'(Job_job-page-link__a5I5g" href=")([^"]+)(")')
+NEXT_LINK = '<a rel="next" href="/?page=next">Next</a>'
+
+
+def build_replay_dir(target, copies):
+    """Write the fixture pages copies times over, with unique job URLs per copy
+
+    Every page but the last gets a next link so replay walks all of them.
+    """
+    pages = load_pages()
+    total = len(pages) * copies
+    n = 0
+    for copy in range(copies):
+        for html in pages:
+            n += 1
+            html = JOB_LINK.sub(lambda m: f"{m.group(1)}{m.group(2)}-c{copy}{m.group(3)}", html)
+            if n < total and 'rel="next"' not in html:
+                html = html.replace("</main>", f"{NEXT_LINK}</main>")
+            elif n == total:
+                html = re.sub(r'<a rel="next"[^>]*>[^<]*</a>', "", html)
+            with open(os.path.join(target, f"page{n:05d}.html"), "w", encoding="utf-8") as f:
+                f.write(html)
+    return total
+
+
+def run_once(replay_dir, api_endpoint, options):
+    scraper = ActuaryJobScraper(
+        api_endpoint=api_endpoint,
+        batch_size=options.batch_size,
+        parse_workers=options.parse_workers,
+        post_workers=options.post_workers,
+        html_parser=options.parser,
+        dead_letter_path=os.devnull,
+        replay_dir=replay_dir,
+    )
+    with contextlib.redirect_stdout(io.StringIO()):
+        return scraper.scrape_and_post_jobs(max_jobs=options.max_jobs)
+
+
+def run_end_to_end(replay_dir, options):
+    """Run each round against a fresh stand-in API; returns every round's result"""
+    rounds = []
+    for _ in range(options.rounds):
+        server = None
+        api_endpoint = options.api
+        if not api_endpoint:
+            server = start_stub_api(latency_ms=options.latency_ms, error_rate=options.error_rate)
+            api_endpoint = f"http://127.0.0.1:{server.server_port}/jobs"
+        try:
+            rounds.append(run_once(replay_dir, api_endpoint, options))
+        finally:
+            if server:
+                server.shutdown()
+                server.server_close()
+    return rounds
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the scraper offline against saved pages")
+    parser.add_argument("--copies", type=int, default=10, help="times to repeat the fixture pages (unique URLs each)")
+    parser.add_argument("--rounds", type=int, default=3, help="end-to-end runs; the median is reported")
+    parser.add_argument("--repeat", type=int, default=20, help="passes over the fixtures for the parse benchmark")
+    parser.add_argument("--batch-size", type=int, default=1, help="jobs per bulk request (1 posts individually)")
+    parser.add_argument("--parse-workers", type=int, default=2)
+    parser.add_argument("--post-workers", type=int, default=4)
+    parser.add_argument("--parser", default=DEFAULT_HTML_PARSER, help="BeautifulSoup parser backend")
+    parser.add_argument("--max-jobs", type=int, default=10 ** 9)
+    parser.add_argument("--latency-ms", type=float, default=0, help="latency the stand-in API adds per POST")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of POSTs the stand-in API fails with 503")
+    parser.add_argument("--api", help="post to this jobs endpoint instead of the stand-in (use an empty database)")
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    options = parser.parse_args()
+
+    pages = load_pages()
+    if not pages:
+        raise SystemExit(f"No fixtures found in {FIXTURES}")
+
+    parse = bench(ActuaryJobScraper(html_parser=options.parser), pages, options.repeat)
+
+    with tempfile.TemporaryDirectory() as replay_dir:
+        total_pages = build_replay_dir(replay_dir, options.copies)
+        rounds = run_end_to_end(replay_dir, options)
+
+    errors = [r["error"] for r in rounds if r.get("error")]
+    if errors:
+        raise SystemExit(f"❌ Replay failed: {errors[0]}")
+    median = sorted(rounds, key=lambda r: r["jobs_per_sec"])[len(rounds) // 2]
+    results = {
+        "config": {
+            "pages": total_pages,
+            "rounds": options.rounds,
+            "batch_size": options.batch_size,
+            "parse_workers": options.parse_workers,
+            "post_workers": options.post_workers,
+            "parser": options.parser,
+            "api": options.api or f"stand-in ({options.latency_ms} ms latency, {options.error_rate:.0%} errors)",
+        },
+        "parse": {"ms_per_page": parse["ms_per_page"], "cards_per_sec": parse["cards_per_sec"]},
+        "post": median["api_latency"],
+        "end_to_end": {
+            "posted": median["posted"],
+            "failed": median["failed"],
+            "skipped": median["skipped"],
+            "elapsed_s": median["elapsed_s"],
+            "jobs_per_sec": median["jobs_per_sec"],
+            "jobs_per_sec_all_rounds": [r["jobs_per_sec"] for r in rounds],
+            "jobs_per_sec_stdev": round(statistics.pstdev(r["jobs_per_sec"] for r in rounds), 1),
+            "pipeline_ms_per_page": median["parse_ms_per_page"],
+        },
+    }
+
+    if options.json:
+        print(json.dumps(results, indent=2))
+        return
+    print(f"⚙️  {results['config']}")
+    print(f"🧩 Parse:      {parse['ms_per_page']} ms/page, {parse['cards_per_sec']} cards/sec")
+    post = results["post"]
+    print(f"📡 POST:       {post.get('requests', 0)} requests, {post.get('retries', 0)} retries, "
+          f"p50 {post.get('p50_ms')} ms, p95 {post.get('p95_ms')} ms, p99 {post.get('p99_ms')} ms")
+    e2e = results["end_to_end"]
+    print(f"🚀 End-to-end: {e2e['jobs_per_sec']} jobs/sec ({e2e['posted']} posted, {e2e['failed']} failed "
+          f"in {e2e['elapsed_s']}s; rounds {e2e['jobs_per_sec_all_rounds']})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+Persistent crawl state for incremental scraping
+
+A small SQLite file remembering every job URL the scraper has posted (or
+found unchanged), with its content hash and when it was first/last seen,
+plus a log of past runs. Incremental runs use it to skip known jobs without
+asking the API and to stop paginating once they reach a page of them.
+"""
+
+import sqlite3
+import threading
+from datetime import datetime
+
+SCHEMA = [
+    """CREATE TABLE IF NOT EXISTS seen_jobs (
+        url TEXT PRIMARY KEY,
+        content_hash TEXT NOT NULL,
+        first_seen TEXT NOT NULL,
+        last_seen TEXT NOT NULL
+    )""",
+    """CREATE TABLE IF NOT EXISTS runs (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        started_at TEXT NOT NULL,
+        finished_at TEXT NOT NULL,
+        pages INTEGER NOT NULL,
+        posted INTEGER NOT NULL,
+        failed INTEGER NOT NULL,
+        skipped INTEGER NOT NULL,
+        stopped_early INTEGER NOT NULL,
+        error TEXT
+    )""",
+]
+
+# Stay well under SQLite's bound-parameter limit in IN (...) lookups
+LOOKUP_CHUNK = 500
+
+
+class CrawlState:
+    """Thread-safe store of seen job URLs and run history
+
+    Parser and poster threads share one instance, so every statement runs
+    under a lock on a single connection.
+    """
+
+    def __init__(self, path="crawl_state.db"):
+        self.path = path
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        with self.conn:
+            for statement in SCHEMA:
+                self.conn.execute(statement)
+
+    def known_hashes(self, urls):
+        """Stored content hash of each URL already in the state: {url: hash}"""
+        urls = [url for url in urls if url]
+        hashes = {}
+        with self.lock:
+            for i in range(0, len(urls), LOOKUP_CHUNK):
+                chunk = urls[i:i + LOOKUP_CHUNK]
+                rows = self.conn.execute(
+                    f"SELECT url, content_hash FROM seen_jobs WHERE url IN ({','.join('?' * len(chunk))})",
+                    chunk,
+                )
+                hashes.update(rows)
+        return hashes
+
+    def mark_seen(self, entries):
+        """Record (url, content_hash) pairs as seen now; returns how many were stored"""
+        now = datetime.now().isoformat()
+        rows = [(url, content_hash, now, now) for url, content_hash in entries if url]
+        if not rows:
+            return 0
+        with self.lock, self.conn:
+            self.conn.executemany(
+                """INSERT INTO seen_jobs (url, content_hash, first_seen, last_seen) VALUES (?, ?, ?, ?)
+                   ON CONFLICT (url) DO UPDATE SET content_hash = excluded.content_hash,
+                                                   last_seen = excluded.last_seen""",
+                rows,
+            )
+        return len(rows)
+
+    def record_run(self, started_at, result):
+        """Append a finished run (a scrape_and_post_jobs result) to the run log"""
+        with self.lock, self.conn:
+            self.conn.execute(
+                """INSERT INTO runs (started_at, finished_at, pages, posted, failed, skipped, stopped_early, error)
+                   VALUES (?, ?, ?, ?, ?, ?, ?, ?)""",
+                (started_at.isoformat(), datetime.now().isoformat(), result.get("pages", 0),
+                 result.get("posted", 0), result.get("failed", 0), result.get("skipped", 0),
+                 int(bool(result.get("stopped_early"))), result.get("error")),
+            )
+
+    def last_run(self):
+        """The most recent run as a dict, or None before the first one"""
+        with self.lock:
+            cursor = self.conn.execute("SELECT * FROM runs ORDER BY id DESC LIMIT 1")
+            row = cursor.fetchone()
+            if row is None:
+                return None
+            return dict(zip([c[0] for c in cursor.description], row))
+
+    def seen_count(self):
+        with self.lock:
+            return self.conn.execute("SELECT count(*) FROM seen_jobs").fetchone()[0]
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
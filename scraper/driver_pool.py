@@ -0,0 +1,271 @@
+"""
+Pool of browser processes for sharded crawling
+
+Each worker is a separate process driving its own headless Chrome with a
+throwaway profile directory, so browsers share no cookies, cache or locks.
+Shards (category URLs, or page ranges of the listing) are handed out one at
+a time; the captured page HTML comes back to the parent, which feeds it into
+the normal ScrapePipeline where cards are parsed, deduplicated by job URL
+and posted once.
+
+The parent restarts any worker whose process dies, retrying its shard, and
+recycles the heaviest worker whenever the pool's total memory (workers plus
+their Chrome processes) goes over memory_limit_mb.
+"""
+
+import multiprocessing
+import os
+import queue
+import shutil
+import signal
+import tempfile
+import time
+from collections import deque
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+# Listing pages addressed directly, for sharding a page range across browsers
+PAGE_URL_TEMPLATE = "https://www.actuarylist.com/?page={page}"
+
+
+def page_range_shards(pages, drivers, page_url_template=PAGE_URL_TEMPLATE, first_page=1):
+    """Split pages first_page.. into contiguous ranges, about two per driver
+
+    Each shard opens its first page by URL and clicks through the rest, so
+    only one direct page load per shard is needed.
+    """
+    per_shard = max(1, -(-pages // (drivers * 2)))
+    return [
+        {"url": page_url_template.format(page=start), "max_pages": min(per_shard, first_page + pages - start)}
+        for start in range(first_page, first_page + pages, per_shard)
+    ]
+
+
+def url_shards(urls, max_pages=None):
+    """One shard per category/listing URL, following its pagination"""
+    return [{"url": url, "max_pages": max_pages} for url in urls]
+
+
+def browse_shard(session, shard, options):
+    """Default fetcher: open shard["url"] in this worker's browser and yield page HTML
+
+    The driver is started on first use and kept in session for the
+    worker's following shards.
+    """
+    from scraper_jobs import ActuaryJobScraper
+
+    scraper = session.get("scraper")
+    if scraper is None:
+        scraper = ActuaryJobScraper(headless=options.get("headless", True), profile_dir=session["profile_dir"])
+        scraper.setup_driver()
+        if not scraper.driver:
+            raise RuntimeError("Chrome driver not initialized")
+        session["scraper"] = scraper
+        session["close"] = scraper.driver.quit
+    scraper.jobs_url = shard["url"]
+    for n, html in enumerate(scraper.iter_pages(), 1):
+        yield html
+        if shard.get("max_pages") and n >= shard["max_pages"]:
+            return
+
+
+def worker_main(worker_id, profile_dir, tasks, results, fetch, options):
+    """Worker process: fetch each shard sent on tasks until it receives None"""
+    session = {"worker_id": worker_id, "profile_dir": profile_dir}
+    try:
+        while True:
+            shard = tasks.get()
+            if shard is None:
+                return
+            try:
+                for html in fetch(session, shard, options):
+                    results.put(("page", worker_id, shard["id"], html))
+                results.put(("done", worker_id, shard["id"], None))
+            except Exception as e:
+                results.put(("error", worker_id, shard["id"], f"{type(e).__name__}: {e}"))
+    finally:
+        if session.get("close"):
+            try:
+                session["close"]()
+            except Exception:
+                pass
+
+
+def process_tree(pid):
+    """{pid: resident bytes} for pid and all of its descendants ({} if gone)"""
+    if psutil is not None:
+        try:
+            process = psutil.Process(pid)
+            return {p.pid: p.memory_info().rss for p in [process] + process.children(recursive=True)}
+        except psutil.Error:
+            return {}
+    # Linux without psutil: build the parent -> children map from /proc
+    children, rss = {}, {}
+    page_size = os.sysconf("SC_PAGE_SIZE")
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat") as f:
+                fields = f.read().rsplit(")", 1)[1].split()
+        except OSError:
+            continue
+        children.setdefault(int(fields[1]), []).append(int(entry))
+        rss[int(entry)] = int(fields[21]) * page_size
+    tree, stack = {}, [pid]
+    while stack:
+        current = stack.pop()
+        if current in rss:
+            tree[current] = rss[current]
+            stack.extend(children.get(current, []))
+    return tree
+
+
+class DriverPool:
+    """N browser worker processes crawling shards in parallel
+
+    fetch(session, shard, options) runs in the worker and yields page HTML;
+    it must be a module-level function so it can be sent to spawned
+    processes. session is a per-worker dict (profile_dir, plus whatever the
+    fetcher keeps there, e.g. its driver and a "close" callback).
+    """
+
+    def __init__(self, size=2, fetch=browse_shard, options=None, memory_limit_mb=None,
+                 max_attempts=2, check_interval=2.0):
+        self.size = max(1, size)
+        self.fetch = fetch
+        self.options = options or {}
+        self.memory_limit = memory_limit_mb * 1024 * 1024 if memory_limit_mb else None
+        self.max_attempts = max_attempts
+        self.check_interval = check_interval
+        # Spawned, not forked: the parent already runs pipeline threads
+        self.context = multiprocessing.get_context("spawn")
+        self.results = self.context.Queue()
+        self.workers = {}  # worker_id -> {"process", "tasks", "shard"}
+        self.next_worker_id = 0
+        self.stats = {"shards": 0, "pages": 0, "failed_shards": 0, "restarts": 0, "recycled_for_memory": 0}
+
+    def start_worker(self):
+        worker_id = self.next_worker_id
+        self.next_worker_id += 1
+        tasks = self.context.Queue()
+        # Created here rather than in the worker so it is removed even when
+        # the worker has to be killed
+        profile_dir = tempfile.mkdtemp(prefix=f"scraper-profile-{worker_id}-")
+        process = self.context.Process(target=worker_main, daemon=True,
+                                       args=(worker_id, profile_dir, tasks, self.results, self.fetch, self.options))
+        process.start()
+        self.workers[worker_id] = {"process": process, "tasks": tasks, "shard": None, "profile_dir": profile_dir}
+
+    def stop_worker(self, worker_id):
+        worker = self.workers.pop(worker_id)
+        process = worker["process"]
+        # Chrome outlives a killed worker unless its processes are found
+        # first; once the worker is gone they are reparented out of reach
+        descendants = [pid for pid in process_tree(process.pid) if pid != process.pid] if process.is_alive() else []
+        worker["tasks"].cancel_join_thread()
+        process.terminate()
+        process.join(5)
+        if process.is_alive():
+            process.kill()
+            process.join()
+        for pid in descendants:
+            try:
+                os.kill(pid, signal.SIGKILL)
+            except OSError:
+                pass
+        shutil.rmtree(worker["profile_dir"], ignore_errors=True)
+        return worker["shard"]
+
+    def retry(self, shard, pending, reason):
+        shard["attempts"] += 1
+        if shard["attempts"] < self.max_attempts:
+            print(f"🔁 Retrying shard {shard['id']} ({shard['url']}): {reason}")
+            pending.appendleft(shard)
+        else:
+            self.stats["failed_shards"] += 1
+            print(f"❌ Giving up on shard {shard['id']} ({shard['url']}): {reason}")
+
+    def check_workers(self, pending):
+        """Replace dead workers and recycle the heaviest one over the memory cap"""
+        for worker_id, worker in list(self.workers.items()):
+            if not worker["process"].is_alive():
+                shard = self.stop_worker(worker_id)
+                self.stats["restarts"] += 1
+                print(f"💥 Browser worker {worker_id} exited (code {worker['process'].exitcode}), restarting")
+                if shard:
+                    self.retry(shard, pending, "worker crashed")
+                self.start_worker()
+
+        if self.memory_limit is None:
+            return
+        usage = {worker_id: sum(process_tree(worker["process"].pid).values())
+                 for worker_id, worker in self.workers.items()}
+        total = sum(usage.values())
+        if total > self.memory_limit and usage:
+            worker_id = max(usage, key=usage.get)
+            print(f"♻️ Pool using {total / 2**20:.0f} MB (cap {self.memory_limit / 2**20:.0f} MB), "
+                  f"recycling worker {worker_id} ({usage[worker_id] / 2**20:.0f} MB)")
+            shard = self.stop_worker(worker_id)
+            self.stats["recycled_for_memory"] += 1
+            if shard:
+                self.retry(shard, pending, "recycled for memory")
+            self.start_worker()
+
+    def iter_pages(self, shards):
+        """Crawl every shard across the pool, yielding page HTML as it arrives
+
+        Pages from different shards interleave. Closing the generator (the
+        pipeline does once max_jobs is reached) shuts the workers down.
+        """
+        pending = deque(dict(shard, id=i, attempts=0) for i, shard in enumerate(shards))
+        for _ in range(min(self.size, len(pending))):
+            self.start_worker()
+        last_check = time.monotonic()
+        try:
+            while pending or any(worker["shard"] for worker in self.workers.values()):
+                for worker in self.workers.values():
+                    if worker["shard"] is None and pending:
+                        worker["shard"] = pending.popleft()
+                        worker["tasks"].put(worker["shard"])
+
+                if time.monotonic() - last_check >= self.check_interval:
+                    self.check_workers(pending)
+                    last_check = time.monotonic()
+                try:
+                    kind, worker_id, shard_id, payload = self.results.get(timeout=self.check_interval)
+                except queue.Empty:
+                    continue
+                worker = self.workers.get(worker_id)
+                current = worker["shard"] if worker else None
+                if current is None or current["id"] != shard_id:
+                    continue  # Left over from a worker that was restarted
+                if kind == "page":
+                    self.stats["pages"] += 1
+                    yield payload
+                elif kind == "done":
+                    self.stats["shards"] += 1
+                    worker["shard"] = None
+                else:
+                    # The browser may be wedged after an error; start a clean one
+                    self.stop_worker(worker_id)
+                    self.stats["restarts"] += 1
+                    self.retry(current, pending, payload)
+                    self.start_worker()
+        finally:
+            self.close()
+
+    def close(self):
+        """Stop every worker: idle ones finish cleanly, busy ones are terminated"""
+        for worker_id, worker in list(self.workers.items()):
+            if worker["shard"] is None:
+                worker["tasks"].put(None)
+            else:
+                self.stop_worker(worker_id)
+        deadline = time.monotonic() + 10
+        for worker_id in list(self.workers):
+            self.workers[worker_id]["process"].join(max(0, deadline - time.monotonic()))
+            self.stop_worker(worker_id)
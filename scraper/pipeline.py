@@ -0,0 +1,238 @@
+"""
+Concurrent scrape pipeline: page capture -> card parsing -> API posting
+
+Each stage runs on its own thread(s) and hands work to the next through a
+bounded queue, so a slow stage blocks the one feeding it instead of letting
+work pile up in memory.
+"""
+
+import queue
+import threading
+import time
+
+from bs4 import BeautifulSoup
+
+_DONE = object()  # Sentinel telling a worker its input is exhausted
+
+
+class ScrapePipeline:
+    def __init__(self, scraper, parse_workers=2, post_workers=4, page_queue_size=4, job_queue_size=100):
+        self.scraper = scraper
+        self.parse_workers = max(1, parse_workers)
+        self.post_workers = max(1, post_workers)
+        self.page_queue = queue.Queue(maxsize=page_queue_size)
+        self.job_queue = queue.Queue(maxsize=job_queue_size)
+        self.stop = threading.Event()
+        self.lock = threading.Lock()
+        self.claimed = 0
+        self.stats = {"posted": 0, "failed": 0, "skipped": 0, "duplicates": 0}
+        self.seen_urls = set()  # Job URLs already taken from an earlier page this run
+        self.known_pages = 0  # Pages on which every card was already seen unchanged
+        self.stopped_early = False
+        self.parse_times = []  # Seconds spent parsing + extracting each page
+
+    def count(self, key, n=1):
+        with self.lock:
+            self.stats[key] += n
+
+    def claim(self, n, max_jobs):
+        """Reserve up to n of the remaining max_jobs; sets stop once exhausted"""
+        with self.lock:
+            take = max(0, min(n, max_jobs - self.claimed))
+            self.claimed += take
+            if self.claimed >= max_jobs:
+                self.stop.set()
+            return take
+
+    def parse_worker(self, max_jobs):
+        """Parse stage: turn captured page HTML into validated job dicts"""
+        while True:
+            html = self.page_queue.get()
+            if html is _DONE:
+                self.page_queue.task_done()
+                return
+            start = time.perf_counter()
+            try:
+                soup = BeautifulSoup(html, self.scraper.html_parser)
+                job_elements = self.scraper.find_job_elements(soup)
+                if not job_elements:
+                    print("❌ No job elements found. Website structure may have changed.")
+                    self.stop.set()
+                    continue
+                job_elements, urls = self.dedupe(job_elements)
+                if not job_elements:
+                    continue
+                job_elements = job_elements[:self.claim(len(job_elements), max_jobs)]
+                print(f"📋 Processing {len(job_elements)} jobs from this page...")
+
+                # One lookup per page so unchanged jobs aren't re-posted
+                known_hashes = self.lookup_hashes(urls[:len(job_elements)])
+                unchanged = [self.parse_card(job_elem, known_hashes) for job_elem in job_elements]
+                self.mark_seen([entry for entry in unchanged if entry])
+                if job_elements and all(unchanged):
+                    self.page_known()
+            except Exception as e:
+                print(f"❌ Error parsing page: {e}")
+            finally:
+                self.page_queue.task_done()
+            with self.lock:
+                self.parse_times.append(time.perf_counter() - start)
+
+    def dedupe(self, job_elements):
+        """Drop cards whose job URL an earlier page already yielded
+
+        Shards crawled in parallel can overlap (listings shift while they
+        run, retried shards start over), so each job is posted once per run.
+        Returns the remaining cards and their URLs.
+        """
+        urls = [self.scraper.extract_job_url(elem) for elem in job_elements]
+        keep = []
+        with self.lock:
+            for i, url in enumerate(urls):
+                if url and url in self.seen_urls:
+                    continue
+                self.seen_urls.add(url)
+                keep.append(i)
+            self.stats["duplicates"] += len(urls) - len(keep)
+        return [job_elements[i] for i in keep], [urls[i] for i in keep]
+
+    def lookup_hashes(self, urls):
+        """Content hashes for this page's URLs: local crawl state first, API for the rest"""
+        state = self.scraper.crawl_state
+        if state is None:
+            return self.scraper.fetch_known_hashes(urls)
+        known_hashes = state.known_hashes(urls)
+        missing = [url for url in urls if url and url not in known_hashes]
+        if missing:
+            known_hashes.update(self.scraper.fetch_known_hashes(missing))
+        return known_hashes
+
+    def mark_seen(self, entries):
+        if self.scraper.crawl_state is not None:
+            self.scraper.crawl_state.mark_seen(entries)
+
+    def page_known(self):
+        """Stop paginating once stop_after_known_pages pages held nothing new
+
+        Listings are newest first, so past a page of already-seen jobs the
+        rest of the site has been crawled by an earlier run.
+        """
+        if self.scraper.crawl_state is None or not self.scraper.stop_after_known_pages:
+            return
+        with self.lock:
+            self.known_pages += 1
+            if self.known_pages < self.scraper.stop_after_known_pages or self.stopped_early:
+                return
+            self.stopped_early = True
+        print("🛑 Reached a page of already-seen jobs, stopping pagination")
+        self.stop.set()
+
+    def parse_card(self, job_elem, known_hashes):
+        """Queue one card for posting; returns (url, hash) if it was unchanged, else None"""
+        try:
+            job_data = self.scraper.extract_job_data(job_elem)
+        except Exception as e:
+            self.count("failed")
+            print(f"❌ Error processing job: {e}")
+            return None
+
+        content_hash = self.scraper.content_hash(job_data)
+        if known_hashes.get(job_data['job_url']) == content_hash:
+            self.count("skipped")
+            print(f"⏭️ Unchanged since last run, skipping: {job_data['title']}")
+            return job_data['job_url'], content_hash
+        elif job_data.get('title') and job_data.get('company'):
+            print(f"📝 Valid job found: {job_data['title']} at {job_data['company']}")
+            self.job_queue.put(job_data)  # Blocks while the posters are behind
+        else:
+            print(f"⚠️ Skipped job: Missing title '{job_data.get('title', 'N/A')}' or company '{job_data.get('company', 'N/A')}'")
+        return None
+
+    def post_worker(self):
+        """Post stage: send jobs to the API one by one or in bulk batches"""
+        batch = []
+        while True:
+            job_data = self.job_queue.get()
+            if job_data is _DONE:
+                break
+            if self.scraper.batch_size > 1:
+                batch.append(job_data)
+                if len(batch) >= self.scraper.batch_size:
+                    self.post_batch(batch)
+                    batch = []
+                continue
+
+            result = self.scraper.post_job_to_api(job_data)
+            if result["success"]:
+                self.count("posted")
+                self.mark_seen([(job_data['job_url'], self.scraper.content_hash(job_data))])
+                print(f"✅ Posted job: {job_data['title']}")
+            else:
+                self.count("failed")
+                print(f"❌ Failed to post: {result['error']}")
+        self.post_batch(batch)
+
+    def post_batch(self, batch):
+        if not batch:
+            return
+        result = self.scraper.post_jobs_bulk(batch)
+        self.count("posted", result["posted"])
+        self.count("failed", result["failed"])
+        self.mark_seen([(job_data['job_url'], self.scraper.content_hash(job_data)) for job_data in result["succeeded"]])
+        print(f"📦 Flushed {len(batch)} jobs: {result['posted']} posted, {result['failed']} failed")
+        for error in result["errors"]:
+            print(f"❌ Failed to post: {error}")
+
+    def run(self, pages, max_jobs=100):
+        """Feed page HTML from the pages iterator through the pipeline
+
+        pages is consumed on the calling thread (the browser stage) until it
+        is exhausted or max_jobs cards have been claimed by the parsers.
+        Returns {"posted": int, "failed": int, "skipped": int, "duplicates": int, "pages": int,
+        "parse_ms_per_page": float, "stopped_early": bool}, plus "error" if
+        the page source raised. stopped_early means pagination ended at a
+        page of jobs already in the crawl state.
+        Parse time includes the hash lookup and waiting on a full job queue.
+        """
+        parsers = [threading.Thread(target=self.parse_worker, args=(max_jobs,), daemon=True)
+                   for _ in range(self.parse_workers)]
+        posters = [threading.Thread(target=self.post_worker, daemon=True)
+                   for _ in range(self.post_workers)]
+        for thread in parsers + posters:
+            thread.start()
+
+        error = None
+        try:
+            for html in pages:
+                self.page_queue.put(html)  # Blocks while the parsers are behind
+                if self.scraper.crawl_state is not None:
+                    # Incremental runs wait for each page's verdict before
+                    # navigating on, so an early stop wastes no page loads
+                    self.page_queue.join()
+                if self.stop.is_set():
+                    break
+        except Exception as e:
+            error = str(e)
+        finally:
+            if hasattr(pages, "close"):
+                pages.close()
+
+            # Drain in stage order so every queued item is finished
+            for _ in parsers:
+                self.page_queue.put(_DONE)
+            for thread in parsers:
+                thread.join()
+            for _ in posters:
+                self.job_queue.put(_DONE)
+            for thread in posters:
+                thread.join()
+
+        result = dict(self.stats)
+        result["pages"] = len(self.parse_times)
+        result["stopped_early"] = self.stopped_early
+        result["parse_ms_per_page"] = (
+            round(sum(self.parse_times) / len(self.parse_times) * 1000, 3) if self.parse_times else 0.0
+        )
+        if error:
+            result["error"] = error
+        return result
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Incremental scrape daemon
+
+Runs the scraper on a fixed interval against a persistent crawl state
+(crawl_state.py). The first run crawls up to --max-jobs; after that each
+run posts only new or changed listings and stops paginating at the first
+page of jobs it has already seen, so a steady-state run is a page or two of
+browser time and a handful of API calls.
+
+    python scheduler.py --interval 1800 --state crawl_state.db
+    python scheduler.py --once --replay-dir fixtures
+
+SIGINT/SIGTERM finish the current run and exit.
+"""
+
+import argparse
+import signal
+import threading
+import time
+
+from crawl_state import CrawlState
+from scraper_jobs import ActuaryJobScraper
+
+
+def run_scheduled(make_scraper, crawl_state, interval, max_jobs, stop, max_runs=None):
+    """Run make_scraper(crawl_state).scrape_and_post_jobs every interval seconds
+
+    Each run starts interval seconds after the previous one started (or
+    straight away if that one overran) until stop is set or max_runs is
+    reached. Returns the list of run results.
+    """
+    results = []
+    next_start = time.monotonic()
+    while not stop.is_set() and (max_runs is None or len(results) < max_runs):
+        seen_before = crawl_state.seen_count()
+        print(f"⏰ Run {len(results) + 1} starting ({seen_before} jobs in crawl state)")
+        try:
+            result = make_scraper(crawl_state).scrape_and_post_jobs(max_jobs)
+        except Exception as e:
+            print(f"💥 Run failed: {e}")
+            result = {"posted": 0, "failed": 0, "error": str(e)}
+        results.append(result)
+        print(f"📊 Run {len(results)}: {result.get('posted', 0)} posted, {result.get('skipped', 0)} unchanged, "
+              f"{result.get('pages', 0)} page(s), {crawl_state.seen_count() - seen_before} new in crawl state")
+
+        next_start += interval
+        if max_runs is not None and len(results) >= max_runs:
+            break
+        wait = max(0.0, next_start - time.monotonic())
+        if wait:
+            print(f"💤 Next run in {wait:.0f}s")
+        stop.wait(wait)
+        next_start = max(next_start, time.monotonic())
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Scrape incrementally on a fixed interval")
+    parser.add_argument("--interval", type=float, default=1800, help="seconds between run starts")
+    parser.add_argument("--state", default="crawl_state.db", help="SQLite crawl state file")
+    parser.add_argument("--once", action="store_true", help="run a single incremental scrape and exit")
+    parser.add_argument("--max-jobs", type=int, default=1000, help="cap per run (the first run posts up to this)")
+    parser.add_argument("--stop-after-known-pages", type=int, default=1,
+                        help="pages of already-seen jobs before pagination stops (0 never stops early)")
+    parser.add_argument("--api", default="http://localhost:5000/jobs", help="jobs endpoint to post to")
+    parser.add_argument("--batch-size", type=int, default=50, help="jobs per bulk request (1 posts individually)")
+    parser.add_argument("--replay-dir", help="replay saved pages instead of opening a browser")
+    parser.add_argument("--visible", action="store_true", help="show the browser window")
+    options = parser.parse_args()
+
+    stop = threading.Event()
+
+    def request_stop(signum, frame):
+        print("🛑 Stopping after the current run...")
+        stop.set()
+
+    signal.signal(signal.SIGINT, request_stop)
+    signal.signal(signal.SIGTERM, request_stop)
+
+    def make_scraper(crawl_state):
+        # A fresh scraper per run: each run closes its browser and API session
+        return ActuaryJobScraper(api_endpoint=options.api, headless=not options.visible,
+                                 batch_size=options.batch_size, replay_dir=options.replay_dir,
+                                 crawl_state=crawl_state, stop_after_known_pages=options.stop_after_known_pages)
+
+    crawl_state = CrawlState(options.state)
+    try:
+        last = crawl_state.last_run()
+        if last:
+            print(f"📂 Resuming from {options.state}: last run finished {last['finished_at']}")
+        run_scheduled(make_scraper, crawl_state, options.interval, options.max_jobs, stop,
+                      max_runs=1 if options.once else None)
+    finally:
+        crawl_state.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -3,30 +3,175 @@
 Fixed Actuary List Scraper with Improved Data Extraction
 """
 
+import os
+import glob
+import importlib.util
 import time
 import re
+import hashlib
+import threading
 import requests
 import json
 from datetime import datetime, timedelta
-import undetected_chromedriver as uc
+from bs4 import BeautifulSoup
+
+# The browser stack is only needed for live scraping; replay mode runs without it
+try:
+    import undetected_chromedriver as uc
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.support.ui import WebDriverWait
+    from selenium.webdriver.support import expected_conditions as EC
+    from selenium.common.exceptions import StaleElementReferenceException, TimeoutException
+except ImportError:
+    uc = None
+
+from api_client import ApiClient
+from crawl_state import CrawlState
+from driver_pool import DriverPool
+from pipeline import ScrapePipeline
+from throttle import AdaptiveThrottle
 
 profile_path = "replace this with your profile path"
 
+# lxml builds the page tree several times faster than the pure-Python parser;
+# fall back to html.parser when it isn't installed.
+DEFAULT_HTML_PARSER = "lxml" if importlib.util.find_spec("lxml") else "html.parser"
+
+# Pagination controls, tried in order on the live page and on replayed snapshots
+NEXT_PAGE_SELECTORS = [
+    "a[rel='next']",
+    "button[aria-label='Next']",
+    ".pagination-next",
+    "button.next",
+    "a.next",
+    "li.next > a",
+    "li[aria-label='Next'] a"
+]
+
+# Live-page job cards; waits key off these instead of fixed sleeps
+JOB_CARD_SELECTOR = "div.Job_job-card__YgDAV"
+# Seconds to wait for cards to render or change before giving up on a page
+PAGE_TIMEOUT = 20
+COOKIE_SELECTORS = [
+    "button[class*='cookie']",
+    "button[class*='consent']",
+    "button[class*='accept']",
+    "#cookie-accept",
+    ".cookie-accept"
+]
+
+# Set window.__jobsChanged when anything under the cards' container changes,
+# so a client-side page switch that reuses the card nodes is still noticed
+WATCH_CARDS_JS = """
+window.__jobsChanged = false;
+var card = document.querySelector(arguments[0]);
+if (card && card.parentNode) {
+    if (window.__jobsObserver) { window.__jobsObserver.disconnect(); }
+    window.__jobsObserver = new MutationObserver(function () { window.__jobsChanged = true; });
+    window.__jobsObserver.observe(card.parentNode, {childList: true, subtree: true, characterData: true});
+}
+"""
+
+# Card elements located by (tag name, class) in a single walk over the card
+CARD_FIELDS = {
+    "title": ("p", "Job_job-card__position__ic1rc"),
+    "company": ("p", "Job_job-card__company__7T9qY"),
+    "locations": ("div", "Job_job-card__locations__x1exr"),
+    "date": ("span", "Job_job-card__posted-on__NCZaJ"),
+    "link": ("a", "Job_job-page-link__a5I5g"),
+}
+LOCATION_CLASS = "Job_job-card__location__bq7jX"
+PIN_CLASS = "Job_job-card__pin__N5sZd"
+
+# Tag-ish elements: the same set the CSS selectors ".tag, .badge, .label,
+# .chip, .skill, [class*='tag'], [class*='badge'], [class*='skill'],
+# .category, .keyword, .requirement" pick out, tested without soupsieve
+TAG_CLASSES = {"tag", "badge", "label", "chip", "skill", "category", "keyword", "requirement"}
+TAG_CLASS_SUBSTRINGS = ("tag", "badge", "skill")
+
+# Common actuarial keywords, matched as whole words in one regex pass.
+# Longest first so "Risk Management" wins over any shorter overlap.
+KEYWORDS = [
+    "Life", "Health", "P&C", "Property", "Casualty",
+    "Python", "R", "SQL", "Excel", "VBA", "SAS",
+    "Pricing", "Reserving", "Valuation", "Risk Management",
+    "ASA", "FSA", "Fellow", "Associate", "Analyst",
+    "ACAS", "FCAS", "Actuarial", "Insurance", "Reinsurance"
+]
+KEYWORD_PATTERN = re.compile(
+    r"(?<!\w)(" + "|".join(re.escape(k) for k in sorted(KEYWORDS, key=len, reverse=True)) + r")(?!\w)",
+    re.IGNORECASE
+)
+KEYWORDS_BY_UPPER = {k.upper(): k for k in KEYWORDS}
+
 class ActuaryJobScraper:
-    def __init__(self, api_endpoint="http://localhost:5000/jobs", headless=True):
+    def __init__(self, api_endpoint="http://localhost:5000/jobs", headless=True, batch_size=1,
+                 parse_workers=2, post_workers=4, page_queue_size=4, job_queue_size=100,
+                 max_retries=3, dead_letter_path="failed_jobs.ndjson", html_parser=DEFAULT_HTML_PARSER,
+                 debug=False, replay_dir=None, crawl_state=None, stop_after_known_pages=1,
+                 profile_dir=None, drivers=1, shards=None, memory_limit_mb=None):
         self.base_url = "https://www.actuarylist.com"
         self.jobs_url = f"{self.base_url}"
         self.api_endpoint = api_endpoint
+        self.bulk_endpoint = f"{api_endpoint.rstrip('/')}/bulk"
         self.headless = headless
         self.driver = None
+        # Chrome --user-data-dir; pool workers each get a fresh temporary one
+        self.profile_dir = profile_dir if profile_dir is not None else profile_path
+        # Shards (driver_pool.page_range_shards / url_shards) crawled by a
+        # pool of `drivers` browser processes instead of a single browser
+        self.drivers = drivers
+        self.shards = shards
+        self.memory_limit_mb = memory_limit_mb
+        self.pool_stats = None
+        self.html_parser = html_parser
+        self.debug = debug
+        # Directory of saved listing pages to replay instead of driving a browser
+        self.replay_dir = replay_dir
+        # Persistent record of jobs seen by earlier runs (a CrawlState); with
+        # it, pagination stops after stop_after_known_pages pages of known,
+        # unchanged jobs (0 crawls every page regardless)
+        self.crawl_state = crawl_state
+        self.stop_after_known_pages = stop_after_known_pages
+        # batch_size > 1 buffers jobs and sends them through the bulk endpoint
+        self.batch_size = batch_size
+        # Pipeline concurrency: parser/poster thread counts and queue bounds
+        self.parse_workers = parse_workers
+        self.post_workers = post_workers
+        self.page_queue_size = page_queue_size
+        self.job_queue_size = job_queue_size
+        # One keep-alive session shared by every poster thread
+        self.client = ApiClient(
+            pool_size=post_workers + 1,
+            max_retries=max_retries,
+            headers={
+                "User-Agent": "ActuaryJobScraper/1.0",
+                "X-From-Scraper": "true"
+            }
+        )
+        # Paces page navigations by how quickly the site has been responding
+        self.throttle = AdaptiveThrottle()
+        self.page_times = []  # Wall seconds from navigation to rendered cards, per page
+        # Jobs that still fail after retries are appended here for replay
+        self.dead_letter_path = dead_letter_path
+        self.dead_letter_lock = threading.Lock()
     
+    def debug_log(self, message):
+        if self.debug:
+            print(f"[DEBUG] {message}")
+
     def setup_driver(self):
         """Initialize Undetected Chrome WebDriver"""
+        if uc is None:
+            print("❌ undetected-chromedriver/selenium are not installed (replay mode works without them)")
+            self.driver = None
+            return
+
         options = uc.ChromeOptions()
 
         # Use user profile if needed (optional, can comment out if not needed)
-        if profile_path:
-            options.add_argument(f"--user-data-dir={profile_path}")
+        if self.profile_dir:
+            options.add_argument(f"--user-data-dir={self.profile_dir}")
 
         # Additional stealth options
         options.add_argument('--disable-extensions')
@@ -38,7 +183,7 @@ class ActuaryJobScraper:
         options.add_argument('--disable-features=VizDisplayCompositor')
         
 
-        CHROME_VERSION = #your chrome version e.g 128, 130 
+        CHROME_VERSION = None  # your chrome version e.g 128, 130 (None = auto-detect)
         try:
             self.driver = uc.Chrome(options=options, version_main=CHROME_VERSION)
             self.driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
@@ -89,115 +234,225 @@ class ActuaryJobScraper:
         else:
             return "Full-Time"  # Default
     
-    def extract_tags(self, job_element):
+    def is_tag_element(self, classes):
+        if not TAG_CLASSES.isdisjoint(classes):
+            return True
+        class_attr = " ".join(classes)
+        return any(part in class_attr for part in TAG_CLASS_SUBSTRINGS)
+
+    def scan_card(self, job_element):
+        """Walk a card's elements once, picking out everything extraction needs"""
+        found = {"tags": []}
+        for elem in job_element.descendants:
+            if elem.name is None:
+                continue  # Text node
+            classes = elem.get('class')
+            if not classes:
+                continue
+            for field, (name, class_name) in CARD_FIELDS.items():
+                if field not in found and elem.name == name and class_name in classes:
+                    found[field] = elem
+            if self.is_tag_element(classes):
+                found["tags"].append(elem)
+        return found
+
+    def extract_tags(self, job_element, job_text=None, tag_elems=None):
         """Extract tags/keywords from job listing"""
         tags = []
         
-        # Look for tag elements with various selectors
-        tag_selectors = [
-            ".tag", ".badge", ".label", ".chip", ".skill",
-            "[class*='tag']", "[class*='badge']", "[class*='skill']",
-            ".category", ".keyword", ".requirement"
-        ]
-        
-        for selector in tag_selectors:
-            try:
-                elements = job_element.select(selector)
-                for elem in elements:
-                    tag = elem.get_text().strip()
-                    if tag and 2 < len(tag) < 30 and tag not in tags:
-                        tags.append(tag)
-            except:
-                continue
+        # Look for tag elements (collected by scan_card when called from extract_job_data)
+        if tag_elems is None:
+            tag_elems = [elem for elem in job_element.find_all(True)
+                         if elem.get('class') and self.is_tag_element(elem['class'])]
+        for elem in tag_elems:
+            tag = elem.get_text().strip()
+            if tag and 2 < len(tag) < 30 and tag not in tags:
+                tags.append(tag)
         
         # Extract common actuarial keywords from text
-        keywords = [
-            "Life", "Health", "P&C", "Property", "Casualty",
-            "Python", "R", "SQL", "Excel", "VBA", "SAS",
-            "Pricing", "Reserving", "Valuation", "Risk Management",
-            "ASA", "FSA", "Fellow", "Associate", "Analyst",
-            "ACAS", "FCAS", "Actuarial", "Insurance", "Reinsurance"
-        ]
-        
-        job_text = job_element.get_text().upper()
-        for keyword in keywords:
-            if keyword.upper() in job_text and keyword not in tags:
+        if job_text is None:
+            job_text = job_element.get_text()
+        for match in KEYWORD_PATTERN.findall(job_text):
+            keyword = KEYWORDS_BY_UPPER[match.upper()]
+            if keyword not in tags:
                 tags.append(keyword)
         
-        return list(set(tags))[:8]  # Remove duplicates, limit to 8
+        return tags[:8]  # Limit to 8
     
+    def extract_title(self, title_elem):
+        """Title text without the 'Featured' pin, read straight from the parsed tree"""
+        pin_elem = title_elem.find(class_=PIN_CLASS)
+        pin_text = {id(text) for text in pin_elem.find_all(string=True)} if pin_elem else set()
+        parts = [text.strip() for text in title_elem.find_all(string=True) if id(text) not in pin_text]
+        title = "".join(part for part in parts if part)
+        if title:
+            return title
+
+        # Spec-compliant parsers such as lxml close the title <p> when the pin
+        # <p> opens inside it, leaving the title text as the pin's sibling.
+        for sibling in title_elem.next_siblings:
+            if getattr(sibling, 'name', None) is None:
+                parts.append(sibling.strip())
+            elif PIN_CLASS not in (sibling.get('class') or []):
+                break
+        return "".join(part for part in parts if part)
+
+    def build_payload(self, job_data):
+        """Build the API payload for one job with scraper marker and ISO date string"""
+        # Ensure tags is always a list before joining
+        tags = job_data["tags"]
+        if not isinstance(tags, list):
+            # Try to convert to list if it's a string (split by comma, strip whitespace)
+            tags = [t.strip() for t in str(tags).split(",") if t.strip()]
+        return {
+            "title": job_data["title"],
+            "company": job_data["company"],
+            "location": job_data["location"],
+            "posting_date": job_data["posting_date"].isoformat() if hasattr(job_data["posting_date"], 'isoformat') else str(job_data["posting_date"]),
+            "job_url": job_data["job_url"],
+            "job_type": job_data["job_type"],
+            "tags": ",".join(tags),
+            "from_scraper": True  # Mark this as coming from the scraper
+        }
+
+    def dead_letter(self, payloads, error):
+        """Append payloads that could not be posted to the dead-letter file"""
+        if not self.dead_letter_path or not payloads:
+            return
+        failed_at = datetime.now().isoformat()
+        with self.dead_letter_lock, open(self.dead_letter_path, "a", encoding="utf-8") as f:
+            for payload in payloads:
+                f.write(json.dumps({"payload": payload, "error": error, "failed_at": failed_at}) + "\n")
+        print(f"📮 Wrote {len(payloads)} job(s) to dead-letter file {self.dead_letter_path}")
+
     def post_job_to_api(self, job_data):
-        """Post single job to your API endpoint with scraper marker and ISO date string"""
+        """Post single job to your API endpoint"""
+        payload = None
         try:
-            # Ensure tags is always a list before joining
-            tags = job_data["tags"]
-            if not isinstance(tags, list):
-                # Try to convert to list if it's a string (split by comma, strip whitespace)
-                tags = [t.strip() for t in str(tags).split(",") if t.strip()]
-            payload = {
-                "title": job_data["title"],
-                "company": job_data["company"],
-                "location": job_data["location"],
-                "posting_date": job_data["posting_date"].isoformat() if hasattr(job_data["posting_date"], 'isoformat') else str(job_data["posting_date"]),
-                "job_url": job_data["job_url"],
-                "job_type": job_data["job_type"],
-                "tags": ",".join(tags),
-                "from_scraper": True  # Mark this as coming from the scraper
-            }
-            headers = {
-                "Content-Type": "application/json",
-                "User-Agent": "ActuaryJobScraper/1.0",
-                "X-From-Scraper": "true"
-            }
-            print(f"[DEBUG] Posting payload: {json.dumps(payload, indent=2)}")
-            response = requests.post(
-                self.api_endpoint,
-                json=payload,
-                headers=headers,
-                timeout=10
-            )
-            print(f"[DEBUG] API Response Status: {response.status_code}")
-            print(f"[DEBUG] API Response Headers: {dict(response.headers)}")
+            payload = self.build_payload(job_data)
+            if self.debug:
+                self.debug_log(f"Posting payload: {json.dumps(payload, indent=2)}")
+            response = self.client.post(self.api_endpoint, json=payload, timeout=10)
+            self.debug_log(f"API Response Status: {response.status_code}")
+            self.debug_log(f"API Response Headers: {dict(response.headers)}")
             if response.status_code in [200, 201]:
                 return {"success": True, "message": "Job posted successfully"}
             else:
-                print(f"[DEBUG] API Response Body: {response.text[:500]}")
-                return {"success": False, "error": f"API returned {response.status_code}: {response.text[:200]}"}
+                self.debug_log(f"API Response Body: {response.text[:500]}")
+                error = f"API returned {response.status_code}: {response.text[:200]}"
         except requests.exceptions.RequestException as e:
-            return {"success": False, "error": f"Request failed: {str(e)}"}
+            error = f"Request failed: {str(e)}"
         except Exception as e:
-            return {"success": False, "error": f"Unexpected error: {str(e)}"}
-    
+            error = f"Unexpected error: {str(e)}"
+        self.dead_letter([payload or job_data], error)
+        return {"success": False, "error": error}
+
+    def post_jobs_bulk(self, jobs):
+        """Post a batch of jobs to the bulk endpoint in one request
+
+        Returns {"posted": int, "failed": int, "errors": [str], "succeeded": [job_data]}
+        """
+        if not jobs:
+            return {"posted": 0, "failed": 0, "errors": [], "succeeded": []}
+        payload = []
+        try:
+            payload = [self.build_payload(job_data) for job_data in jobs]
+            self.debug_log(f"Posting batch of {len(payload)} jobs to {self.bulk_endpoint}")
+            response = self.client.post(self.bulk_endpoint, json=payload, timeout=60)
+            self.debug_log(f"API Response Status: {response.status_code}")
+            if response.status_code != 200:
+                error = f"API returned {response.status_code}: {response.text[:200]}"
+            else:
+                body = response.json()
+                failed = [r for r in body["results"] if r["status"] == 400]
+                for r in failed:
+                    self.dead_letter([payload[r["index"]]], r["error"])
+                errors = [f"Job {jobs[r['index']]['title']!r}: {r['error']}" for r in failed]
+                succeeded = [jobs[r["index"]] for r in body["results"] if r["status"] != 400]
+                return {"posted": body["created"] + body["updated"], "failed": body["failed"], "errors": errors,
+                        "succeeded": succeeded}
+        except requests.exceptions.RequestException as e:
+            error = f"Request failed: {str(e)}"
+        except Exception as e:
+            error = f"Unexpected error: {str(e)}"
+        self.dead_letter(payload or jobs, error)
+        return {"posted": 0, "failed": len(jobs), "errors": [error], "succeeded": []}
+
+    def replay_dead_letters(self):
+        """Re-post every job in the dead-letter file
+
+        Jobs that fail again are written to a fresh dead-letter file.
+        Returns {"posted": int, "failed": int, "errors": [str], "succeeded": [job_data]}
+        """
+        if not self.dead_letter_path or not os.path.exists(self.dead_letter_path):
+            return {"posted": 0, "failed": 0, "errors": [], "succeeded": []}
+        replaying = f"{self.dead_letter_path}.replaying"
+        os.replace(self.dead_letter_path, replaying)
+        with open(replaying, encoding="utf-8") as f:
+            jobs = [json.loads(line)["payload"] for line in f if line.strip()]
+        print(f"📮 Replaying {len(jobs)} dead-lettered job(s)")
+        result = self.post_jobs_bulk(jobs)
+        os.remove(replaying)
+        return result
+
+    def extract_job_url(self, job_element):
+        """Absolute URL of the job's detail page, or "" if the card has none"""
+        link_elem = job_element.find(CARD_FIELDS["link"][0], class_=CARD_FIELDS["link"][1])
+        if link_elem:
+            href = link_elem.get('href', '')
+            if href:
+                return href if href.startswith('http') else f"{self.base_url}{href}"
+        return ""
+
+    def content_hash(self, job_data):
+        """Fingerprint of a job's content; must match backend.models.content_hash"""
+        payload = self.build_payload(job_data)
+        # Tags that differ only in case count once, first spelling kept
+        unique = {}
+        for tag in payload["tags"].split(","):
+            if tag.strip():
+                unique.setdefault(tag.strip().casefold(), tag.strip())
+        tags = ",".join(sorted(unique.values()))
+        raw = "\x1f".join([payload["title"], payload["company"], payload["location"], payload["job_type"], tags])
+        return hashlib.sha1(raw.encode()).hexdigest()
+
+    def fetch_known_hashes(self, urls):
+        """Ask the API for the stored content hash of each already-known job URL"""
+        urls = [url for url in urls if url]
+        if not urls:
+            return {}
+        try:
+            response = self.client.post(f"{self.api_endpoint.rstrip('/')}/hashes", json={"urls": urls})
+            if response.status_code == 200:
+                return response.json().get("hashes", {})
+            print(f"⚠️ Hash lookup returned {response.status_code}, posting every job on this page")
+        except requests.exceptions.RequestException as e:
+            print(f"⚠️ Hash lookup failed ({e}), posting every job on this page")
+        return {}
+
     def extract_job_data(self, job_element):
         """FIXED: Extract data from a single job element with improved selectors"""
         
-        print(f"[DEBUG] Processing job element: {job_element.get('class', 'no-class')}")
+        self.debug_log(f"Processing job element: {job_element.get('class', 'no-class')}")
+        card = self.scan_card(job_element)
         
         # Extract title - FIXED selector logic
         title = ""
-        title_elem = job_element.select_one("p.Job_job-card__position__ic1rc")
-        if title_elem:
-            # Clone the element to avoid modifying the original
-            title_elem_copy = BeautifulSoup(str(title_elem), 'html.parser')
-            # Remove the 'Featured' pin if present
-            pin_elem = title_elem_copy.select_one("p.Job_job-card__pin__N5sZd")
-            if pin_elem:
-                pin_elem.extract()
-            title = title_elem_copy.get_text(strip=True)
+        if "title" in card:
+            title = self.extract_title(card["title"])
         
-        print(f"[DEBUG] Extracted title: '{title}'")
+        self.debug_log(f"Extracted title: '{title}'")
 
         # Extract company - FIXED
         company = ""
-        company_elem = job_element.select_one("p.Job_job-card__company__7T9qY")
-        if company_elem:
-            company = company_elem.get_text(strip=True)
+        if "company" in card:
+            company = card["company"].get_text(strip=True)
         
-        print(f"[DEBUG] Extracted company: '{company}'")
+        self.debug_log(f"Extracted company: '{company}'")
 
         # Extract location(s) - FIXED
         location = ""
-        location_elems = job_element.select("div.Job_job-card__locations__x1exr a.Job_job-card__location__bq7jX")
+        location_elems = card["locations"].find_all("a", class_=LOCATION_CLASS) if "locations" in card else []
         if location_elems:
             locations = []
             for loc in location_elems:
@@ -207,13 +462,12 @@ class ActuaryJobScraper:
                     locations.append(loc_text)
             location = ", ".join(locations) if locations else "Remote/Not specified"
         
-        print(f"[DEBUG] Extracted location: '{location}'")
+        self.debug_log(f"Extracted location: '{location}'")
 
         # Extract posting date - try multiple approaches
         posting_date = ""
-        date_elem = job_element.select_one("span.Job_job-card__posted-on__NCZaJ")
-        if date_elem:
-            posting_date = date_elem.get_text(strip=True)
+        if "date" in card:
+            posting_date = card["date"].get_text(strip=True)
         else:
             # Try other common date selectors
             date_selectors = [
@@ -229,16 +483,14 @@ class ActuaryJobScraper:
 
         # Extract job URL - FIXED
         job_url = ""
-        link_elem = job_element.select_one("a.Job_job-page-link__a5I5g")
-        if link_elem:
-            href = link_elem.get('href', '')
-            if href:
-                job_url = href if href.startswith('http') else f"{self.base_url}{href}"
+        href = card["link"].get('href', '') if "link" in card else ""
+        if href:
+            job_url = href if href.startswith('http') else f"{self.base_url}{href}"
 
         # Extract additional data
         job_text = job_element.get_text() if job_element else ""
         job_type = self.extract_job_type(job_text)
-        tags = self.extract_tags(job_element)
+        tags = self.extract_tags(job_element, job_text, card["tags"])
         parsed_date = self.parse_date(posting_date)
 
         result = {
@@ -251,161 +503,257 @@ class ActuaryJobScraper:
             'tags': tags
         }
         
-        print(f"[DEBUG] Final extracted data: {json.dumps(result, indent=2)}")
+        if self.debug:
+            self.debug_log(f"Final extracted data: {json.dumps(result, indent=2)}")
         return result
 
-    def scrape_and_post_jobs(self, max_jobs=100):
-        """Main function: scrape jobs and post to API, with pagination support"""
-        posted_count = 0
-        failed_count = 0
-        jobs_scraped = 0
-
-        print(f"[DEBUG] Calling setup_driver (headless={self.headless})...")
-        self.setup_driver()
-        print(f"[DEBUG] setup_driver finished. Driver: {self.driver}")
+    def find_job_elements(self, soup):
+        """Locate job cards on a parsed listing page"""
+        # Use the correct selector based on your debug output
+        job_elements = soup.select("div.Job_job-card__YgDAV")
+        if job_elements:
+            print(f"✅ Found {len(job_elements)} job elements using primary selector")
+            return job_elements
 
-        if not self.driver:
-            print("❌ Chrome driver was not initialized. Check previous error messages and try HEADLESS=False or update CHROME_VERSION.")
-            return {"posted": 0, "failed": 0, "error": "Chrome driver not initialized"}
+        # Fallback selectors
+        selectors = [
+            "div[class*='job-']",
+            ".job-listing",
+            ".job-item",
+            ".job-card",
+            ".job"
+        ]
+        for selector in selectors:
+            elements = soup.select(selector)
+            if len(elements) >= 5:
+                print(f"✅ Found {len(elements)} job elements using fallback: {selector}")
+                return elements
+        return []
 
+    def accept_cookies(self):
+        """Dismiss the cookie consent popup if one is shown"""
         try:
-            print(f"🌐 Loading {self.jobs_url}...")
-            self.driver.get(self.jobs_url)
-            time.sleep(5)  # Wait for page load
+            cookie_btn = WebDriverWait(self.driver, 3).until(
+                EC.element_to_be_clickable((By.CSS_SELECTOR, ", ".join(COOKIE_SELECTORS)))
+            )
+            cookie_btn.click()
+            WebDriverWait(self.driver, 5).until(EC.any_of(EC.staleness_of(cookie_btn), EC.invisibility_of_element(cookie_btn)))
+            print("✅ Cookie consent handled")
+        except Exception as e:
+            print("ℹ️ No cookie consent popup found")
+
+    def wait_for_cards(self):
+        """Block until job cards are on the page; returns them"""
+        return WebDriverWait(self.driver, PAGE_TIMEOUT).until(
+            EC.presence_of_all_elements_located((By.CSS_SELECTOR, JOB_CARD_SELECTOR))
+        )
 
-            # Handle cookie consent
+    def cards_signature(self):
+        """First and last card links, to tell one page of results from the next"""
+        links = self.driver.find_elements(By.CSS_SELECTOR, f"{JOB_CARD_SELECTOR} a.{CARD_FIELDS['link'][1]}")
+        return tuple(link.get_attribute("href") for link in links[:1] + links[-1:])
+
+    def wait_for_page_change(self, first_card, signature):
+        """Block until the cards after a next-page click differ from the old ones
+
+        Done when the old first card is detached and new cards are present
+        (full re-render), or when the observer saw the card container mutate
+        and the first/last links changed (client-side re-render that reuses
+        the nodes).
+        """
+        def changed(driver):
             try:
-                cookie_selectors = [
-                    "button[class*='cookie']",
-                    "button[class*='consent']",
-                    "button[class*='accept']",
-                    "#cookie-accept",
-                    ".cookie-accept"
-                ]
-                for selector in cookie_selectors:
-                    try:
-                        cookie_btn = WebDriverWait(self.driver, 3).until(
-                            EC.element_to_be_clickable((By.CSS_SELECTOR, selector))
-                        )
-                        cookie_btn.click()
-                        print("✅ Cookie consent handled")
-                        time.sleep(2)
-                        break
-                    except TimeoutException:
-                        continue
-            except Exception as e:
-                print("ℹ️ No cookie consent popup found")
-
-            # Pagination loop
-            while jobs_scraped < max_jobs:
-                print("🔍 Parsing job listings...")
-                soup = BeautifulSoup(self.driver.page_source, 'html.parser')
-
-                # Use the correct selector based on your debug output
-                job_elements = soup.select("div.Job_job-card__YgDAV")
-                
-                if not job_elements:
-                    # Fallback selectors
-                    selectors = [
-                        "div[class*='job-']",
-                        ".job-listing",
-                        ".job-item",
-                        ".job-card",
-                        ".job"
-                    ]
-                    for selector in selectors:
-                        elements = soup.select(selector)
-                        if len(elements) >= 5:
-                            job_elements = elements
-                            print(f"✅ Found {len(elements)} job elements using fallback: {selector}")
-                            break
-                else:
-                    print(f"✅ Found {len(job_elements)} job elements using primary selector")
+                first_card.is_enabled()
+            except StaleElementReferenceException:
+                return bool(driver.find_elements(By.CSS_SELECTOR, JOB_CARD_SELECTOR))
+            if not driver.execute_script("return window.__jobsChanged === true"):
+                return False
+            current = self.cards_signature()
+            return bool(current) and current != signature
 
-                if not job_elements:
-                    print("❌ No job elements found. Website structure may have changed.")
-                    break
+        WebDriverWait(self.driver, PAGE_TIMEOUT, poll_frequency=0.1).until(changed)
 
-                print(f"📋 Processing up to {min(len(job_elements), max_jobs - jobs_scraped)} jobs on this page...")
-                
-                for i, job_elem in enumerate(job_elements):
-                    if jobs_scraped >= max_jobs:
-                        break
-                        
-                    print(f"\n--- Processing Job {jobs_scraped + 1} ---")
-                    
-                    try:
-                        job_data = self.extract_job_data(job_elem)
-                        
-                        # Better validation
-                        if job_data and job_data.get('title') and job_data.get('company'):
-                            print(f"📝 Valid job found: {job_data['title']} at {job_data['company']}")
-                            result = self.post_job_to_api(job_data)
-                            if result["success"]:
-                                posted_count += 1
-                                print(f"✅ Posted job {posted_count}: {job_data['title']}")
-                            else:
-                                failed_count += 1
-                                print(f"❌ Failed to post: {result['error']}")
-                        else:
-                            print(f"⚠️ Skipped job {jobs_scraped+1}: Missing title '{job_data.get('title', 'N/A')}' or company '{job_data.get('company', 'N/A')}'")
-                            
-                    except Exception as e:
-                        failed_count += 1
-                        print(f"❌ Error processing job {jobs_scraped+1}: {e}")
-                        continue
-                        
-                    jobs_scraped += 1
-                    time.sleep(0.5)
-
-                # Try to click the next page button
+    def go_to_next_page(self):
+        """Click the next page button; returns False when there is no next page"""
+        try:
+            next_btn = None
+            for selector in NEXT_PAGE_SELECTORS:
                 try:
-                    next_btn = None
-                    next_selectors = [
-                        "a[rel='next']",
-                        "button[aria-label='Next']",
-                        ".pagination-next",
-                        "button.next",
-                        "a.next",
-                        "li.next > a",
-                        "li[aria-label='Next'] a"
-                    ]
-                    for selector in next_selectors:
-                        try:
-                            next_btn = self.driver.find_element(By.CSS_SELECTOR, selector)
-                            if next_btn and next_btn.is_enabled():
-                                break
-                        except Exception:
-                            continue
+                    next_btn = self.driver.find_element(By.CSS_SELECTOR, selector)
                     if next_btn and next_btn.is_enabled():
-                        self.driver.execute_script("arguments[0].scrollIntoView();", next_btn)
-                        time.sleep(1)
-                        next_btn.click()
-                        print("➡️ Clicked next page button")
-                        time.sleep(4)
-                    else:
-                        print("🚫 No next page button found or enabled. Stopping pagination.")
                         break
-                except Exception as e:
-                    print(f"⚠️ Pagination error: {e}")
-                    break
-
-            print(f"\n🎉 Scraping completed!")
-            print(f"✅ Successfully posted: {posted_count} jobs")
-            print(f"❌ Failed: {failed_count} jobs")
+                except Exception:
+                    continue
+            if not (next_btn and next_btn.is_enabled()):
+                print("🚫 No next page button found or enabled. Stopping pagination.")
+                return False
 
+            cards = self.driver.find_elements(By.CSS_SELECTOR, JOB_CARD_SELECTOR)
+            signature = self.cards_signature()
+            self.driver.execute_script(WATCH_CARDS_JS, JOB_CARD_SELECTOR)
+            self.throttle.wait()
+            start = time.perf_counter()
+            self.driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", next_btn)
+            WebDriverWait(self.driver, PAGE_TIMEOUT).until(EC.element_to_be_clickable(next_btn)).click()
+            print("➡️ Clicked next page button")
+            try:
+                if cards:
+                    self.wait_for_page_change(cards[0], signature)
+                else:
+                    self.wait_for_cards()
+            except TimeoutException:
+                self.throttle.record(time.perf_counter() - start, ok=False)
+                print(f"⚠️ Next page did not render within {PAGE_TIMEOUT}s. Stopping pagination.")
+                return False
+            self.page_loaded(time.perf_counter() - start)
+            return True
         except Exception as e:
-            print(f"💥 Critical error during scraping: {e}")
-            return {"posted": posted_count, "failed": failed_count, "error": str(e)}
+            self.throttle.record(PAGE_TIMEOUT, ok=False)
+            print(f"⚠️ Pagination error: {e}")
+            return False
+
+    def page_loaded(self, seconds):
+        """Log a page's wall time and let the throttle adapt to it"""
+        self.page_times.append(seconds)
+        delay = self.throttle.record(seconds)
+        print(f"⏱️ Page {len(self.page_times)} ready in {seconds:.2f}s (next navigation delay {delay:.2f}s)")
+
+    def iter_pages(self):
+        """Browser stage: load the listing and yield each page's HTML in turn
+
+        Only navigation happens here; parsing is left to the pipeline workers
+        so the browser can move on to the next page straight away. Every wait
+        ends as soon as the cards render or change rather than after a fixed
+        sleep.
+        """
+        print(f"🌐 Loading {self.jobs_url}...")
+        self.throttle.wait()
+        start = time.perf_counter()
+        self.driver.get(self.jobs_url)
+        self.accept_cookies()
+        try:
+            self.wait_for_cards()
+        except TimeoutException:
+            print(f"⚠️ No job cards rendered within {PAGE_TIMEOUT}s")
+        self.page_loaded(time.perf_counter() - start)
+
+        while True:
+            print("🔍 Capturing job listings page...")
+            yield self.driver.page_source
+            if not self.go_to_next_page():
+                return
+
+    def has_next_page(self, html):
+        """Whether a saved page shows a next page control (replay counterpart of go_to_next_page)"""
+        soup = BeautifulSoup(html, self.html_parser)
+        for selector in NEXT_PAGE_SELECTORS:
+            next_btn = soup.select_one(selector)
+            if next_btn and not next_btn.has_attr('disabled'):
+                return True
+        return False
+
+    def iter_replay_pages(self):
+        """Replay stage: yield saved listing pages from replay_dir in name order
+
+        Follows the same pagination rule as the browser: stop after the first
+        page without an enabled next control, or when the snapshots run out.
+        """
+        paths = sorted(glob.glob(os.path.join(self.replay_dir, "*.html")))
+        if not paths:
+            raise FileNotFoundError(f"No .html snapshots found in {self.replay_dir}")
+        for path in paths:
+            print(f"🔍 Replaying {os.path.basename(path)}...")
+            with open(path, encoding="utf-8") as f:
+                html = f.read()
+            yield html
+            if not self.has_next_page(html):
+                print("🚫 No next page button found or enabled. Stopping pagination.")
+                return
+
+    def iter_pool_pages(self):
+        """Pool stage: crawl every shard across `drivers` browser processes
+
+        Pages arrive in whatever order the browsers finish them; the
+        pipeline drops jobs an overlapping shard already yielded.
+        """
+        pool = DriverPool(self.drivers, options={"headless": self.headless}, memory_limit_mb=self.memory_limit_mb)
+        print(f"🧭 Crawling {len(self.shards)} shard(s) with {pool.size} browser(s)")
+        try:
+            yield from pool.iter_pages(self.shards)
+        finally:
+            self.pool_stats = pool.stats
+
+    def scrape_and_post_jobs(self, max_jobs=100):
+        """Main function: scrape jobs and post to API, with pagination support"""
+        if self.replay_dir:
+            print(f"📼 Replay mode: reading saved pages from {self.replay_dir}")
+        elif self.shards:
+            print(f"🧭 Pool mode: {self.drivers} browser process(es)")
+        else:
+            self.debug_log(f"Calling setup_driver (headless={self.headless})...")
+            self.setup_driver()
+            self.debug_log(f"setup_driver finished. Driver: {self.driver}")
+
+        if not self.driver and not self.replay_dir and not self.shards:
+            print("❌ Chrome driver was not initialized. Check previous error messages and try HEADLESS=False or update CHROME_VERSION.")
+            return {"posted": 0, "failed": 0, "error": "Chrome driver not initialized"}
+
+        try:
+            pipeline = ScrapePipeline(
+                self,
+                parse_workers=self.parse_workers,
+                post_workers=self.post_workers,
+                page_queue_size=self.page_queue_size,
+                job_queue_size=self.job_queue_size,
+            )
+            if self.replay_dir:
+                pages = self.iter_replay_pages()
+            elif self.shards:
+                pages = self.iter_pool_pages()
+            else:
+                pages = self.iter_pages()
+            started_at = datetime.now()
+            start = time.perf_counter()
+            result = pipeline.run(pages, max_jobs)
+            elapsed = time.perf_counter() - start
+            result["elapsed_s"] = round(elapsed, 3)
+            result["jobs_per_sec"] = round(result["posted"] / elapsed, 1) if elapsed else 0.0
+            result["api_latency"] = self.client.latency_summary()
+            if self.pool_stats:
+                result["pool"] = self.pool_stats
+            if self.page_times:
+                result["page_load_s_mean"] = round(sum(self.page_times) / len(self.page_times), 3)
+            if self.crawl_state is not None:
+                self.crawl_state.record_run(started_at, result)
+
+            if result.get("error"):
+                print(f"💥 Critical error during scraping: {result['error']}")
+            else:
+                print(f"\n🎉 Scraping completed!")
+            print(f"✅ Successfully posted: {result['posted']} jobs")
+            print(f"❌ Failed: {result['failed']} jobs")
+            print(f"⏭️ Unchanged (skipped): {result['skipped']} jobs")
+            if result["duplicates"]:
+                print(f"🔂 Duplicates across pages/shards dropped: {result['duplicates']}")
+            if self.pool_stats:
+                print(f"🧭 Browser pool: {self.pool_stats}")
+            if result["stopped_early"]:
+                print(f"🛑 Stopped early after {result['pages']} page(s): the rest was crawled by an earlier run")
+            print(f"⏱️ API latency: {result['api_latency']}")
+            if self.page_times:
+                print(f"⏱️ Page load: {result['page_load_s_mean']}s mean over {len(self.page_times)} page(s)")
+            print(f"🚀 Throughput: {result['jobs_per_sec']} jobs/sec over {result['elapsed_s']}s")
+            return result
 
         finally:
+            self.client.close()
             if self.driver:
                 self.driver.quit()
                 print("🔒 Browser closed")
 
-        return {"posted": posted_count, "failed": failed_count}
-
-def scrape_and_post_actuary_jobs(max_jobs=100, headless=True, api_endpoint="http://localhost:5000/jobs"):
+def scrape_and_post_actuary_jobs(max_jobs=100, headless=True, api_endpoint="http://localhost:5000/jobs", batch_size=1,
+                                 parse_workers=2, post_workers=4, debug=False, replay_dir=None, state_path=None,
+                                 stop_after_known_pages=1, drivers=1, shards=None, memory_limit_mb=None):
     """
     Main function to scrape jobs and post to your API
     
@@ -413,12 +761,39 @@ def scrape_and_post_actuary_jobs(max_jobs=100, headless=True, api_endpoint="http
         max_jobs: Maximum number of jobs to scrape
         headless: Run browser in headless mode
         api_endpoint: Your API endpoint
+        batch_size: Jobs per bulk request (1 posts each job individually)
+        parse_workers: Threads parsing captured pages into jobs
+        post_workers: Threads posting jobs to the API
+        debug: Print every extracted card and API response
+        replay_dir: Directory of saved listing pages to replay instead of
+            opening a browser (e.g. "fixtures")
+        state_path: SQLite crawl state file (e.g. "crawl_state.db") for
+            incremental runs; None crawls up to max_jobs every time
+        stop_after_known_pages: With a crawl state, stop paginating after
+            this many pages of already-seen, unchanged jobs
+        drivers: Browser processes crawling shards in parallel
+        shards: Page ranges or category URLs to split across them, from
+            driver_pool.page_range_shards(pages, drivers) or url_shards(urls);
+            None crawls the listing with one browser
+        memory_limit_mb: Recycle the largest browser process when the pool
+            uses more than this in total
     
     Returns:
-        Dictionary with results: {"posted": int, "failed": int}
+        Dictionary with results: {"posted": int, "failed": int, "skipped": int,
+        "duplicates": int, "pages": int, "parse_ms_per_page": float, "stopped_early": bool,
+        "elapsed_s": float, "jobs_per_sec": float, "api_latency": {...}}
     """
-    scraper = ActuaryJobScraper(api_endpoint=api_endpoint, headless=headless)
-    return scraper.scrape_and_post_jobs(max_jobs)
+    crawl_state = CrawlState(state_path) if state_path else None
+    try:
+        scraper = ActuaryJobScraper(api_endpoint=api_endpoint, headless=headless, batch_size=batch_size,
+                                    parse_workers=parse_workers, post_workers=post_workers, debug=debug,
+                                    replay_dir=replay_dir, crawl_state=crawl_state,
+                                    stop_after_known_pages=stop_after_known_pages, drivers=drivers,
+                                    shards=shards, memory_limit_mb=memory_limit_mb)
+        return scraper.scrape_and_post_jobs(max_jobs)
+    finally:
+        if crawl_state is not None:
+            crawl_state.close()
 
 # Example usage
 if __name__ == "__main__":
@@ -429,6 +804,9 @@ if __name__ == "__main__":
     API_ENDPOINT = "http://localhost:5000/jobs"
     MAX_JOBS = 5  # Start with even smaller number for testing
     HEADLESS = False  # Set to False for debugging the API issue
+    DEBUG = True  # Print every extracted card and API response
+    BATCH_SIZE = 1  # Set to e.g. 100 to post through /jobs/bulk
+    REPLAY_DIR = None  # Set to "fixtures" to replay saved pages without a browser
     
     print(f"📡 API Endpoint: {API_ENDPOINT}")
     print(f"🎯 Max Jobs: {MAX_JOBS}")
@@ -470,12 +848,22 @@ if __name__ == "__main__":
     result = scrape_and_post_actuary_jobs(
         max_jobs=MAX_JOBS,
         headless=HEADLESS,
-        api_endpoint=API_ENDPOINT
+        api_endpoint=API_ENDPOINT,
+        batch_size=BATCH_SIZE,
+        debug=DEBUG,
+        replay_dir=REPLAY_DIR
     )
     
     print(f"\n🏁 Final Results:")
     print(f"✅ Jobs posted to API: {result['posted']}")
     print(f"❌ Failed jobs: {result['failed']}")
+    print(f"⏭️ Unchanged jobs skipped: {result.get('skipped', 0)}")
+    
+    if result.get('api_latency'):
+        print(f"⏱️ API latency: {result['api_latency']}")
+    if os.path.exists("failed_jobs.ndjson"):
+        print("📮 Some jobs were dead-lettered to failed_jobs.ndjson; "
+              "replay them with ActuaryJobScraper(api_endpoint=...).replay_dead_letters()")
     
     if result.get('error'):
         print(f"💥 Error: {result['error']}")
@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the jobs API, for replay runs and benchmarks
+
+Speaks the subset of the Flask API the scraper uses (POST /jobs, POST
+/jobs/bulk, POST /jobs/hashes, GET /jobs) and keeps jobs in memory, keyed by
+job_url like the real upsert. A fixed per-request latency and a share of
+retryable 503s can be injected to mimic a slower or flaky server.
+
+    python stub_api.py --port 5001 --latency-ms 5
+"""
+
+import argparse
+import hashlib
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+REQUIRED_FIELDS = ["title", "company", "location", "job_type"]
+
+
+def content_hash(job):
+    """Same fingerprint as backend.models.content_hash"""
+    tags = job.get("tags") or ""
+    if isinstance(tags, list):
+        tags = ",".join(tags)
+    # Tags that differ only in case count once, first spelling kept
+    unique = {}
+    for tag in tags.split(","):
+        if tag.strip():
+            unique.setdefault(tag.strip().casefold(), tag.strip())
+    tags = ",".join(sorted(unique.values()))
+    raw = "\x1f".join([job.get("title", ""), job.get("company", ""), job.get("location", ""),
+                       job.get("job_type", ""), tags])
+    return hashlib.sha1(raw.encode()).hexdigest()
+
+
+class JobStore:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.jobs = {}  # job_url (or generated key) -> stored job
+        self.hashes = {}
+        self.requests = 0
+
+    def save(self, job):
+        """Store one job payload; returns (status, body) like the real endpoint"""
+        if not isinstance(job, dict):
+            return 400, {"error": "Invalid job payload"}
+        if any(not job.get(field) for field in REQUIRED_FIELDS):
+            return 400, {"error": "Missing required fields"}
+        digest = content_hash(job)
+        with self.lock:
+            url = job.get("job_url") or f"stub:{len(self.jobs) + 1}"
+            existing = self.jobs.get(url)
+            if existing is None:
+                action, job_id = "created", len(self.jobs) + 1
+            else:
+                job_id = existing["id"]
+                action = "unchanged" if self.hashes[url] == digest else "updated"
+            self.jobs[url] = dict(job, id=job_id)
+            self.hashes[url] = digest
+        return (201 if action == "created" else 200), {"id": job_id, "action": action}
+
+
+class StubApiHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # Keep-alive, like the pooled client expects
+    disable_nagle_algorithm = True  # Headers and body go out in separate writes
+
+    def log_message(self, format, *args):
+        pass  # Quiet; the benchmark prints its own summary
+
+    def send_json(self, status, body):
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def read_json(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        try:
+            return json.loads(self.rfile.read(length) or b"null")
+        except ValueError:
+            return None
+
+    def simulate(self):
+        """Apply the configured latency; returns False if this request should fail"""
+        server = self.server
+        with server.store.lock:
+            server.store.requests += 1
+        if server.latency:
+            time.sleep(server.latency)
+        return random.random() >= server.error_rate
+
+    def do_GET(self):
+        if self.path.rstrip("/") in ("", "/jobs"):
+            with self.server.store.lock:
+                jobs = list(self.server.store.jobs.values())
+            return self.send_json(200, jobs)
+        self.send_json(404, {"error": "Not found"})
+
+    def do_POST(self):
+        body = self.read_json()
+        if not self.simulate():
+            return self.send_json(503, {"error": "Injected failure"})
+        store = self.server.store
+
+        if self.path == "/jobs":
+            status, result = store.save(body)
+            return self.send_json(status, result)
+
+        if self.path == "/jobs/bulk":
+            if not isinstance(body, list):
+                return self.send_json(400, {"error": "Expected a JSON array of jobs"})
+            summary = {"created": 0, "updated": 0, "unchanged": 0, "failed": 0, "results": []}
+            for index, job in enumerate(body):
+                status, result = store.save(job)
+                if status >= 400:
+                    summary["failed"] += 1
+                    summary["results"].append({"index": index, "status": status, "error": result["error"]})
+                else:
+                    summary[result["action"]] += 1
+                    summary["results"].append({"index": index, "status": status, **result})
+            return self.send_json(200, summary)
+
+        if self.path == "/jobs/hashes":
+            urls = (body or {}).get("urls", []) if isinstance(body, dict) else []
+            with store.lock:
+                hashes = {url: store.hashes[url] for url in urls if url in store.hashes}
+            return self.send_json(200, {"hashes": hashes})
+
+        self.send_json(404, {"error": "Not found"})
+
+
+def start_stub_api(host="127.0.0.1", port=0, latency_ms=0, error_rate=0.0):
+    """Serve the stand-in API on a background thread
+
+    port=0 picks a free port. Returns the server; its jobs endpoint is
+    f"http://{host}:{server.server_port}/jobs" and server.shutdown() stops it.
+    """
+    server = ThreadingHTTPServer((host, port), StubApiHandler)
+    server.daemon_threads = True
+    server.store = JobStore()
+    server.latency = latency_ms / 1000
+    server.error_rate = error_rate
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a local stand-in for the jobs API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=5001)
+    parser.add_argument("--latency-ms", type=float, default=0, help="delay added to every POST")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of POSTs answered with 503")
+    options = parser.parse_args()
+
+    server = start_stub_api(options.host, options.port, options.latency_ms, options.error_rate)
+    print(f"🧪 Stand-in API listening on http://{options.host}:{server.server_port}/jobs")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,39 @@
+"""
+Adaptive delay between page navigations
+"""
+
+import time
+
+
+class AdaptiveThrottle:
+    """Pace browser navigations by how the site is responding
+
+    Each fast page scales the delay before the next navigation down by
+    `speedup`; each slow page (over slow_s) or failed one doubles it, always
+    within [min_delay, max_delay]. A responsive site is crawled with almost no
+    pauses; a struggling or rate-limiting one gets room to recover.
+    """
+
+    def __init__(self, min_delay=0.25, max_delay=30.0, initial_delay=1.0, slow_s=5.0, speedup=0.7):
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+        self.delay = min(max(initial_delay, min_delay), max_delay)
+        self.slow_s = slow_s
+        self.speedup = speedup
+        self.last_action = None
+
+    def wait(self):
+        """Sleep out whatever is left of the delay since the last navigation"""
+        if self.last_action is not None:
+            remaining = self.delay - (time.monotonic() - self.last_action)
+            if remaining > 0:
+                time.sleep(remaining)
+        self.last_action = time.monotonic()
+
+    def record(self, seconds, ok=True):
+        """Adjust the delay after a navigation took seconds (ok=False on errors/timeouts)"""
+        if not ok or seconds > self.slow_s:
+            self.delay = min(self.max_delay, max(self.delay * 2, 0.5))
+        else:
+            self.delay = max(self.min_delay, self.delay * self.speedup)
+        return self.delay
@@ -0,0 +1,27 @@
+from datetime import datetime, timedelta
+import pytest
+
+@pytest.fixture
+def app(tmp_path, monkeypatch):
+    # A fresh SQLite file per test, with the same triggers and pragmas as
+    # a real database
+    monkeypatch.setenv("DATABASE_URL", f"sqlite:///{tmp_path / 'jobs.db'}")
+    monkeypatch.setenv("CACHE_URL", "memory://")
+    from backend import create_app, db
+    app = create_app()
+    app.config["TESTING"] = True
+    with app.app_context():
+        db.create_all()
+    yield app
+    with app.app_context():
+        db.session.remove()
+        db.engine.dispose()
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+def job(title, days_ago=0, **fields):
+    # A POST /jobs payload posted days_ago days ago
+    return {"title": title, "company": "Acme", "location": "London", "job_type": "Full-time",
+            "posting_date": (datetime.utcnow() - timedelta(days=days_ago)).isoformat(), **fields}
@@ -0,0 +1,61 @@
+import json
+from backend.retention import run_retention
+from tests.conftest import job
+
+def archive_old(app, client):
+    ids = [client.post("/jobs", json=job(f"Job {days}", days_ago=days, tags=["SQL"])).get_json()["id"]
+           for days in (400, 300, 10, 1)]
+    with app.app_context():
+        assert run_retention(180, compaction=False)["archived"] == 2
+    return ids
+
+def test_include_archived_reads(app, client):
+    old, older, recent, newest = archive_old(app, client)
+    assert [j["id"] for j in client.get("/jobs").get_json()] == [newest, recent]
+    merged = client.get("/jobs?include_archived=1&tag=sql").get_json()
+    assert [j["id"] for j in merged] == [newest, recent, older, old]
+
+    # Keyset pages run across both tables without repeats
+    seen, url = [], "/jobs?include_archived=true&limit=3"
+    while url:
+        response = client.get(url)
+        seen += [j["id"] for j in response.get_json()]
+        cursor = response.headers.get("X-Next-Cursor")
+        url = f"/jobs?include_archived=true&limit=3&cursor={cursor}" if cursor else None
+    assert seen == [newest, recent, older, old]
+
+    assert client.get(f"/jobs/{old}").status_code == 404
+    assert client.get(f"/jobs/{old}?include_archived=1").get_json()["title"] == "Job 400"
+    exported = client.get("/jobs/export?include_archived=1").data.decode().splitlines()
+    assert sorted(json.loads(line)["id"] for line in exported) == sorted([old, older, recent, newest])
+
+def test_archived_ids_are_never_reused(app, client):
+    ids = archive_old(app, client)
+    client.delete(f"/jobs/{ids[-1]}")
+    new = client.post("/jobs", json=job("New")).get_json()["id"]
+    assert new > max(ids)
+    client.post("/jobs", json=job("Old again", days_ago=500))
+    with app.app_context():
+        run_retention(180, compaction=False)
+    listed = [j["id"] for j in client.get("/jobs?include_archived=1").get_json()]
+    assert len(listed) == len(set(listed)) == 5
+
+def test_include_archived_facets_and_search(app, client):
+    archive_old(app, client)
+    facets = client.get("/jobs/facets").get_json()
+    assert facets["total"] == 2
+    assert facets["tags"] == [{"value": "SQL", "count": 2}]
+
+    # Archived jobs are added to the live counts, for every filter
+    for query in ("include_archived=1", "include_archived=1&tag=sql", "include_archived=1&job_type=Full-time"):
+        facets = client.get(f"/jobs/facets?{query}").get_json()
+        assert facets["total"] == 4
+        assert facets["job_type"] == [{"value": "Full-time", "count": 4}]
+        assert facets["location"] == [{"value": "London", "count": 4}]
+        assert facets["tags"] == [{"value": "SQL", "count": 4}]
+
+    # Only live jobs are indexed for search, so the flag is refused
+    assert len(client.get("/jobs/search?q=job").get_json()) == 2
+    response = client.get("/jobs/search?q=job&include_archived=1")
+    assert response.status_code == 400
+    assert "archived" in response.get_json()["error"]
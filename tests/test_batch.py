@@ -0,0 +1,35 @@
+from tests.conftest import job
+
+def seed(client):
+    client.post("/jobs/bulk", json=[job(f"Paris {i}", location="Paris", tags=["SQL"]) for i in range(3)]
+                + [job("London", tags=["SQL"])])
+
+def test_dry_run_update_changes_nothing(client):
+    seed(client)
+    before = client.get("/jobs").get_json()
+    preview = client.patch("/jobs/bulk", json={"filter": {"location": "Paris"}, "set": {"job_type": "Contract"},
+                                               "dry_run": True}).get_json()
+    assert (preview["dry_run"], preview["matched"], preview["affected"]) == (True, 3, 3)
+    assert len(preview["ids"]) == 3
+    assert client.get("/jobs").get_json() == before
+
+    applied = client.patch("/jobs/bulk", json={"filter": {"location": "Paris"}, "set": {"job_type": "Contract"}})
+    assert applied.get_json() == {"matched": 3, "affected": 3}
+    # Jobs already holding the values count as matched but not affected
+    again = client.patch("/jobs/bulk", json={"ids": preview["ids"][:2], "set": {"job_type": "Contract"},
+                                             "dry_run": True}).get_json()
+    assert (again["matched"], again["affected"], again["ids"]) == (2, 0, [])
+
+def test_dry_run_delete_changes_nothing(client):
+    seed(client)
+    preview = client.delete("/jobs/bulk", json={"filter": {"tag": "sql", "location": "Paris"},
+                                                "dry_run": True}).get_json()
+    assert (preview["matched"], preview["affected"]) == (3, 3)
+    assert len(client.get("/jobs").get_json()) == 4
+    assert client.delete("/jobs/bulk", json={"ids": preview["ids"]}).get_json() == {"matched": 3, "affected": 3}
+    assert [j["title"] for j in client.get("/jobs").get_json()] == ["London"]
+
+def test_batch_rejects_unbounded_or_invalid_selections(client):
+    assert client.patch("/jobs/bulk", json={"filter": {}, "set": {"title": "x"}}).status_code == 400
+    assert client.delete("/jobs/bulk", json={"ids": "1,2"}).status_code == 400
+    assert client.patch("/jobs/bulk", json={"ids": [1], "set": {"posting_date": "x"}}).status_code == 400
@@ -0,0 +1,44 @@
+from tests.conftest import job
+
+def test_bulk_reports_errors_per_item(client):
+    response = client.post("/jobs/bulk", json=[
+        job("Good"),
+        {"title": "No company", "location": "London"},
+        "not an object",
+        job("Also good", tags=["SQL"]),
+    ])
+    body = response.get_json()
+    assert response.status_code == 200
+    assert (body["created"], body["failed"]) == (2, 2)
+    assert [r["status"] for r in body["results"]] == [201, 400, 400, 201]
+    assert len(client.get("/jobs").get_json()) == 2
+
+def test_bulk_ndjson_skips_unparseable_lines(client):
+    body = b'{"title": "A", "company": "C", "location": "L"}\n{broken\n\n'
+    result = client.post("/jobs/bulk", data=body, content_type="application/x-ndjson").get_json()
+    assert [r["status"] for r in result["results"]] == [201, 400]
+
+def test_bulk_upserts_on_job_url(client):
+    client.post("/jobs/bulk", json=[job("Actuary", job_url="http://x/1")])
+    again = client.post("/jobs/bulk", json=[job("Actuary", job_url="http://x/1"),
+                                            job("Senior Actuary", job_url="http://x/2")]).get_json()
+    changed = client.post("/jobs/bulk", json=[job("Lead Actuary", job_url="http://x/1")]).get_json()
+    assert (again["unchanged"], again["created"]) == (1, 1)
+    assert changed["updated"] == 1
+    assert sorted(j["title"] for j in client.get("/jobs").get_json()) == ["Lead Actuary", "Senior Actuary"]
+
+def test_bulk_rejects_mistyped_items_alone(client):
+    response = client.post("/jobs/bulk", json=[
+        job("Good"),
+        dict(job("Numeric title"), title=123),
+        job("Null type", job_type=None),
+        job("Numeric date", posting_date=1700000000),
+        job("Numeric tags", tags=[1, 2]),
+        job("Also good"),
+    ])
+    body = response.get_json()
+    assert response.status_code == 200
+    assert [r["status"] for r in body["results"]] == [201, 400, 201, 400, 400, 201]
+    assert body["results"][1]["error"] == '"title" must be a string'
+    assert sorted((j["title"], j["job_type"]) for j in client.get("/jobs").get_json()) == [
+        ("Also good", "Full-time"), ("Good", "Full-time"), ("Null type", "Full-time")]
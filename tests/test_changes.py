@@ -0,0 +1,28 @@
+from datetime import datetime, timedelta
+from sqlalchemy import update
+from backend.changes import prune_changes
+from tests.conftest import job
+
+def test_changes_since_a_listing(client):
+    seq = int(client.get("/jobs").headers["X-Change-Seq"])
+    created = client.post("/jobs", json=job("Actuary")).get_json()["id"]
+    client.put(f"/jobs/{created}", json={"title": "Senior Actuary"})
+    client.delete(f"/jobs/{created}")
+    changes = client.get(f"/jobs/changes?since={seq}").get_json()
+    assert [(c["op"], c["id"]) for c in changes["changes"]] == [("insert", created), ("update", created),
+                                                                ("delete", created)]
+    assert changes["reset"] is False
+
+def test_client_behind_pruned_log_is_reset(app, client):
+    from backend import db
+    from backend.models import JobChange
+    for i in range(5):
+        client.post("/jobs", json=job(f"Job {i}"))
+    with app.app_context():
+        db.session.execute(update(JobChange).values(changed_at=datetime.utcnow() - timedelta(days=30)))
+        db.session.commit()
+        assert prune_changes(7) == 4
+    assert client.get("/jobs/changes?since=1").get_json()["reset"] is True
+    assert client.get("/jobs/changes?since=4").get_json()["reset"] is False
+    app.config["CHANGE_STREAM_MAX_S"] = 1
+    assert b"event: reset" in client.get("/jobs/changes/stream?since=1").data
@@ -0,0 +1,17 @@
+import importlib.util
+import os
+from backend.ingest import normalize_job
+
+def load_stub_api():
+    path = os.path.join(os.path.dirname(__file__), os.pardir, "scraper", "stub_api.py")
+    spec = importlib.util.spec_from_file_location("stub_api", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+def test_scraper_hash_matches_backend():
+    # The scraper skips re-posting listings whose hash the API already has
+    stub_api = load_stub_api()
+    for tags in (["SQL", "Python"], "Python, python,SQL", ["sql", "SQL", " R "], []):
+        job = {"title": "Actuary", "company": "Acme", "location": "London", "job_type": "Full-time", "tags": tags}
+        assert stub_api.content_hash(job) == normalize_job(job)[0]["content_hash"]
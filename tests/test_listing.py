@@ -0,0 +1,30 @@
+from tests.conftest import job
+
+def test_cursor_pages_cover_every_job_once(client):
+    # Same posting_date on every job: the id tiebreak keeps pages disjoint
+    client.post("/jobs/bulk", json=[dict(job(f"Job {i}"), posting_date="2024-01-01T00:00:00") for i in range(7)])
+    for sort in ("posting_date_desc", "posting_date_asc"):
+        seen, url = [], f"/jobs?limit=3&sort={sort}"
+        while url:
+            response = client.get(url)
+            seen += [j["id"] for j in response.get_json()]
+            cursor = response.headers.get("X-Next-Cursor")
+            url = f"/jobs?limit=3&sort={sort}&cursor={cursor}" if cursor else None
+        assert sorted(seen) == list(range(1, 8))
+        assert seen == sorted(seen, reverse=sort == "posting_date_desc")
+
+def test_search_follows_updates_and_deletes(client):
+    first = client.post("/jobs", json=job("Pricing Actuary")).get_json()["id"]
+    client.post("/jobs", json=job("Reserving Actuary"))
+    assert len(client.get("/jobs/search?q=actuary").get_json()) == 2
+    client.put(f"/jobs/{first}", json={"title": "Data Scientist"})
+    assert [j["title"] for j in client.get("/jobs/search?q=pric").get_json()] == []
+    assert [j["id"] for j in client.get("/jobs/search?q=data").get_json()] == [first]
+    client.delete(f"/jobs/{first}")
+    assert client.get("/jobs/search?q=data").get_json() == []
+
+def test_tag_filter_ignores_case(client):
+    client.post("/jobs", json=job("A", tags=["Python", "SQL"]))
+    client.post("/jobs", json=job("B", tags=["python"]))
+    assert len(client.get("/jobs?tag=PYTHON").get_json()) == 2
+    assert [j["title"] for j in client.get("/jobs?tag=python,sql").get_json()] == ["A"]
@@ -0,0 +1,41 @@
+import json
+import pytest
+from sqlalchemy import text
+from backend import load_jobs
+
+def deferred_names(app):
+    from backend import db
+    with app.app_context(), db.engine.connect() as connection:
+        return sorted(name for _, name, _ in load_jobs.deferred_ddl(connection))
+
+def write_ndjson(path, records):
+    path.write_text("".join(json.dumps(record) + "\n" for record in records))
+    return str(path)
+
+def test_mistyped_records_are_rejected_not_fatal(app, client, tmp_path):
+    path = write_ndjson(tmp_path / "jobs.ndjson", [
+        {"title": "Actuary", "company": "C", "location": "L", "tags": ["SQL"]},
+        {"title": 123, "company": "C", "location": "L"},
+        {"title": "Analyst", "company": "C", "location": "L", "job_type": None, "posting_date": 5},
+        {"title": "Analyst", "company": "C", "location": "L", "job_type": None},
+    ])
+    with app.app_context():
+        stats = load_jobs.load([path], checkpoint_path=str(tmp_path / "cp.json"))
+    assert (stats["created"], stats["rejected"]) == (2, 2)
+    assert len(client.get("/jobs/search?q=analyst").get_json()) == 1
+    assert client.get("/jobs/facets").get_json()["tags"] == [{"value": "SQL", "count": 1}]
+
+def test_failed_load_restores_indexes_and_triggers(app, client, tmp_path, monkeypatch):
+    before = deferred_names(app)
+    path = write_ndjson(tmp_path / "jobs.ndjson", [{"title": "A", "company": "C", "location": "L"}])
+
+    def broken(batch, dedupe=True):
+        raise RuntimeError("disk full")
+
+    monkeypatch.setattr(load_jobs, "write_jobs", broken)
+    with app.app_context(), pytest.raises(RuntimeError):
+        load_jobs.load([path], checkpoint_path=str(tmp_path / "cp.json"))
+    assert deferred_names(app) == before
+    # Writes through the API are searchable again
+    client.post("/jobs", json={"title": "Pricing", "company": "C", "location": "L"})
+    assert len(client.get("/jobs/search?q=pricing").get_json()) == 1
@@ -0,0 +1,9 @@
+from backend.check_query_plans import check_plans, seed
+
+def test_listing_queries_use_indexes(app):
+    from backend import db
+    with app.app_context():
+        with db.engine.begin() as connection:
+            seed(connection, 5000)
+        with db.engine.connect() as connection:
+            assert check_plans(connection) == []